@@ -0,0 +1,189 @@
+"""
+Input Adapter Support: Admission Control
+Coda di ammissione limitata con backpressure per le operazioni LLM
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Richiesta rifiutata dalla coda di ammissione"""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class _OperationGate:
+    """Semaforo e metriche di una singola operazione"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        # Serializza le acquisizioni di più posti, evitando acquisizioni parziali incrociate
+        self.weighted_lock = asyncio.Lock()
+        self.in_use = 0
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.avg_service_seconds: Optional[float] = None
+
+    def record_service_time(self, seconds: float) -> None:
+        if self.avg_service_seconds is None:
+            self.avg_service_seconds = seconds
+        else:
+            self.avg_service_seconds = 0.2 * seconds + 0.8 * self.avg_service_seconds
+
+    def stats(self, max_queue: int) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "in_use": self.in_use,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "max_queue": max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_queue_timeout": self.rejected_timeout,
+            "avg_service_seconds": self.avg_service_seconds
+        }
+
+
+class AdmissionController:
+    """
+    Limita le richieste LLM concorrenti per operazione.
+
+    Oltre `limit` richieste attive, le nuove attendono in una coda limitata:
+    - coda piena → AdmissionRejected 429 (Too Many Requests)
+    - attesa oltre `max_queue_wait` secondi → AdmissionRejected 503 (Service Unavailable)
+    Entrambe le risposte riportano un Retry-After stimato dal tempo medio di servizio.
+    """
+
+    def __init__(
+        self,
+        default_limit: int = 8,
+        limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 32,
+        max_queue_wait: float = 15.0
+    ):
+        self._default_limit = default_limit
+        self._limits = limits or {}
+        self._max_queue = max_queue
+        self._max_queue_wait = max_queue_wait
+        self._gates: Dict[str, _OperationGate] = {}
+
+    @classmethod
+    def from_env(cls, operations) -> "AdmissionController":
+        """
+        Configurazione da variabili d'ambiente:
+        LLM_ADMISSION_DEFAULT_LIMIT, LLM_ADMISSION_LIMIT_<OPERAZIONE>,
+        LLM_ADMISSION_MAX_QUEUE, LLM_ADMISSION_MAX_WAIT
+        """
+        limits = {}
+        for operation in operations:
+            value = os.getenv(f"LLM_ADMISSION_LIMIT_{operation.upper()}")
+            if value:
+                limits[operation] = int(value)
+
+        return cls(
+            default_limit=int(os.getenv("LLM_ADMISSION_DEFAULT_LIMIT", "8")),
+            limits=limits,
+            max_queue=int(os.getenv("LLM_ADMISSION_MAX_QUEUE", "32")),
+            max_queue_wait=float(os.getenv("LLM_ADMISSION_MAX_WAIT", "15"))
+        )
+
+    def _gate(self, operation: str) -> _OperationGate:
+        gate = self._gates.get(operation)
+        if gate is None:
+            gate = _OperationGate(self._limits.get(operation, self._default_limit))
+            self._gates[operation] = gate
+        return gate
+
+    def _retry_after(self, gate: _OperationGate) -> int:
+        """Secondi stimati perché si liberi posto in coda"""
+        service = gate.avg_service_seconds or 1.0
+        return max(1, math.ceil(service * (gate.waiting + 1) / gate.limit))
+
+    @staticmethod
+    async def _acquire(gate: _OperationGate, weight: int) -> None:
+        if weight == 1:
+            await gate.semaphore.acquire()
+            return
+
+        acquired = 0
+        try:
+            async with gate.weighted_lock:
+                for _ in range(weight):
+                    await gate.semaphore.acquire()
+                    acquired += 1
+        except BaseException:
+            for _ in range(acquired):
+                gate.semaphore.release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, operation: str, weight: int = 1) -> AsyncIterator[None]:
+        """
+        Acquisisce un posto per l'operazione, attendendo in coda se necessario.
+        `weight` è il numero di chiamate contemporanee al provider della
+        richiesta (es. fan-out dei cappelli), limitato al massimo dell'operazione.
+
+        Raises:
+            AdmissionRejected: coda piena (429) o attesa scaduta (503)
+        """
+        gate = self._gate(operation)
+        weight = max(1, min(weight, gate.limit))
+
+        if gate.semaphore.locked() or gate.in_use + weight > gate.limit:
+            if gate.waiting >= self._max_queue:
+                gate.rejected_full += 1
+                raise AdmissionRejected(
+                    429,
+                    self._retry_after(gate),
+                    f"Troppe richieste '{operation}' in coda, riprova più tardi"
+                )
+
+            gate.waiting += 1
+            gate.peak_waiting = max(gate.peak_waiting, gate.waiting)
+            try:
+                await asyncio.wait_for(self._acquire(gate, weight), timeout=self._max_queue_wait)
+            except asyncio.TimeoutError:
+                gate.rejected_timeout += 1
+                raise AdmissionRejected(
+                    503,
+                    self._retry_after(gate),
+                    f"Servizio AI saturo: attesa in coda oltre {self._max_queue_wait:g}s"
+                )
+            finally:
+                gate.waiting -= 1
+        else:
+            await self._acquire(gate, weight)
+
+        gate.in_use += weight
+        gate.active += 1
+        gate.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            gate.active -= 1
+            gate.in_use -= weight
+            gate.record_service_time(time.monotonic() - started)
+            for _ in range(weight):
+                gate.semaphore.release()
+
+    def stats(self) -> Dict[str, dict]:
+        """Metriche per operazione (profondità coda, attive, rifiuti)"""
+        return {
+            operation: gate.stats(self._max_queue)
+            for operation, gate in self._gates.items()
+        }
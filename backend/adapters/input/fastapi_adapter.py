@@ -3,39 +3,74 @@ Input Adapter: FastAPI
 Adapter per esposizione API REST con FastAPI
 """
 import asyncio
+import json
 import os
+from contextlib import AsyncExitStack
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Coroutine, Any
+from typing import Optional, Coroutine, Any, AsyncIterator, Callable, Dict, List, Tuple
 
 from application.ports.input import ITextProcessor
-from domain.models import TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
+
+from .admission_controller import AdmissionController, AdmissionRejected
+from .request_registry import (
+    REQUEST_ID_HEADER,
+    DuplicateRequestId,
+    RequestCancelled,
+    RequestIdMiddleware,
+    RequestRegistry,
+    TrackedRequest,
+)
+
+
+LLM_OPERATIONS = ["summarize", "improve", "translate", "six_hats", "generate"]
+
+# Cappelli analizzati da /llm/six-hats/all quando la richiesta non indica "hats"
+ALL_HATS_COUNT = 6
+
+# Evita che proxy (nginx) accumulino la risposta prima di inoltrarla
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 
 # ========== DTOs (Data Transfer Objects) ==========
 
-class SummarizeRequest(BaseModel):
+class LLMRequest(BaseModel):
+    # Chiave di sessione (es. editor): una nuova richiesta con la stessa chiave
+    # annulla quella ancora in corso, che riceve il risultato SUPERSEDED
+    supersede_key: Optional[str] = None
+
+
+class SummarizeRequest(LLMRequest):
     text: str
     percentage: int = 30
 
 
-class ImproveRequest(BaseModel):
+class ImproveRequest(LLMRequest):
     text: str
     criterion: str = "chiarezza e stile professionale"
 
 
-class TranslateRequest(BaseModel):
+class TranslateRequest(LLMRequest):
     text: str
     targetLanguage: str
 
 
-class SixHatsRequest(BaseModel):
+class SixHatsRequest(LLMRequest):
     text: str
     hat: str
 
 
-class GenerateRequest(BaseModel):
+class SixHatsAllRequest(LLMRequest):
+    text: str
+    hats: Optional[List[str]] = None
+    # Un'unica chiamata LLM per tutti i cappelli (default: LLM_SIX_HATS_SINGLE_CALL)
+    single_call: Optional[bool] = None
+
+
+class GenerateRequest(LLMRequest):
     prompt: str
     context_text: str = ""
     word_count: int = 300
@@ -43,12 +78,28 @@ class GenerateRequest(BaseModel):
 
 # ========== Factory Function ==========
 
-def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
+def create_fastapi_app(
+    text_processor: ITextProcessor,
+    lifespan: Optional[Callable] = None,
+    admission_controller: Optional[AdmissionController] = None,
+    metrics_sources: Optional[Dict[str, Callable[[], dict]]] = None,
+    readiness_check: Optional[Callable[[], dict]] = None,
+    request_registry: Optional[RequestRegistry] = None
+) -> FastAPI:
     """
     Factory per creare l'app FastAPI configurata
     
     Args:
         text_processor: Implementazione del text processor (domain service)
+        lifespan: Context manager di startup/shutdown (es. apertura e chiusura
+                  del connection pool verso i provider LLM)
+        admission_controller: Coda di ammissione per le operazioni LLM
+                              (default: configurata da variabili d'ambiente)
+        metrics_sources: Metriche aggiuntive esposte su /metrics (nome -> callable)
+        readiness_check: Stato di readiness dei provider esposto su /ready
+                         (callable che restituisce {"ready": bool, "providers": {...}})
+        request_registry: Registro delle richieste LLM in corso, annullabili
+                          con DELETE /llm/requests/{id} (default: nuovo registro)
         
     Returns:
         FastAPI: App configurata e pronta all'uso
@@ -57,7 +108,8 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
     app = FastAPI(
         title="ProofOfConcept API - Hexagonal Architecture",
         description="Text processing API con architettura esagonale",
-        version="2.0.0"
+        version="2.0.0",
+        lifespan=lifespan
     )
     
     # ========== CORS Configuration ==========
@@ -82,45 +134,104 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[REQUEST_ID_HEADER],
     )
     
+    app.add_middleware(RequestIdMiddleware)
+    
+    admission = admission_controller or AdmissionController.from_env(LLM_OPERATIONS)
+    extra_metrics = metrics_sources or {}
+    registry = request_registry or RequestRegistry()
+    
     # ========== Helpers ==========
     
+    async def wait_for_disconnect(request: Request) -> None:
+        """
+        Attende il messaggio ASGI `http.disconnect`: il server lo consegna appena
+        il client chiude la connessione, senza polling. Il corpo della richiesta
+        è già stato letto da FastAPI, quindi non arrivano altri messaggi.
+        """
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                return
+
     async def run_with_disconnect_check(request: Request, coro: Coroutine) -> Any:
         """
-        Esegue la chiamata controllando ogni mezzo secondo
-        se l'utente ha chiuso la connessione
+        Esegue la chiamata e la annulla appena l'utente chiude la connessione.
+        L'annullamento arriva fino allo stream HTTP verso il provider, che
+        viene chiuso prima di restituire il controllo.
         """
         llm_task = asyncio.create_task(coro)
+        disconnect_task = asyncio.create_task(wait_for_disconnect(request))
         
-        async def watch_disconnect():
-            while True:
-                if await request.is_disconnected():
-                    return True
-                await asyncio.sleep(0.5)
-        
-        disconnect_task = asyncio.create_task(watch_disconnect())
-        
-        done, pending = await asyncio.wait(
-            [llm_task, disconnect_task],
-            return_when=asyncio.FIRST_COMPLETED
-        )
+        try:
+            await asyncio.wait(
+                [llm_task, disconnect_task],
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            disconnect_task.cancel()
+            if not llm_task.done():
+                llm_task.cancel()
+                # Attende la pulizia (chiusura dello stream upstream) del task annullato
+                await asyncio.gather(llm_task, return_exceptions=True)
+            await asyncio.gather(disconnect_task, return_exceptions=True)
         
-        if disconnect_task in done and disconnect_task.result() is True:
-            llm_task.cancel()
+        if llm_task.cancelled():
             raise asyncio.CancelledError("Client disconnected")
-        
-        disconnect_task.cancel()
         return llm_task.result()
 
-    async def process_llm_request(request: Request, coro: Coroutine) -> dict:
+    def track_request(request: Request, operation: str, supersede_key: Optional[str]) -> TrackedRequest:
+        """
+        Registra la richiesta con il suo X-Request-ID (409 se già in corso),
+        sostituendo quella in corso con la stessa supersede_key
+        """
+        try:
+            return registry.track(request.state.request_id, operation, supersede_key)
+        except DuplicateRequestId as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    async def run_tracked(entry: TrackedRequest, operation: str, coro: Coroutine) -> LLMResult:
+        """Attesa in coda ed esecuzione, annullabili tramite il registro"""
+        try:
+            with entry.cancellable():
+                async with admission.slot(operation):
+                    return await coro
+        finally:
+            # Chiamata mai avviata (rifiuto o annullamento in coda)
+            coro.close()
+
+    async def process_llm_request(
+        request: Request,
+        operation: str,
+        coro: Coroutine,
+        supersede_key: Optional[str] = None
+    ) -> dict:
         """
         Helper centrale per l'esecuzione dei task LLM.
-        Gestisce le disconnessioni, mappa le eccezioni in errori HTTP e formatta il risultato.
+        Registra la richiesta, applica la coda di ammissione, gestisce le
+        disconnessioni e gli annullamenti, mappa le eccezioni in errori HTTP
+        e formatta il risultato.
         """
         try:
-            result = await run_with_disconnect_check(request, coro)
+            entry = track_request(request, operation, supersede_key)
+        except HTTPException:
+            coro.close()
+            raise
+        
+        try:
+            result = await run_with_disconnect_check(request, run_tracked(entry, operation, coro))
             return result.to_dict()
+        except RequestCancelled as e:
+            print(f"Richiesta {entry.request_id} annullata ({e.result.code.value}).")
+            return e.result.to_dict()
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.detail,
+                headers={"Retry-After": str(e.retry_after)}
+            )
         except asyncio.CancelledError:
             print("Chiamata annullata dal client frontend.")
             raise
@@ -131,7 +242,94 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
                 status_code=500,
                 detail=f"Errore del servizio AI: {str(e)}"
             )
+        finally:
+            registry.release(entry)
             
+    async def acquire_slot(operation: str, weight: int = 1) -> AsyncExitStack:
+        """
+        Acquisisce il posto in coda prima di aprire una risposta in streaming,
+        così un rifiuto arriva ancora come errore HTTP con Retry-After
+        """
+        stack = AsyncExitStack()
+        try:
+            await stack.enter_async_context(admission.slot(operation, weight))
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.detail,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        return stack
+
+    async def admit_stream(
+        request: Request,
+        operation: str,
+        supersede_key: Optional[str] = None,
+        weight: int = 1
+    ) -> Tuple[TrackedRequest, AsyncExitStack]:
+        """
+        Registra una richiesta in streaming e acquisisce il posto in coda.
+        Se viene annullata mentre attende, lo stream restituirà subito il
+        risultato di annullamento.
+        """
+        entry = track_request(request, operation, supersede_key)
+        try:
+            with entry.cancellable():
+                slot = await acquire_slot(operation, weight)
+        except RequestCancelled:
+            slot = AsyncExitStack()
+        except BaseException:
+            registry.release(entry)
+            raise
+        return entry, slot
+
+    async def release_stream(entry: TrackedRequest, slot: AsyncExitStack) -> None:
+        registry.release(entry)
+        await slot.aclose()
+
+    def wants_sse(request: Request) -> bool:
+        return "text/event-stream" in request.headers.get("accept", "")
+
+    def sse_event(event: str, data: Any) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def stream_llm_request(
+        request: Request,
+        operation: str,
+        events: AsyncIterator,
+        supersede_key: Optional[str] = None
+    ) -> StreamingResponse:
+        """
+        Risposta SSE per le varianti in streaming: un evento `outcome` appena
+        il modello ha deciso l'esito, un evento `token` per ogni frammento del
+        testo risultante ({"text": ...}, già decodificato) e un evento finale
+        `result` con l'LLMResult (anche per le richieste annullate). Un errore
+        imprevisto diventa un evento `error`.
+        """
+        entry, slot = await admit_stream(request, operation, supersede_key)
+
+        async def stream_events():
+            try:
+                async for event in entry.guard(events):
+                    if isinstance(event, LLMResult):
+                        yield sse_event("result", event.to_dict())
+                    elif isinstance(event, LLMOutcome):
+                        yield sse_event("outcome", event.to_dict())
+                    else:
+                        yield sse_event("token", {"text": event})
+            except RequestCancelled as e:
+                yield sse_event("result", e.result.to_dict())
+            except Exception as e:
+                yield sse_event("error", {"detail": f"Errore del servizio AI: {str(e)}"})
+            finally:
+                await release_stream(entry, slot)
+
+        return StreamingResponse(
+            stream_events(),
+            media_type="text/event-stream",
+            headers=STREAM_HEADERS
+        )
+
     # ========== Endpoints ==========
     
     @app.post("/llm/summarize")
@@ -140,7 +338,9 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         document = TextDocument(content=payload.text)
         return await process_llm_request(
             request, 
-            text_processor.summarize(document, payload.percentage)
+            "summarize",
+            text_processor.summarize(document, payload.percentage),
+            supersede_key=payload.supersede_key
         )
     
     @app.post("/llm/improve")
@@ -149,7 +349,9 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         document = TextDocument(content=payload.text)
         return await process_llm_request(
             request, 
-            text_processor.improve(document, payload.criterion)
+            "improve",
+            text_processor.improve(document, payload.criterion),
+            supersede_key=payload.supersede_key
         )
     
     @app.post("/llm/translate")
@@ -158,7 +360,9 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         document = TextDocument(content=payload.text)
         return await process_llm_request(
             request, 
-            text_processor.translate(document, payload.targetLanguage)
+            "translate",
+            text_processor.translate(document, payload.targetLanguage),
+            supersede_key=payload.supersede_key
         )
     
     @app.post("/llm/six-hats")
@@ -167,7 +371,54 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         document = TextDocument(content=payload.text)
         return await process_llm_request(
             request, 
-            text_processor.analyze_six_hats(document, payload.hat)
+            "six_hats",
+            text_processor.analyze_six_hats(document, payload.hat),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.post("/llm/six-hats/all")
+    async def six_hats_all(payload: SixHatsAllRequest, request: Request):
+        """
+        Analizza un testo con più cappelli in parallelo (default: tutti).
+        Ogni risultato è inviato appena pronto: NDJSON, oppure SSE se il client
+        invia Accept: text/event-stream. Una riga/evento per cappello:
+        {"hat": ..., "outcome": {...}, "data": {...}}
+        Se la richiesta viene annullata, l'ultima riga (evento `cancelled`)
+        contiene il risultato di annullamento senza "hat"; un errore imprevisto
+        diventa l'ultima riga (evento `error`) {"detail": ...}.
+        """
+        document = TextDocument(content=payload.text)
+        sse = wants_sse(request)
+        # Il fan-out occupa un posto "six_hats" per ogni chiamata contemporanea al
+        # provider; senza single_call esplicito si assume il fan-out (caso peggiore)
+        if payload.single_call:
+            parallel_calls = 1
+        else:
+            parallel_calls = len({hat.lower() for hat in payload.hats}) if payload.hats else ALL_HATS_COUNT
+        tracked, slot = await admit_stream(request, "six_hats", payload.supersede_key, parallel_calls)
+
+        async def stream_results():
+            try:
+                async for hat, result in tracked.guard(text_processor.analyze_all_hats(
+                    document, payload.hats, payload.single_call
+                )):
+                    entry = {"hat": hat, **result.to_dict()}
+                    yield sse_event("hat", entry) if sse else json.dumps(entry, ensure_ascii=False) + "\n"
+                if sse:
+                    yield sse_event("done", {})
+            except RequestCancelled as e:
+                cancelled = e.result.to_dict()
+                yield sse_event("cancelled", cancelled) if sse else json.dumps(cancelled, ensure_ascii=False) + "\n"
+            except Exception as e:
+                error = {"detail": f"Errore del servizio AI: {str(e)}"}
+                yield sse_event("error", error) if sse else json.dumps(error, ensure_ascii=False) + "\n"
+            finally:
+                await release_stream(tracked, slot)
+
+        return StreamingResponse(
+            stream_results(),
+            media_type="text/event-stream" if sse else "application/x-ndjson",
+            headers=STREAM_HEADERS
         )
     
     @app.post("/llm/generate")
@@ -175,13 +426,86 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
         """Genera testo basato su un prompt"""
         return await process_llm_request(
             request, 
+            "generate",
             text_processor.generate(
                 payload.prompt, 
                 payload.context_text, 
                 payload.word_count
-            )
+            ),
+            supersede_key=payload.supersede_key
         )
     
+    # ========== Streaming (SSE) ==========
+    
+    @app.post("/llm/summarize/stream")
+    async def summarize_stream(payload: SummarizeRequest, request: Request):
+        """Riassunto in streaming: token man mano che arrivano, poi il risultato"""
+        document = TextDocument(content=payload.text)
+        return await stream_llm_request(
+            request,
+            "summarize",
+            text_processor.summarize_stream(document, payload.percentage),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.post("/llm/improve/stream")
+    async def improve_stream(payload: ImproveRequest, request: Request):
+        """Miglioramento in streaming"""
+        document = TextDocument(content=payload.text)
+        return await stream_llm_request(
+            request,
+            "improve",
+            text_processor.improve_stream(document, payload.criterion),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.post("/llm/translate/stream")
+    async def translate_stream(payload: TranslateRequest, request: Request):
+        """Traduzione in streaming"""
+        document = TextDocument(content=payload.text)
+        return await stream_llm_request(
+            request,
+            "translate",
+            text_processor.translate_stream(document, payload.targetLanguage),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.post("/llm/six-hats/stream")
+    async def six_hats_stream(payload: SixHatsRequest, request: Request):
+        """Analisi con un cappello in streaming"""
+        document = TextDocument(content=payload.text)
+        return await stream_llm_request(
+            request,
+            "six_hats",
+            text_processor.analyze_six_hats_stream(document, payload.hat),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.post("/llm/generate/stream")
+    async def generate_stream(payload: GenerateRequest, request: Request):
+        """Generazione in streaming"""
+        return await stream_llm_request(
+            request,
+            "generate",
+            text_processor.generate_stream(
+                payload.prompt,
+                payload.context_text,
+                payload.word_count
+            ),
+            supersede_key=payload.supersede_key
+        )
+    
+    @app.delete("/llm/requests/{request_id}")
+    async def cancel_request(request_id: str):
+        """
+        Annulla una richiesta LLM in corso (X-Request-ID): il task viene
+        interrotto, lo stream verso il provider chiuso e la richiesta
+        originale riceve un risultato con status "cancelled"
+        """
+        if not registry.cancel(request_id):
+            raise HTTPException(status_code=404, detail=f"Nessuna richiesta in corso con id {request_id}")
+        return {"request_id": request_id, "status": "cancelled"}
+    
     @app.get("/health")
     async def health_check():
         """Health check endpoint per verificare stato del server"""
@@ -191,4 +515,24 @@ def create_fastapi_app(text_processor: ITextProcessor) -> FastAPI:
             "architecture": "hexagonal"
         }
     
+    @app.get("/ready")
+    async def readiness():
+        """Readiness: 503 finché nessun provider LLM ha superato la sonda"""
+        state = readiness_check() if readiness_check else {"ready": True, "providers": {}}
+        return JSONResponse(
+            status_code=200 if state["ready"] else 503,
+            content={
+                "status": "ready" if state["ready"] else "not_ready",
+                "providers": state["providers"]
+            }
+        )
+    
+    @app.get("/metrics")
+    async def metrics():
+        """Metriche runtime: coda di ammissione e sorgenti registrate"""
+        data = {"admission": admission.stats(), "requests": registry.stats()}
+        for name, source in extra_metrics.items():
+            data[name] = source()
+        return data
+    
     return app
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Input Adapter Support: Request Registry
+Identificativi di richiesta e registro delle chiamate LLM in corso, per
+annullarle esplicitamente anche quando un proxy nasconde la disconnessione
+o sostituirle con una richiesta più recente della stessa sessione
+"""
+import asyncio
+import re
+import uuid
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional, TypeVar
+
+from domain.models import LLMResult, ResultCode, ResultStatus
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+T = TypeVar("T")
+
+
+class DuplicateRequestId(Exception):
+    """Identificativo già usato da una richiesta in corso"""
+
+
+class RequestCancelled(Exception):
+    """Richiesta annullata tramite il registro: porta il risultato da restituire"""
+
+    def __init__(self, result: LLMResult):
+        super().__init__(result.code.value)
+        self.result = result
+
+
+class TrackedRequest:
+    """
+    Richiesta in corso. Il task viene annullato solo mentre esegue un blocco
+    cancellable(): l'annullamento chiude lo stream verso il provider e diventa
+    RequestCancelled con un risultato ben definito.
+    """
+
+    def __init__(self, request_id: str, operation: str, supersede_key: Optional[str] = None):
+        self.request_id = request_id
+        self.operation = operation
+        self.supersede_key = supersede_key
+        self.reason: Optional[ResultCode] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_sent = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def result(self) -> LLMResult:
+        return LLMResult(status=ResultStatus.CANCELLED, code=self.reason or ResultCode.CANCELLED)
+
+    def cancel(self, reason: ResultCode = ResultCode.CANCELLED) -> None:
+        if self.reason is None:
+            self.reason = reason
+        if self._task is not None and not self._cancel_sent:
+            self._cancel_sent = True
+            self._task.cancel()
+
+    @contextmanager
+    def cancellable(self) -> Iterator[None]:
+        """Rende annullabile il blocco eseguito dal task corrente"""
+        if self.cancelled:
+            # Annullamento arrivato mentre il task era altrove (es. invio al client)
+            raise RequestCancelled(self.result())
+        task = asyncio.current_task()
+        self._task = task
+        self._cancel_sent = False
+        try:
+            yield
+        except asyncio.CancelledError:
+            if not self._cancel_sent:
+                raise
+            task.uncancel()
+            raise RequestCancelled(self.result()) from None
+        finally:
+            self._task = None
+
+    async def guard(self, events: AsyncIterator[T]) -> AsyncIterator[T]:
+        """
+        Itera uno stream rendendo annullabile solo l'attesa del prossimo
+        elemento, non l'invio al client. Lo stream viene sempre chiuso.
+        """
+        try:
+            while True:
+                with self.cancellable():
+                    try:
+                        event = await events.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield event
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+class RequestRegistry:
+    """
+    Registro in memoria (per processo) delle richieste LLM in corso.
+    Una richiesta con supersede_key sostituisce quella ancora in corso con la
+    stessa chiave (es. sessione dell'editor), che riceve il risultato SUPERSEDED.
+    """
+
+    def __init__(self):
+        self._requests: Dict[str, TrackedRequest] = {}
+        self._by_key: Dict[str, TrackedRequest] = {}
+        self.cancelled = 0
+        self.superseded = 0
+
+    def track(
+        self,
+        request_id: str,
+        operation: str,
+        supersede_key: Optional[str] = None
+    ) -> TrackedRequest:
+        if request_id in self._requests:
+            raise DuplicateRequestId(f"Richiesta {request_id} già in corso")
+        entry = TrackedRequest(request_id, operation, supersede_key)
+        self._requests[request_id] = entry
+
+        if supersede_key is not None:
+            previous = self._by_key.get(supersede_key)
+            if previous is not None and not previous.cancelled:
+                self.superseded += 1
+                previous.cancel(ResultCode.SUPERSEDED)
+            self._by_key[supersede_key] = entry
+        return entry
+
+    def release(self, entry: TrackedRequest) -> None:
+        if self._requests.get(entry.request_id) is entry:
+            del self._requests[entry.request_id]
+        if entry.supersede_key is not None and self._by_key.get(entry.supersede_key) is entry:
+            del self._by_key[entry.supersede_key]
+
+    def cancel(self, request_id: str, reason: ResultCode = ResultCode.CANCELLED) -> bool:
+        entry = self._requests.get(request_id)
+        if entry is None:
+            return False
+        if not entry.cancelled:
+            self.cancelled += 1
+        entry.cancel(reason)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._requests),
+            "cancelled": self.cancelled,
+            "superseded": self.superseded
+        }
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI: assegna a ogni richiesta sotto `prefix` un identificativo
+    (X-Request-ID del client se valido, altrimenti generato), lo salva in
+    request.state.request_id e lo restituisce nell'header della risposta
+    """
+
+    def __init__(self, app, prefix: str = "/llm/"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._client_request_id(scope) or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        header = (REQUEST_ID_HEADER.lower().encode(), request_id.encode())
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+
+    @staticmethod
+    def _client_request_id(scope) -> Optional[str]:
+        name = REQUEST_ID_HEADER.lower().encode()
+        for key, value in scope.get("headers", []):
+            if key == name:
+                request_id = value.decode("latin-1").strip()
+                return request_id if _VALID_REQUEST_ID.match(request_id) else None
+        return None
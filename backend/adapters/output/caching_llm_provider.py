@@ -0,0 +1,103 @@
+"""
+Output Adapter: Caching LLM Provider
+Decorator di ILLMProvider che riusa le risposte già generate per richieste identiche
+"""
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, List, Optional
+
+from application.ports.output import ILLMProvider, IResponseCache
+
+from .response_cache import cache_key
+
+
+class CachingLLMProvider(ILLMProvider):
+    """
+    Interroga la cache prima del provider reale.
+
+    La chiave comprende operazione, messaggi (parametri e contenuto), temperatura
+    e `model_key` (modelli configurati): cambiando modello la cache si rinnova.
+    Le risposte che i servizi segnalano come non valide al parsing vengono
+    rimosse, così un JSON malformato non viene servito di nuovo.
+    """
+
+    def __init__(self, inner: ILLMProvider, cache: IResponseCache, model_key: str):
+        self._inner = inner
+        self._cache = cache
+        self._model_key = model_key
+        # Ultime risposte servite -> chiave, per invalidare quelle non valide
+        self._recent_keys: "OrderedDict[str, str]" = OrderedDict()
+
+    def _remember(self, response: str, key: str) -> None:
+        self._recent_keys[response] = key
+        self._recent_keys.move_to_end(response)
+        while len(self._recent_keys) > 256:
+            self._recent_keys.popitem(last=False)
+
+    async def generate_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> str:
+        key = cache_key(operation, messages, temperature, self._model_key)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            print(f"Cache hit per '{operation}'", flush=True)
+            self._remember(cached, key)
+            return cached
+
+        response = await self._inner.generate_completion(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            operation=operation
+        )
+        if response:
+            await self._cache.set(key, response)
+            self._remember(response, key)
+        return response
+
+    async def generate_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        key = cache_key(operation, messages, temperature, self._model_key)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            self._remember(cached, key)
+            yield cached
+            return
+
+        chunks = []
+        stream = self._inner.generate_completion_stream(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            operation=operation
+        )
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # Stream interrotto (client disconnesso): chiude subito quello interno
+            await stream.aclose()
+
+        # Solo gli stream arrivati fino in fondo finiscono in cache
+        response = "".join(chunks)
+        if response:
+            await self._cache.set(key, response)
+            self._remember(response, key)
+
+    async def report_parse_result(self, raw_response: str, success: bool) -> None:
+        key = self._recent_keys.pop(raw_response, None)
+        if key is not None and not success:
+            await self._cache.delete(key)
+        await self._inner.report_parse_result(raw_response, success)
+
+    async def validate_connection(self) -> bool:
+        return await self._inner.validate_connection()
@@ -0,0 +1,135 @@
+"""
+Output Adapter Support: Circuit Breaker
+Stato di salute per provider LLM e budget dei tentativi di fallback
+"""
+import time
+from enum import Enum
+from typing import Callable
+
+
+class CircuitState(Enum):
+    """Stati possibili del circuito"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker per un singolo provider.
+
+    - CLOSED: le richieste passano; dopo `failure_threshold` errori consecutivi il circuito si apre
+    - OPEN: il provider viene saltato subito per `recovery_timeout` secondi
+    - HALF_OPEN: passa al massimo una richiesta di prova ogni `probe_interval` secondi;
+      un successo richiude il circuito, un errore lo riapre
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        probe_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._failure_threshold = max(1, failure_threshold)
+        self._recovery_timeout = recovery_timeout
+        self._probe_interval = probe_interval
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._last_probe_at = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Stato corrente (OPEN diventa HALF_OPEN allo scadere del recovery timeout)"""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._last_probe_at = None
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Indica se il provider può ricevere la prossima richiesta"""
+        state = self.state
+
+        if state == CircuitState.CLOSED:
+            return True
+
+        if state == CircuitState.OPEN:
+            return False
+
+        now = self._clock()
+        if self._last_probe_at is None or now - self._last_probe_at >= self._probe_interval:
+            self._last_probe_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Registra una chiamata riuscita e richiude il circuito"""
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._last_probe_at = None
+
+    def record_failure(self) -> None:
+        """Registra un errore; apre il circuito oltre la soglia o se la prova fallisce"""
+        self._consecutive_failures += 1
+
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self._consecutive_failures >= self._failure_threshold
+        ):
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
+
+    def snapshot(self) -> dict:
+        """Stato serializzabile per diagnostica"""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures
+        }
+
+
+class RetryBudget:
+    """
+    Budget condiviso dei tentativi di fallback (token bucket).
+
+    Ogni richiesta deposita `ratio` gettoni, ogni tentativo successivo al primo ne
+    consuma uno. Con un provider giù, i retry restano così una frazione limitata
+    del traffico invece di moltiplicarlo. `min_per_second` garantisce un minimo di
+    retry anche a basso traffico.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_balance: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_balance = max_balance
+        self._clock = clock
+
+        self._balance = max_balance
+        self._last_refill = clock()
+
+    def record_request(self) -> None:
+        """Deposita la quota di retry di una nuova richiesta"""
+        self._balance = min(self._max_balance, self._balance + self._ratio)
+
+    def try_spend(self) -> bool:
+        """Consuma un gettone per un retry; False se il budget è esaurito"""
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._balance = min(self._max_balance, self._balance + elapsed * self._min_per_second)
+
+        if self._balance >= 1.0:
+            self._balance -= 1.0
+            return True
+        return False
@@ -0,0 +1,155 @@
+"""
+Output Adapter Support: Health Prober
+Sonda periodica dei provider LLM: mantiene calde connessioni e modelli e
+alimenta l'endpoint di readiness
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class ProbeState:
+    """Esito delle sonde di un provider"""
+    status: str = "unknown"
+    latency: Optional[float] = None
+    last_checked: Optional[float] = None
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "status": self.status,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures
+        }
+
+
+class HealthProber:
+    """
+    Sonda i provider con una richiesta minima ogni `interval` secondi.
+
+    Ogni sonda passa dal client condiviso del provider, quindi tiene aperte le
+    connessioni del pool; con Ollama la richiesta (con keep_alive) mantiene
+    anche il modello in memoria. La prima sonda, lanciata allo startup, fa da
+    warm-up: il costo di caricamento del modello non ricade sul primo utente.
+
+    Senza sonde periodiche i provider "down" vengono risondati con backoff
+    esponenziale (da `retry_delay` a `max_retry_delay`) finché non tornano
+    pronti. Anche l'esito delle richieste reali aggiorna lo stato
+    (record_result), così un provider ripreso torna subito "ready".
+    """
+
+    def __init__(
+        self,
+        providers: List[Dict],
+        probe: Callable[[Dict], Awaitable[None]],
+        key: Callable[[Dict], str],
+        interval: Optional[float] = 60.0,
+        retry_delay: float = 5.0,
+        max_retry_delay: float = 300.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self._providers = providers
+        self._probe = probe
+        self._key = key
+        self._interval = interval
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._clock = clock
+        self._states: Dict[str, ProbeState] = {key(p): ProbeState() for p in providers}
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+
+    async def probe_provider(self, provider: Dict) -> ProbeState:
+        state = self._states[self._key(provider)]
+        started = time.monotonic()
+        try:
+            await self._probe(provider)
+        except Exception as e:
+            self._update(state, e)
+        else:
+            self._update(state, None, time.monotonic() - started)
+        return state
+
+    def record_result(self, provider: Dict, error: Optional[Exception] = None) -> None:
+        """Aggiorna lo stato con l'esito di una richiesta reale (provider non sondati ignorati)"""
+        state = self._states.get(self._key(provider))
+        if state is None:
+            return
+        self._update(state, error)
+        if error is not None and self._started and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._retry_down())
+
+    def _update(self, state: ProbeState, error: Optional[Exception], latency: Optional[float] = None) -> None:
+        if error is not None:
+            state.status = "down"
+            state.last_error = str(error) or type(error).__name__
+            state.consecutive_failures += 1
+        else:
+            state.status = "ready"
+            state.latency = latency if latency is not None else state.latency
+            state.last_error = None
+            state.consecutive_failures = 0
+        state.last_checked = self._clock()
+
+    def _down(self) -> List[Dict]:
+        return [p for p in self._providers if self._states[self._key(p)].status == "down"]
+
+    async def probe_all(self) -> None:
+        """Sonda tutti i provider in parallelo"""
+        await asyncio.gather(*(self.probe_provider(p) for p in self._providers))
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_all()
+            if not self._interval:
+                await self._retry_down()
+                return
+            await asyncio.sleep(self._interval)
+
+    async def _retry_down(self) -> None:
+        """Risonda con backoff i soli provider "down" finché non tornano pronti"""
+        delay = self._retry_delay
+        while delay and self._down():
+            await asyncio.sleep(delay)
+            await asyncio.gather(*(self.probe_provider(p) for p in self._down()))
+            delay = min(delay * 2, self._max_retry_delay)
+
+    def start(self) -> None:
+        """
+        Avvia il warm-up e, se `interval` è impostato, le sonde periodiche;
+        altrimenti risonda con backoff i provider che risultano "down"
+        """
+        self._started = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._started = False
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def has_providers(self) -> bool:
+        return bool(self._providers)
+
+    def covers(self, provider: Dict) -> bool:
+        return self._key(provider) in self._states
+
+    def has_probed(self) -> bool:
+        return any(s.last_checked is not None for s in self._states.values())
+
+    def is_ready(self) -> bool:
+        """Pronto se almeno un provider ha risposto all'ultima sonda"""
+        return any(s.status == "ready" for s in self._states.values())
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: state.snapshot() for name, state in self._states.items()}
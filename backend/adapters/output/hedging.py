@@ -0,0 +1,101 @@
+"""
+Output Adapter Support: Hedged Requests
+Politica di hedging basata sui percentili del time-to-first-token
+"""
+import asyncio
+from collections import deque
+from contextlib import suppress
+from typing import AsyncIterator, Deque, Dict
+
+
+class HedgePolicy:
+    """
+    Calcola dopo quanto avviare una richiesta di riserva sul provider successivo.
+
+    Il ritardo è il percentile `percentile` dei time-to-first-token osservati per il
+    provider in attesa (finestra mobile), limitato a [min_delay, max_delay]. Finché
+    non ci sono abbastanza campioni si usa `default_delay`.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        min_delay: float = 0.2,
+        max_delay: float = 5.0,
+        default_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        self._percentile = min(max(percentile, 0.0), 1.0)
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._default_delay = default_delay
+        self._min_samples = min_samples
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record_ttft(self, provider_key: str, seconds: float) -> None:
+        """Registra il time-to-first-token osservato per un provider"""
+        samples = self._samples.setdefault(provider_key, deque(maxlen=self._window))
+        samples.append(seconds)
+
+    def delay_for(self, provider_key: str) -> float:
+        """Secondi di attesa del primo token prima di avviare l'hedge"""
+        samples = self._samples.get(provider_key)
+        if not samples or len(samples) < self._min_samples:
+            return self._default_delay
+
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self._percentile * len(ordered)))
+        return min(self._max_delay, max(self._min_delay, ordered[index]))
+
+
+class PumpedStream:
+    """
+    Consuma uno stream di chunk in un task dedicato e li espone tramite una coda.
+
+    Permette di mettere in gara più provider: il chiamante attende il primo chunk
+    di ciascuno senza condividere il generatore tra task diversi, e `aclose()`
+    cancella il task chiudendo lo stream HTTP sottostante.
+
+    La coda è limitata a `max_buffered` chunk: se il consumatore (es. un client
+    SSE lento) rimane indietro il pump smette di leggere e la backpressure
+    arriva fino alla connessione verso il provider.
+    """
+
+    _END = object()
+
+    def __init__(self, stream: AsyncIterator[str], max_buffered: int = 32):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered))
+        self._task = asyncio.ensure_future(self._pump(stream))
+
+    async def _pump(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in stream:
+                await self._queue.put(chunk)
+            await self._queue.put(self._END)
+        except Exception as e:
+            await self._queue.put(e)
+        finally:
+            # Cancellato mentre attende spazio in coda: lo stream va chiuso qui
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def __aiter__(self) -> "PumpedStream":
+        return self
+
+    async def __anext__(self) -> str:
+        item = await self._queue.get()
+        if item is self._END:
+            raise StopAsyncIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def aclose(self) -> None:
+        """Interrompe il pump e chiude lo stream sottostante"""
+        if not self._task.done():
+            self._task.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await self._task
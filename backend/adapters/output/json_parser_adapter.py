@@ -4,8 +4,11 @@ Implementazione concreta per parsing risposte JSON
 """
 import json
 import re
+from typing import Dict, List
 from application.ports.output import IResponseParser
-from domain.models import LLMResult, ResultStatus, ResultCode
+from domain.models import LLMOutcome, LLMResult, ResultStatus, ResultCode
+
+from .json_stream_parser import JSONStreamParser
 
 
 class JSONParserAdapter(IResponseParser):
@@ -22,37 +25,92 @@ class JSONParserAdapter(IResponseParser):
             LLMResult: Oggetto del dominio
         """
         try:
-            data = self.extract_json(raw_response)
-            
-            outcome = data.get("outcome", {})
-            data_field = data.get("data", {})
-            
-            status_str = outcome.get("status", "error")
-            code_str = outcome.get("code", "TECHNICAL_ERROR")
-            
-            try:
-                status = ResultStatus(status_str)
-            except ValueError:
-                status = ResultStatus.ERROR
-            
-            try:
-                code = ResultCode(code_str)
-            except ValueError:
-                code = ResultCode.TECHNICAL_ERROR
+            return self._to_result(self.extract_json(raw_response))
+        except Exception as e:
+            return self._parse_error(e)
+    
+    def parse_multi_response(
+        self,
+        raw_response: str,
+        keys: List[str]
+    ) -> Dict[str, LLMResult]:
+        """
+        Divide una risposta con un oggetto per chiave in più LLMResult.
+        Un unico outcome al primo livello (es. rifiuto dell'intero testo)
+        vale per tutte le chiavi.
+        
+        Args:
+            raw_response: Stringa JSON ricevuta dall'LLM
+            keys: Chiavi attese
             
-            return LLMResult(
-                status=status,
-                code=code,
-                rewritten_text=data_field.get("rewritten_text") if data_field else None,
-                detected_language=data_field.get("detected_language") if data_field else None,
-                violation_category=outcome.get("violation_category")
-            )
+        Returns:
+            Dict[str, LLMResult]: Un risultato per chiave
+        """
+        try:
+            data = self.extract_json(raw_response)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
         except Exception as e:
-            return LLMResult(
-                status=ResultStatus.ERROR,
-                code=ResultCode.TECHNICAL_ERROR,
-                violation_category=f"Parse error: {str(e)}"
-            )
+            return {key: self._parse_error(e) for key in keys}
+        
+        if "outcome" in data:
+            shared = self._to_result(data)
+            return {key: shared for key in keys}
+        
+        entries = {str(name).lower(): value for name, value in data.items()}
+        results = {}
+        for key in keys:
+            entry = entries.get(key.lower())
+            if isinstance(entry, dict):
+                results[key] = self._to_result(entry)
+            else:
+                results[key] = self._parse_error(ValueError(f"Missing result for '{key}'"))
+        return results
+    
+    def stream_parser(self) -> JSONStreamParser:
+        """Parser incrementale che condivide il recupero di extract_json"""
+        return JSONStreamParser(self)
+    
+    def to_outcome(self, outcome: dict) -> LLMOutcome:
+        """Converte il campo outcome del JSON, con fallback sui valori sconosciuti"""
+        status_str = outcome.get("status", "error")
+        code_str = outcome.get("code", "TECHNICAL_ERROR")
+        
+        try:
+            status = ResultStatus(status_str)
+        except ValueError:
+            status = ResultStatus.ERROR
+        
+        try:
+            code = ResultCode(code_str)
+        except ValueError:
+            code = ResultCode.TECHNICAL_ERROR
+        
+        return LLMOutcome(
+            status=status,
+            code=code,
+            violation_category=outcome.get("violation_category")
+        )
+    
+    def _to_result(self, data: dict) -> LLMResult:
+        """Converte il JSON di un risultato (outcome + data) in LLMResult"""
+        outcome = self.to_outcome(data.get("outcome", {}))
+        data_field = data.get("data", {})
+        
+        return LLMResult(
+            status=outcome.status,
+            code=outcome.code,
+            rewritten_text=data_field.get("rewritten_text") if data_field else None,
+            detected_language=data_field.get("detected_language") if data_field else None,
+            violation_category=outcome.violation_category
+        )
+    
+    def _parse_error(self, error: Exception) -> LLMResult:
+        return LLMResult(
+            status=ResultStatus.ERROR,
+            code=ResultCode.TECHNICAL_ERROR,
+            violation_category=f"Parse error: {str(error)}"
+        )
     
     def extract_json(self, text: str) -> dict:
         """
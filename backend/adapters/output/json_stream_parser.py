@@ -0,0 +1,237 @@
+"""
+Output Adapter Support: JSON Stream Parser
+Parser JSON incrementale e riprendibile per le risposte in streaming:
+emette l'outcome appena completo e il testo di data.rewritten_text già
+decodificato, man mano che arriva
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+from application.ports.output import IStreamingResponseParser
+from domain.models import LLMOutcome, LLMResult
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .json_parser_adapter import JSONParserAdapter
+
+_ESCAPES = {
+    "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f",
+    '"': '"', "\\": "\\", "/": "/",
+}
+
+
+class _Frame:
+    """Oggetto o array aperto, con la chiave sotto cui si trova nel genitore"""
+    __slots__ = ("is_object", "key", "pending_key", "expect_key", "start")
+
+    def __init__(self, is_object: bool, key: Optional[str], start: int):
+        self.is_object = is_object
+        self.key = key
+        self.pending_key: Optional[str] = None
+        self.expect_key = is_object
+        self.start = start
+
+
+class JSONStreamParser(IStreamingResponseParser):
+    """
+    Scansiona la risposta carattere per carattere mantenendo lo stato tra un
+    chunk e l'altro (stringhe, escape e sequenze \\uXXXX spezzate compresi).
+
+    Il recupero segue JSONParserAdapter.extract_json: tutto ciò che precede la
+    prima "{" (recinti ```json, preamboli) viene ignorato, l'outcome è
+    interpretato con extract_json e il risultato finale con parse_response
+    sul testo completo. Dopo la chiusura dell'oggetto principale il resto
+    della risposta non produce eventi.
+
+    `terminal` indica che il resto della risposta non serve più: oggetto
+    principale chiuso, esito diverso da success, oppure rewritten_text chiuso
+    dopo aver ricevuto l'outcome (anche se data precede outcome). In questi casi lo stream può essere interrotto e finish() costruisce il
+    risultato dai campi già ricevuti.
+    """
+
+    def __init__(self, parser: "JSONParserAdapter"):
+        self._parser = parser
+        self._buffer: List[str] = []
+        self._position = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._span: Optional[slice] = None
+        self._in_string = False
+        self._string_is_key = False
+        self._string_is_field = False
+        self._string_is_text = False
+        self._string: List[str] = []
+        self._fields: Dict[str, str] = {}
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self.outcome: Optional[LLMOutcome] = None
+        self.text_complete = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Union[LLMOutcome, str]]:
+        self._buffer.append(chunk)
+        events: List[Union[LLMOutcome, str]] = []
+        text: List[str] = []
+
+        for char in chunk:
+            index = self._position
+            self._position += 1
+            if self.done:
+                continue
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._stack.append(_Frame(True, None, index))
+                continue
+            if self._in_string:
+                self._string_char(char, text)
+                continue
+            self._structural_char(char, index, events, text)
+
+        if text:
+            events.append("".join(text))
+        return events
+
+    @property
+    def terminal(self) -> bool:
+        if self.done:
+            return True
+        if self.outcome is None:
+            # Senza outcome (es. data prima di outcome) la risposta serve ancora
+            return False
+        return self.text_complete or not self.outcome.is_successful()
+
+    def finish(self) -> LLMResult:
+        raw = "".join(self._buffer)
+        if self._span:
+            # Oggetto principale completo: il testo che segue (note, altre graffe) è ignorato
+            return self._parser.parse_response(raw[self._span])
+        if self.outcome is not None and self.terminal:
+            # Stream interrotto in anticipo: risultato dai campi già ricevuti
+            return LLMResult(
+                status=self.outcome.status,
+                code=self.outcome.code,
+                rewritten_text=self._fields.get("rewritten_text") if self.text_complete else None,
+                detected_language=self._fields.get("detected_language"),
+                violation_category=self.outcome.violation_category
+            )
+        return self._parser.parse_response(raw)
+
+    # ========== Scansione ==========
+
+    def _string_char(self, char: str, text: List[str]) -> None:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                self._emit_code_point(self._unicode, text)
+                self._unicode = None
+            return
+
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._emit(_ESCAPES.get(char, char), text)
+            return
+
+        if char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._close_string()
+        else:
+            # Anche i caratteri di controllo non escapati (output "sporco")
+            self._emit(char, text)
+
+    def _emit(self, value: str, text: List[str]) -> None:
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+            value = "�" + value
+        if self._string_is_text:
+            text.append(value)
+        if self._string_is_key or self._string_is_field:
+            self._string.append(value)
+
+    def _emit_code_point(self, digits: str, text: List[str]) -> None:
+        try:
+            code = int(digits, 16)
+        except ValueError:
+            self._emit("�", text)
+            return
+
+        if 0xD800 <= code < 0xDC00:
+            if self._high_surrogate is not None:
+                self._emit("�", text)
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+        self._emit(chr(code), text)
+
+    def _close_string(self) -> None:
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+        frame = self._stack[-1]
+        if self._string_is_key:
+            frame.pending_key = "".join(self._string)
+            frame.expect_key = False
+        elif self._string_is_field:
+            self._fields[frame.pending_key] = "".join(self._string)
+            self.text_complete = self.text_complete or self._string_is_text
+        self._in_string = False
+        self._string_is_key = False
+        self._string_is_field = False
+        self._string_is_text = False
+        self._string = []
+
+    def _structural_char(
+        self,
+        char: str,
+        index: int,
+        events: List[Union[LLMOutcome, str]],
+        text: List[str]
+    ) -> None:
+        frame = self._stack[-1]
+
+        if char == '"':
+            self._in_string = True
+            self._string_is_key = frame.is_object and frame.expect_key
+            self._string_is_field = not self._string_is_key and self._is_data_field(frame)
+            self._string_is_text = self._string_is_field and frame.pending_key == "rewritten_text"
+        elif char in "{[":
+            self._stack.append(_Frame(char == "{", self._value_key(frame), index))
+        elif char in "}]":
+            closed = self._stack.pop()
+            if not self._stack:
+                self.done = True
+                self._span = slice(closed.start, index + 1)
+            elif closed.key == "outcome" and len(self._stack) == 1 and self.outcome is None:
+                self._emit_outcome(closed, index, events, text)
+        elif char == "," and frame.is_object:
+            frame.expect_key = True
+            frame.pending_key = None
+
+    def _value_key(self, frame: _Frame) -> Optional[str]:
+        return frame.pending_key if frame.is_object else None
+
+    def _is_data_field(self, frame: _Frame) -> bool:
+        """True per i valori stringa di data (rewritten_text, detected_language)"""
+        return frame.is_object and len(self._stack) == 2 and frame.key == "data"
+
+    def _emit_outcome(
+        self,
+        frame: _Frame,
+        end: int,
+        events: List[Union[LLMOutcome, str]],
+        text: List[str]
+    ) -> None:
+        raw = "".join(self._buffer)[frame.start:end + 1]
+        try:
+            self.outcome = self._parser.to_outcome(self._parser.extract_json(raw))
+        except ValueError:
+            return
+        # Il testo decodificato prima della chiusura dell'outcome esce per primo
+        if text:
+            events.append("".join(text))
+            text.clear()
+        events.append(self.outcome)
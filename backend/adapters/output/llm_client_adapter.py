@@ -2,137 +2,800 @@
 Output Adapter: LLM Client
 Implementazione concreta per comunicazione con LLM API
 """
+import asyncio
+import importlib.util
+import hashlib
 import httpx
-import json
-from typing import List, Dict, AsyncGenerator
+import random
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Dict, AsyncGenerator, AsyncIterator, Optional, Callable, Iterator, Tuple, Union
 from application.ports.output import ILLMProvider
+from .circuit_breaker import CircuitBreaker, CircuitState, RetryBudget
+from .health_prober import HealthProber
+from .hedging import HedgePolicy, PumpedStream
+from .provider_router import ProviderRouter
+from .rate_limiter import (ProviderRateLimiter, RateLimitExceeded,
+                           TransientProviderError, parse_duration)
+from .sse_decoder import OllamaNDJSONDecoder, SSEDecoder
+from .stream_resume import BoundaryDeduplicator, build_continuation_messages
+from .timeouts import PhaseTimeouts, ProviderTimeoutError, TimeoutPolicy
+from .token_budget import TokenBudget
+
+
+# HTTP/2 richiede il pacchetto opzionale "h2" (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0
+)
+
+
+class _NoProviderAvailable(Exception):
+    """Nessun provider candidato ha prodotto una risposta"""
+
+    def __init__(self, last_error: Optional[Exception]):
+        super().__init__(str(last_error))
+        self.last_error = last_error
+
+
+async def _chain(first: List[str], stream: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+    for chunk in first:
+        yield chunk
+    async for chunk in stream:
+        yield chunk
+
+
+@dataclass
+class _OpenedStream:
+    """Stream avviato su un provider dopo la ricezione del primo chunk"""
+    provider: Dict
+    first: Optional[str]
+    stream: AsyncIterator[str]
+    started_at: float
+    ttft: float
 
 
 class LLMClientAdapter(ILLMProvider):
     """Adapter per il client LLM con supporto streaming"""
-    
-    def __init__(self, providers: List[Dict]):
+
+    def __init__(
+        self,
+        providers: List[Dict],
+        pool_limits: Optional[httpx.Limits] = None,
+        breaker_factory: Optional[Callable[[], CircuitBreaker]] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        max_attempts: Optional[int] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        router: Optional[ProviderRouter] = None,
+        rate_limit_max_wait: float = 10.0,
+        transient_retries: int = 2,
+        max_retry_backoff: float = 8.0,
+        timeout_policy: Optional[TimeoutPolicy] = None,
+        probe_interval: Optional[float] = None,
+        warm_up: bool = False,
+        min_output_tokens: int = 256
+    ):
         self._providers = providers
         self._timeout = 120.0
+        self._pool_limits = pool_limits or DEFAULT_POOL_LIMITS
+        self._clients: Dict[str, httpx.AsyncClient] = {}
 
-    async def generate_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: str = None, 
-        temperature: float = 0.1
-    ) -> str:
-        
-        last_error = None
+        breaker_factory = breaker_factory or CircuitBreaker
+        self._breakers: Dict[str, CircuitBreaker] = {
+            self._provider_key(p): breaker_factory() for p in providers
+        }
+        self._retry_budget = retry_budget or RetryBudget()
+        self._max_attempts = max_attempts or len(providers)
+        self._hedge_policy = hedge_policy
+        self._router = router
+        self._rate_limiters: Dict[str, ProviderRateLimiter] = {
+            self._provider_key(p): ProviderRateLimiter(
+                self._provider_key(p),
+                requests_per_minute=p.get("rpm"),
+                tokens_per_minute=p.get("tpm"),
+                max_wait=rate_limit_max_wait
+            )
+            for p in providers
+        }
+        self._transient_retries = transient_retries
+        self._max_retry_backoff = max_retry_backoff
+        self._timeout_policy = timeout_policy or TimeoutPolicy()
+        # Hash delle ultime risposte -> provider, per attribuire l'esito del parsing
+        self._recent_responses: "OrderedDict[str, str]" = OrderedDict()
+        self._malformed_frames: Dict[str, int] = {}
+        self._budgets: Dict[str, TokenBudget] = {
+            self._provider_key(p): TokenBudget.for_provider(p) for p in providers
+        }
+        self._min_output_tokens = min_output_tokens
+        self._concurrency: Dict[str, asyncio.Semaphore] = {
+            self._provider_key(p): asyncio.Semaphore(p["max_concurrency"])
+            for p in providers if p.get("max_concurrency")
+        }
+        probed = [p for p in providers if p.get("url") and p.get("model") and self._probe_enabled(p)]
+        self._probing_enabled = bool(probed) and (warm_up or bool(probe_interval))
+        self._prober = HealthProber(
+            probed,
+            self._probe_provider,
+            self._provider_key,
+            interval=probe_interval
+        )
+
+    @staticmethod
+    def _probe_enabled(provider: Dict) -> bool:
+        """
+        Warm-up e sonde periodiche: di default solo per i provider senza chiave
+        API (self-hosted), così le quote a consumo non vengono spese in sonde
+        """
+        probe = provider.get("probe")
+        return not provider.get("key") if probe is None else probe
+
+    @staticmethod
+    def _provider_key(provider: Dict) -> str:
+        return provider.get("name") or provider.get("url") or "Sconosciuto"
+
+    @property
+    def model_key(self) -> str:
+        """Identifica i modelli configurati (es. per invalidare le cache al cambio di modello)"""
+        return ",".join(f"{self._provider_key(p)}:{p.get('model')}" for p in self._providers)
 
+    # ========== Connection Pool ==========
+
+    async def start(self) -> None:
+        """
+        Apre un client con connection pool per ogni provider (startup FastAPI)
+        e avvia in background warm-up e sonde periodiche, se configurati
+        """
         for provider in self._providers:
+            if provider.get("url") and provider.get("model"):
+                self._get_client(provider)
+
+        if self._probing_enabled:
+            self._prober.start()
+
+    async def aclose(self) -> None:
+        """Chiude tutti i client condivisi (shutdown FastAPI)"""
+        await self._prober.stop()
+
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+        if self._router is not None:
+            self._router.save()
+
+    def _get_client(self, provider: Dict) -> httpx.AsyncClient:
+        """Restituisce il client condiviso del provider, creandolo se necessario"""
+        name = self._provider_key(provider)
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client(provider)
+            self._clients[name] = client
+        return client
+
+    def _create_client(self, provider: Dict) -> httpx.AsyncClient:
+        """
+        Crea un client con keep-alive.
+        - "uds": socket Unix per un Ollama co-locato
+        - "http2": HTTP/2 per i provider cloud (se il pacchetto h2 è installato)
+        """
+        http2 = bool(provider.get("http2"))
+        if http2 and not _HTTP2_AVAILABLE:
+            print(f"[{provider.get('name')}] HTTP/2 richiesto ma 'h2' non installato: uso HTTP/1.1", flush=True)
+            http2 = False
+
+        transport = None
+        if provider.get("uds"):
+            transport = httpx.AsyncHTTPTransport(
+                uds=provider["uds"],
+                limits=self._pool_limits,
+                http2=http2
+            )
+
+        return httpx.AsyncClient(
+            timeout=self._timeout,
+            limits=self._pool_limits,
+            http2=http2,
+            transport=transport
+        )
+
+    # ========== Fallback Chain ==========
+
+    def _providers_for_request(self, messages: Optional[List[Dict[str, str]]] = None) -> Iterator[Dict]:
+        """
+        Provider da tentare per una singola richiesta, in ordine di fallback.
+        Salta i provider con circuito aperto o con una finestra di contesto
+        troppo piccola per il prompt, e smette quando si supera il numero
+        massimo di tentativi o il budget condiviso dei retry.
+        """
+        self._retry_budget.record_request()
+        attempts = 0
+
+        providers = self._providers
+        if self._router is not None:
+            providers = self._router.order(providers, self._provider_key)
+
+        for provider in providers:
+            name = provider.get("name", "Sconosciuto")
+
             if not provider.get("url") or not provider.get("model"):
-                print(f"[{provider.get('name', 'Sconosciuto')}] Saltato: URL o Modello mancante", flush=True)
+                print(f"[{name}] Saltato: URL o Modello mancante", flush=True)
                 continue
 
+            if attempts >= self._max_attempts:
+                print(f"Raggiunto il limite di {self._max_attempts} tentativi per la richiesta", flush=True)
+                return
+
+            if not self._breakers[self._provider_key(provider)].allow_request():
+                print(f"[{name}] Saltato: circuito aperto", flush=True)
+                continue
+
+            if messages is not None:
+                budget = self._budgets[self._provider_key(provider)]
+                prompt_tokens = budget.estimate(messages)
+                if not budget.fits(prompt_tokens, self._min_output_tokens):
+                    print(f"[{name}] Saltato: prompt di ~{prompt_tokens} token oltre il contesto di {budget.context_window}", flush=True)
+                    continue
+
+            if attempts > 0 and not self._retry_budget.try_spend():
+                print(f"[{name}] Saltato: budget dei retry esaurito", flush=True)
+                return
+
+            attempts += 1
+            yield provider
+
+    def _record_first_token(self, provider: Dict, ttft: float) -> None:
+        if self._hedge_policy is not None:
+            self._hedge_policy.record_ttft(self._provider_key(provider), ttft)
+
+    def _record_success(self, opened: _OpenedStream, chunk_count: int, response: str) -> None:
+        key = self._provider_key(opened.provider)
+        self._breakers[key].record_success()
+        self._prober.record_result(opened.provider)
+
+        if self._router is not None:
+            generation_seconds = asyncio.get_running_loop().time() - opened.started_at - opened.ttft
+            self._router.record_success(key, opened.ttft, chunk_count, generation_seconds)
+
+        self._recent_responses[self._response_fingerprint(response)] = key
+        while len(self._recent_responses) > 256:
+            self._recent_responses.popitem(last=False)
+
+    def _record_failure(self, provider: Dict, error: Optional[Exception] = None) -> None:
+        if isinstance(error, RateLimitExceeded) or (
+            isinstance(error, TransientProviderError) and error.status_code == 429
+        ):
+            # Il provider è sano ma in rate limit: ci pensa il limiter a saltarlo
+            return
+        key = self._provider_key(provider)
+        self._breakers[key].record_failure()
+        self._prober.record_result(provider, error or Exception("richiesta fallita"))
+        if self._router is not None:
+            self._router.record_failure(key)
+
+    def _record_malformed_frames(self, provider: Dict, decoder: Union[SSEDecoder, OllamaNDJSONDecoder]) -> None:
+        if not decoder.malformed:
+            return
+        key = self._provider_key(provider)
+        self._malformed_frames[key] = self._malformed_frames.get(key, 0) + decoder.malformed
+        sample = decoder.malformed_sample.decode("utf-8", errors="replace")
+        print(f"[{provider.get('name', key)}] {decoder.malformed} frame SSE non validi ignorati (es. {sample!r})", flush=True)
+
+    @staticmethod
+    def _response_fingerprint(response: str) -> str:
+        return hashlib.sha1(response.encode("utf-8")).hexdigest()
+
+    async def report_parse_result(self, raw_response: str, success: bool) -> None:
+        """Attribuisce l'esito del parsing JSON al provider che ha prodotto la risposta"""
+        key = self._recent_responses.pop(self._response_fingerprint(raw_response), None)
+        if key is not None and self._router is not None:
+            self._router.record_parse_result(key, success)
+
+    def get_provider_health(self) -> Dict[str, dict]:
+        """Stato del circuit breaker (e statistiche di routing) di ogni provider"""
+        health = {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+        for name, limiter in self._rate_limiters.items():
+            health.setdefault(name, {})["rate_limit"] = limiter.snapshot()
+        for name, count in self._malformed_frames.items():
+            health.setdefault(name, {})["malformed_frames"] = count
+        if self._router is not None:
+            for name, stats in self._router.snapshot().items():
+                health.setdefault(name, {})["routing"] = stats
+        return health
+
+    # ========== Completion ==========
+
+    async def _open_stream(
+        self,
+        candidates: Iterator[Dict],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: Optional[str] = None
+    ) -> _OpenedStream:
+        """
+        Avvia lo stream sui provider candidati finché uno produce il primo chunk.
+
+        Senza hedging i candidati vengono provati in sequenza. Con hedging, se il
+        primo token tarda oltre il ritardo della HedgePolicy, la stessa richiesta
+        parte anche sul candidato successivo: vince chi produce per primo un token
+        e gli altri stream vengono chiusi.
+
+        Returns:
+            _OpenedStream: provider vincente, primo chunk (None se lo stream è vuoto)
+            e stream restante
+
+        Raises:
+            _NoProviderAvailable: se nessun candidato produce una risposta
+        """
+        if self._hedge_policy is None:
+            return await self._open_stream_sequential(candidates, messages, temperature, operation)
+        return await self._open_stream_hedged(candidates, messages, temperature, operation)
+
+    async def _open_stream_sequential(
+        self,
+        candidates: Iterator[Dict],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: Optional[str] = None
+    ) -> _OpenedStream:
+        loop = asyncio.get_running_loop()
+        last_error = None
+
+        for provider in candidates:
+            print(f"Tento la generazione con: {provider['name']} (Modello: {provider['model']})", flush=True)
+            started = loop.time()
             try:
-                print(f"Tento la generazione con: {provider['name']} (Modello: {provider['model']})", flush=True)
-                
-                full_content = []
-                async for chunk in self._call_api_stream(
-                    provider["url"], messages, provider["model"], provider.get("key"), temperature
-                ):
-                    full_content.append(chunk)
-
-                risposta_completa = "".join(full_content)
-                print(f"\n--- DEBUG RISPOSTA GREZZA [{provider['name']}] ---\n{risposta_completa}\n----------------------------------\n", flush=True)
-                
-                return risposta_completa
-                
+                stream = self._provider_stream(provider, messages, temperature, operation)
+                try:
+                    first = await stream.__anext__()
+                except StopAsyncIteration:
+                    first = None
+                ttft = loop.time() - started
+                self._record_first_token(provider, ttft)
+                return _OpenedStream(provider, first, stream, started, ttft)
             except Exception as e:
+                self._record_failure(provider, e)
                 print(f"[{provider['name']}] Fallito: {str(e)}. Passo al prossimo fallback...", flush=True)
                 last_error = e
 
-        raise Exception(f"Nessun servizio AI disponibile. Ultimo errore: {str(last_error)}")
-    
+        raise _NoProviderAvailable(last_error)
+
+    async def _open_stream_hedged(
+        self,
+        candidates: Iterator[Dict],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: Optional[str] = None
+    ) -> _OpenedStream:
+        loop = asyncio.get_running_loop()
+        racing: Dict[asyncio.Future, Tuple[Dict, PumpedStream, float]] = {}
+        last_error = None
+        exhausted = False
+
+        def launch() -> None:
+            nonlocal exhausted, last_error
+            for provider in candidates:
+                print(f"Tento la generazione con: {provider['name']} (Modello: {provider['model']})", flush=True)
+                try:
+                    stream = PumpedStream(self._provider_stream(provider, messages, temperature, operation))
+                except Exception as e:
+                    self._record_failure(provider, e)
+                    last_error = e
+                    continue
+                racing[asyncio.ensure_future(stream.__anext__())] = (provider, stream, loop.time())
+                return
+            exhausted = True
+
+        launch()
+        try:
+            while racing:
+                timeout = None
+                if not exhausted:
+                    newest, _, started = list(racing.values())[-1]
+                    delay = self._hedge_policy.delay_for(self._provider_key(newest))
+                    timeout = max(0.0, started + delay - loop.time())
+
+                done, _ = await asyncio.wait(racing, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    print(f"[{newest['name']}] Nessun token entro {delay:.2f}s: avvio hedge sul provider successivo", flush=True)
+                    launch()
+                    continue
+
+                for future in done:
+                    provider, stream, started = racing.pop(future)
+                    try:
+                        first = future.result()
+                    except StopAsyncIteration:
+                        first = None
+                    except Exception as e:
+                        self._record_failure(provider, e)
+                        print(f"[{provider['name']}] Fallito: {str(e)}. Passo al prossimo fallback...", flush=True)
+                        last_error = e
+                        await stream.aclose()
+                        continue
+
+                    ttft = loop.time() - started
+                    self._record_first_token(provider, ttft)
+                    return _OpenedStream(provider, first, stream, started, ttft)
+
+                if not racing and not exhausted:
+                    launch()
+
+            raise _NoProviderAvailable(last_error)
+        finally:
+            for future, (_, stream, _) in racing.items():
+                future.cancel()
+                await stream.aclose()
+
+    @staticmethod
+    async def _close_stream(stream: AsyncIterator[str]) -> None:
+        """Chiude lo stream (e la connessione HTTP) se non è stato consumato fino in fondo"""
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    async def _stream_with_failover(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: Optional[str],
+        error_context: str = ""
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream con fallback tra provider.
+
+        Se un provider cade dopo aver già prodotto parte dell'output, il provider
+        successivo riceve l'output parziale e la richiesta di proseguire: il testo
+        già inviato non viene né perso né ripetuto, e la sovrapposizione al punto
+        di ripresa viene rimossa dal BoundaryDeduplicator.
+        """
+        last_error = "nessun provider disponibile (circuiti aperti o budget esaurito)"
+        candidates = self._providers_for_request(messages)
+        emitted: List[str] = []
+
+        while True:
+            partial = "".join(emitted)
+            request_messages = build_continuation_messages(messages, partial) if partial else messages
+
+            try:
+                opened = await self._open_stream(candidates, request_messages, temperature, operation)
+            except _NoProviderAvailable as e:
+                raise Exception(f"Nessun servizio AI disponibile{error_context}. Ultimo errore: {str(e.last_error or last_error)}")
+
+            provider, stream = opened.provider, opened.stream
+            chunks = _chain([opened.first] if opened.first else [], stream)
+            dedup = BoundaryDeduplicator(partial) if partial else None
+            chunk_count = 0
+
+            try:
+                async for chunk in chunks:
+                    chunk_count += 1
+                    if dedup is not None:
+                        chunk = dedup.feed(chunk)
+                    if chunk:
+                        emitted.append(chunk)
+                        yield chunk
+
+                if dedup is not None:
+                    tail = dedup.finish()
+                    if tail:
+                        emitted.append(tail)
+                        yield tail
+            except Exception as e:
+                self._record_failure(provider, e)
+                last_error = e
+                if emitted:
+                    print(f"[{provider['name']}] Interrotto dopo {len(''.join(emitted))} caratteri: {str(e)}. Riprendo dal punto di interruzione con il prossimo fallback...", flush=True)
+                else:
+                    print(f"[{provider['name']}] Fallito: {str(e)}. Passo al prossimo fallback...", flush=True)
+                continue
+            finally:
+                await chunks.aclose()
+                await self._close_stream(stream)
+
+            self._record_success(opened, chunk_count, "".join(emitted))
+            return
+
+    async def generate_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> str:
+
+        full_content = []
+        stream = self._stream_with_failover(messages, temperature, operation)
+        try:
+            async for chunk in stream:
+                full_content.append(chunk)
+        finally:
+            # Anche se la richiesta viene annullata la connessione si chiude subito
+            await stream.aclose()
+
+        risposta_completa = "".join(full_content)
+        print(f"\n--- DEBUG RISPOSTA GREZZA ---\n{risposta_completa}\n----------------------------------\n", flush=True)
+
+        return risposta_completa
+
+    async def _provider_stream(
+        self,
+        provider: Dict,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream di un singolo provider con rate limiting lato client.
+        Le risposte 429/503 transitorie vengono ripetute con backoff esponenziale
+        (jitter) entro `max_retry_backoff` secondi, prima di passare al fallback.
+        """
+        limiter = self._rate_limiters[self._provider_key(provider)]
+        timeouts = self._timeout_policy.resolve(self._provider_key(provider), operation)
+        estimated_tokens = self._budgets[self._provider_key(provider)].estimate(messages)
+        attempt = 0
+        backoff_spent = 0.0
+
+        while True:
+            await limiter.acquire(estimated_tokens)
+            try:
+                async with self._concurrency_slot(provider, timeouts):
+                    chunks = self._call_api_stream(provider, messages, temperature, timeouts)
+                    try:
+                        async for chunk in chunks:
+                            yield chunk
+                    finally:
+                        await self._close_stream(chunks)
+                return
+            except TransientProviderError as e:
+                # Sollevata prima di qualsiasi chunk: ripetere la richiesta è sicuro
+                delay = e.retry_after
+                if delay is None:
+                    delay = random.uniform(0.5, 1.0) * min(4.0, 0.5 * 2 ** attempt)
+
+                if attempt >= self._transient_retries or backoff_spent + delay > self._max_retry_backoff:
+                    raise
+
+                attempt += 1
+                backoff_spent += delay
+                print(f"[{provider['name']}] HTTP {e.status_code}: nuovo tentativo {attempt} tra {delay:.2f}s", flush=True)
+                if e.retry_after is None:
+                    await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def _concurrency_slot(self, provider: Dict, timeouts: PhaseTimeouts) -> AsyncIterator[None]:
+        """
+        Limite di richieste contemporanee del provider (max_concurrency).
+        L'attesa di un posto rientra nella scadenza del primo token: oltre,
+        meglio passare al fallback.
+        """
+        semaphore = self._concurrency.get(self._provider_key(provider))
+        if semaphore is None:
+            yield
+            return
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=timeouts.first_token)
+        except asyncio.TimeoutError:
+            raise ProviderTimeoutError(provider.get("name", provider["url"]), "queue", timeouts.first_token)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def _request_body(
+        self,
+        provider: Dict,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        stream: bool,
+        max_tokens: Optional[int] = None
+    ) -> Dict:
+        """
+        Corpo della richiesta secondo il protocollo del provider.
+        - openai: temperature e max_tokens al primo livello
+        - ollama (/api/chat): temperature, num_predict e num_ctx in "options";
+          num_ctx è calcolato dal prompt salvo valore fisso nelle opzioni
+        max_tokens/num_predict non vengono inviati se il limite non è noto
+        """
+        budget = self._budgets[self._provider_key(provider)]
+        prompt_tokens = budget.estimate(messages)
+        if max_tokens is None:
+            max_tokens = budget.max_tokens(prompt_tokens)
+
+        body = {
+            "model": provider["model"],
+            "messages": messages,
+            "stream": stream
+        }
+
+        if provider.get("protocol") == "ollama":
+            options = {"num_ctx": budget.num_ctx(prompt_tokens), "temperature": temperature}
+            if max_tokens is not None:
+                options["num_predict"] = max_tokens
+            body["options"] = {**options, **(provider.get("options") or {})}
+        else:
+            body["temperature"] = temperature
+            if max_tokens is not None:
+                body["max_tokens"] = max_tokens
+            if provider.get("options"):
+                body["options"] = dict(provider["options"])
+
+        if provider.get("keep_alive"):
+            body["keep_alive"] = provider["keep_alive"]
+
+        return body
+
     async def _call_api_stream(
         self,
-        url: str,
+        provider: Dict,
         messages: List[Dict[str, str]],
-        model: str,
-        key: str = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        timeouts: Optional[PhaseTimeouts] = None
     ) -> AsyncGenerator[str, None]:
-        """Chiamata HTTP all'API con streaming"""
-        
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            request_body = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "stream": True 
-            }
-
-            if "11434" in url or "zucchetti" in url:
-                request_body["options"] = {
-                    "num_ctx": 4096,  
-                    "num_gpu": 999, 
-                    "num_thread": 8  
-                }
-
-            headers = {"Content-Type": "application/json"}
-            if key:
-                headers["Authorization"] = f"Bearer {key}"
-            
-            async with client.stream(
-                "POST",
-                url,
-                headers=headers,
-                json=request_body,
-            ) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data_str = line[6:].strip()
-                        
-                        if data_str == "[DONE]":
-                            break
-                        
-                        try:
-                            chunk = json.loads(data_str)
-                            delta = chunk["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
-                            if content:
+        """
+        Chiamata HTTP all'API con streaming sul client condiviso del provider.
+
+        Scadenze per fase: `connect` per aprire la connessione, `first_token`
+        dall'invio della richiesta al primo chunk, `idle` tra un chunk e il
+        successivo. Uno stream bloccato fallisce in pochi secondi e il fallback
+        parte subito invece di attendere il timeout complessivo.
+        """
+
+        url = provider["url"]
+        client = self._get_client(provider)
+        timeouts = timeouts or self._timeout_policy.resolve(self._provider_key(provider))
+        loop = asyncio.get_running_loop()
+
+        request_body = self._request_body(provider, messages, temperature, stream=True)
+        headers = self._request_headers(provider)
+
+        http_timeout = httpx.Timeout(
+            connect=timeouts.connect,
+            read=None,
+            write=timeouts.connect,
+            pool=timeouts.connect
+        )
+        phase, phase_seconds = "first_token", timeouts.first_token
+
+        try:
+            async with asyncio.timeout(phase_seconds) as deadline:
+                async with client.stream(
+                    "POST",
+                    url,
+                    headers=headers,
+                    json=request_body,
+                    timeout=http_timeout,
+                ) as response:
+                    self._rate_limiters[self._provider_key(provider)].update_from_headers(response.headers)
+
+                    if response.status_code in (429, 503):
+                        raise TransientProviderError(
+                            response.status_code,
+                            parse_duration(response.headers.get("retry-after"))
+                        )
+                    response.raise_for_status()
+
+                    decoder = OllamaNDJSONDecoder() if provider.get("protocol") == "ollama" else SSEDecoder()
+                    try:
+                        async for data in response.aiter_bytes():
+                            for content in decoder.feed(data):
+                                # Nessuna scadenza mentre il chiamante elabora il chunk
+                                deadline.reschedule(None)
+                                yield content
+                                phase, phase_seconds = "idle", timeouts.idle
+                                deadline.reschedule(loop.time() + phase_seconds)
+                            if decoder.done:
+                                break
+                        else:
+                            for content in decoder.finish():
+                                deadline.reschedule(None)
                                 yield content
-                        except (json.JSONDecodeError, KeyError, IndexError):
-                            continue
-                            
+                    finally:
+                        self._record_malformed_frames(provider, decoder)
+        except TimeoutError:
+            raise ProviderTimeoutError(provider.get("name", url), phase, phase_seconds)
+        except httpx.ConnectTimeout:
+            raise ProviderTimeoutError(provider.get("name", url), "connect", timeouts.connect)
+
     async def generate_completion_stream(
         self,
         messages: List[Dict[str, str]],
         model: str = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        operation: Optional[str] = None
     ) -> AsyncGenerator[str, None]:
-        """Implementazione obbligatoria per lo streaming con fallback"""
-        last_error = None
-        
-        for provider in self._providers:
-            if not provider.get("url") or not provider.get("model"):
-                continue
-                
-            try:
-                async for chunk in self._call_api_stream(
-                    provider["url"], messages, provider["model"], provider.get("key"), temperature
-                ):
-                    yield chunk
-                
-                return
-                
-            except Exception as e:
-                print(f"[{provider['name']}] Streaming fallito: {str(e)}. Passo al prossimo fallback...", flush=True)
-                last_error = e
-                
-        raise Exception(f"Nessun servizio AI disponibile per lo streaming. Ultimo errore: {str(last_error)}")
+        """
+        Implementazione obbligatoria per lo streaming con fallback.
+        Chiudere questo generatore chiude subito anche lo stream verso il provider.
+        """
+        stream = self._stream_with_failover(
+            messages, temperature, operation, error_context=" per lo streaming"
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    # ========== Health Probe ==========
+
+    @staticmethod
+    def _request_headers(provider: Dict) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if provider.get("key"):
+            headers["Authorization"] = f"Bearer {provider['key']}"
+        return headers
+
+    async def _probe_provider(self, provider: Dict) -> None:
+        """
+        Sonda minima: completion di un solo token, senza streaming.
+        Usa il client condiviso (connessioni del pool già aperte per gli utenti)
+        e con `keep_alive` tiene il modello Ollama caricato in memoria.
+        Un 429 indica un provider raggiungibile, solo in rate limit.
+        La sonda consuma il rate limit lato client come una richiesta reale;
+        con il bucket esaurito dagli utenti la sonda non parte.
+        """
+        key = self._provider_key(provider)
+        timeouts = self._timeout_policy.resolve(key)
+        messages = [{"role": "user", "content": "ping"}]
+
+        try:
+            await self._rate_limiters[key].acquire(self._budgets[key].estimate(messages) + 1)
+        except RateLimitExceeded:
+            return
+
+        request_body = self._request_body(
+            provider,
+            messages,
+            temperature=0,
+            stream=False,
+            max_tokens=1
+        )
+
+        try:
+            async with asyncio.timeout(timeouts.connect + timeouts.first_token):
+                response = await self._get_client(provider).post(
+                    provider["url"],
+                    headers=self._request_headers(provider),
+                    json=request_body
+                )
+        except TimeoutError:
+            raise ProviderTimeoutError(provider.get("name", provider["url"]), "probe", timeouts.connect + timeouts.first_token)
+
+        self._rate_limiters[key].update_from_headers(response.headers)
+        if response.status_code != 429:
+            response.raise_for_status()
+
+    def get_readiness(self) -> Dict:
+        """
+        Stato di readiness: pronto se almeno un provider sondato risulta pronto
+        (sonda o ultima richiesta reale) oppure se un provider non sondato ha il
+        circuito non aperto. Senza sonde conta solo lo stato dei circuiti.
+        """
+        probing = self._probing_enabled
+        serving = any(
+            self._breakers[self._provider_key(p)].state != CircuitState.OPEN
+            for p in self._providers
+            if p.get("url") and p.get("model") and not (probing and self._prober.covers(p))
+        )
+        ready = serving or (probing and self._prober.is_ready())
+        return {"ready": ready, "providers": self._prober.snapshot()}
 
     async def validate_connection(self) -> bool:
         """
         Implementazione obbligatoria del contratto.
-        Per ora restituiamo sempre True, visto che il nostro fallback 
-        garantisce che proveremo tutte le connessioni al momento della chiamata.
+        Usa l'esito delle sonde; se nessuna sonda è ancora stata eseguita,
+        sonda subito tutti i provider.
         """
-        return True
\ No newline at end of file
+        if not self._prober.has_providers():
+            # Nessun provider da sondare (es. solo provider cloud a consumo)
+            return True
+        if not self._prober.has_probed():
+            await self._prober.probe_all()
+        return self._prober.is_ready()
@@ -0,0 +1,172 @@
+"""
+Output Adapter Support: Provider Router
+Ordinamento adattivo dei provider in base a latenza, throughput ed errori
+"""
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class ProviderStats:
+    """Statistiche EWMA di un provider"""
+    ttft: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    parse_success_rate: float = 1.0
+    samples: int = 0
+
+
+class ProviderRouter:
+    """
+    Router adattivo: mantiene medie mobili esponenziali (EWMA) per provider di
+    time-to-first-token, token al secondo, tasso di errore e tasso di JSON valido,
+    e ordina i provider per costo atteso della richiesta.
+
+    - I provider senza campioni mantengono la posizione statica di LLM_FALLBACK_ORDER
+      finché non hanno statistiche.
+    - Una frazione `explore_ratio` delle richieste mette in testa un provider a caso,
+      così anche i provider sfavoriti ricevono traffico e le statistiche restano fresche.
+    - Le statistiche vengono salvate in `stats_path` per non ripartire a freddo.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        expected_output_tokens: int = 400,
+        explore_ratio: float = 0.05,
+        stats_path: Optional[str] = None,
+        save_interval: float = 60.0,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._alpha = alpha
+        self._expected_output_tokens = expected_output_tokens
+        self._explore_ratio = explore_ratio
+        self._stats_path = stats_path
+        self._save_interval = save_interval
+        self._rng = rng
+        self._clock = clock
+
+        self._stats: Dict[str, ProviderStats] = {}
+        self._last_save = clock()
+        self.load()
+
+    # ========== Feedback ==========
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return self._alpha * sample + (1 - self._alpha) * current
+
+    def _get(self, provider_key: str) -> ProviderStats:
+        return self._stats.setdefault(provider_key, ProviderStats())
+
+    def record_success(
+        self,
+        provider_key: str,
+        ttft: float,
+        chunk_count: int,
+        generation_seconds: float
+    ) -> None:
+        """Registra una completion riuscita (i chunk SSE approssimano i token)"""
+        stats = self._get(provider_key)
+        stats.ttft = self._ewma(stats.ttft, ttft)
+        if chunk_count > 1 and generation_seconds > 0:
+            stats.tokens_per_second = self._ewma(
+                stats.tokens_per_second,
+                (chunk_count - 1) / generation_seconds
+            )
+        stats.error_rate = self._ewma(stats.error_rate, 0.0)
+        stats.samples += 1
+        self._maybe_save()
+
+    def record_failure(self, provider_key: str) -> None:
+        """Registra un errore del provider"""
+        stats = self._get(provider_key)
+        stats.error_rate = self._ewma(stats.error_rate, 1.0)
+        stats.samples += 1
+        self._maybe_save()
+
+    def record_parse_result(self, provider_key: str, success: bool) -> None:
+        """Registra se la risposta del provider conteneva un JSON valido"""
+        stats = self._get(provider_key)
+        stats.parse_success_rate = self._ewma(stats.parse_success_rate, 1.0 if success else 0.0)
+
+    # ========== Routing ==========
+
+    def expected_cost(self, provider_key: str) -> Optional[float]:
+        """
+        Secondi attesi per una risposta utile: TTFT + generazione, divisi per la
+        probabilità che la risposta sia valida. None se il provider non ha campioni.
+        """
+        stats = self._stats.get(provider_key)
+        if stats is None or stats.ttft is None:
+            return None
+
+        cost = stats.ttft
+        if stats.tokens_per_second:
+            cost += self._expected_output_tokens / stats.tokens_per_second
+
+        reliability = (1.0 - stats.error_rate) * stats.parse_success_rate
+        return cost / max(reliability, 0.05)
+
+    def order(self, providers: List[Dict], key: Callable[[Dict], str]) -> List[Dict]:
+        """Ordina i provider per costo atteso crescente"""
+        if len(providers) < 2:
+            return list(providers)
+
+        known = sorted(
+            (p for p in providers if self.expected_cost(key(p)) is not None),
+            key=lambda p: self.expected_cost(key(p))
+        )
+        known_iter = iter(known)
+
+        # I provider senza statistiche restano al loro posto, gli altri vengono riordinati
+        ordered = [
+            p if self.expected_cost(key(p)) is None else next(known_iter)
+            for p in providers
+        ]
+
+        if self._rng() < self._explore_ratio:
+            explored = ordered.pop(int(self._rng() * len(ordered)) % len(ordered))
+            ordered.insert(0, explored)
+
+        return ordered
+
+    # ========== Persistenza ==========
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Statistiche serializzabili per diagnostica e persistenza"""
+        return {name: asdict(stats) for name, stats in self._stats.items()}
+
+    def load(self) -> None:
+        """Carica le statistiche salvate, se presenti"""
+        if not self._stats_path or not os.path.exists(self._stats_path):
+            return
+        try:
+            with open(self._stats_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._stats = {name: ProviderStats(**values) for name, values in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[Router] Statistiche non caricate da {self._stats_path}: {e}", flush=True)
+
+    def save(self) -> None:
+        """Salva le statistiche su file in modo atomico"""
+        if not self._stats_path:
+            return
+        tmp_path = f"{self._stats_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self._stats_path)
+        except OSError as e:
+            print(f"[Router] Statistiche non salvate in {self._stats_path}: {e}", flush=True)
+        self._last_save = self._clock()
+
+    def _maybe_save(self) -> None:
+        if self._stats_path and self._clock() - self._last_save >= self._save_interval:
+            self.save()
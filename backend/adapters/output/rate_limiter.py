@@ -0,0 +1,204 @@
+"""
+Output Adapter Support: Rate Limiter
+Token bucket per provider alimentato dagli header di rate limit (x-ratelimit-*, Retry-After)
+"""
+import asyncio
+import re
+import time
+from typing import Callable, Mapping, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Il provider è in rate limit oltre l'attesa massima consentita"""
+
+    def __init__(self, provider_name: str, wait_seconds: float):
+        super().__init__(f"Rate limit di {provider_name}: disponibile tra {wait_seconds:.1f}s")
+        self.wait_seconds = wait_seconds
+
+
+class TransientProviderError(Exception):
+    """Risposta 429/503 transitoria, ripetibile dopo `retry_after` secondi"""
+
+    def __init__(self, status_code: int, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status_code} transitorio dal provider")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Converte una durata degli header in secondi.
+    Supporta numeri ("12", "0.5") e il formato Groq/OpenAI ("1m30.5s", "250ms", "2h").
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+
+    factors = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * factors[unit] for number, unit in parts)
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Token bucket con capacità e ricarica aggiornabili a runtime"""
+
+    def __init__(
+        self,
+        capacity: Optional[float] = None,
+        refill_per_second: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self._tokens is not None and self.refill_per_second:
+            self._tokens = min(
+                self.capacity if self.capacity is not None else float("inf"),
+                self._tokens + (now - self._updated) * self.refill_per_second
+            )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Secondi da attendere prima di poter consumare `amount` (0 se illimitato)"""
+        self._refill()
+        if self._tokens is None or self._tokens >= amount:
+            return 0.0
+        if not self.refill_per_second:
+            return float("inf")
+        return (amount - self._tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        if self._tokens is not None:
+            self._tokens -= amount
+
+    def update(self, limit: Optional[float], remaining: Optional[float], reset_seconds: Optional[float]) -> None:
+        """Riallinea il bucket a quanto dichiarato dal provider negli header"""
+        self._refill()
+        if limit is not None:
+            self.capacity = limit
+        if remaining is not None:
+            self._tokens = remaining
+            if reset_seconds and self.capacity is not None:
+                # Il provider torna a piena capacità allo scadere del reset
+                refill = max(self.capacity - remaining, 0.0) / reset_seconds
+                if refill > 0:
+                    self.refill_per_second = refill
+
+    def snapshot(self) -> dict:
+        self._refill()
+        return {"capacity": self.capacity, "available": self._tokens}
+
+
+class ProviderRateLimiter:
+    """
+    Limiter di un provider: un bucket per le richieste e uno per i token.
+    I limiti possono essere configurati (RPM/TPM) e vengono poi aggiornati dagli
+    header x-ratelimit-* di ogni risposta; Retry-After blocca il provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_wait: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._name = name
+        self._max_wait = max_wait
+        self._clock = clock
+        self._blocked_until = 0.0
+        self.requests = TokenBucket(
+            requests_per_minute,
+            requests_per_minute / 60.0 if requests_per_minute else None,
+            clock
+        )
+        self.tokens = TokenBucket(
+            tokens_per_minute,
+            tokens_per_minute / 60.0 if tokens_per_minute else None,
+            clock
+        )
+
+    def _wait_time(self, estimated_tokens: float) -> float:
+        blocked = max(0.0, self._blocked_until - self._clock())
+        return max(
+            blocked,
+            self.requests.wait_time(1),
+            self.tokens.wait_time(min(estimated_tokens, self.tokens.capacity or estimated_tokens))
+        )
+
+    async def acquire(self, estimated_tokens: float) -> None:
+        """
+        Prenota richieste e token, poi attende che siano disponibili.
+        La prenotazione avviene prima dell'attesa: con più richieste concorrenti
+        ognuna attende anche le precedenti e le partenze restano cadenzate.
+
+        Raises:
+            RateLimitExceeded: se l'attesa supererebbe `max_wait` (meglio il fallback)
+        """
+        wait = self._wait_time(estimated_tokens)
+        if wait > self._max_wait:
+            raise RateLimitExceeded(self._name, wait)
+
+        self.requests.consume(1)
+        self.tokens.consume(estimated_tokens)
+        if wait > 0:
+            print(f"[{self._name}] Rate limit: attendo {wait:.2f}s prima della richiesta", flush=True)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Richiesta annullata durante l'attesa: la prenotazione torna disponibile
+                self.requests.consume(-1)
+                self.tokens.consume(-estimated_tokens)
+                raise
+
+    def block_for(self, seconds: float) -> None:
+        """Blocca il provider (es. dopo un 429 con Retry-After)"""
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Aggiorna i bucket con gli header x-ratelimit-* e Retry-After"""
+        self.requests.update(
+            _parse_number(headers.get("x-ratelimit-limit-requests")),
+            _parse_number(headers.get("x-ratelimit-remaining-requests")),
+            parse_duration(headers.get("x-ratelimit-reset-requests"))
+        )
+        self.tokens.update(
+            _parse_number(headers.get("x-ratelimit-limit-tokens")),
+            _parse_number(headers.get("x-ratelimit-remaining-tokens")),
+            parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        )
+
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after:
+            self.block_for(retry_after)
+
+    def snapshot(self) -> dict:
+        return {
+            "blocked_for": round(max(0.0, self._blocked_until - self._clock()), 3),
+            "requests": self.requests.snapshot(),
+            "tokens": self.tokens.snapshot()
+        }
@@ -0,0 +1,207 @@
+"""
+Output Adapter: Response Cache
+Cache a due livelli delle risposte LLM: LRU in memoria con TTL e SQLite su disco
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from application.ports.output import IResponseCache
+
+
+def cache_key(
+    operation: Optional[str],
+    messages: List[Dict[str, str]],
+    temperature: float,
+    model_key: str
+) -> str:
+    """
+    Chiave content-addressed di una richiesta.
+    I messaggi contengono già i parametri dell'operazione resi dal prompt
+    builder; il testo viene normalizzato (Unicode NFC, spazi finali) perché
+    input equivalenti producano la stessa chiave.
+    """
+    normalized = [
+        {
+            "role": m.get("role", ""),
+            "content": unicodedata.normalize("NFC", m.get("content", "")).rstrip()
+        }
+        for m in messages
+    ]
+    payload = json.dumps(
+        {"op": operation or "", "t": round(temperature, 3), "model": model_key, "messages": normalized},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """
+    Livello su disco: sopravvive ai riavvii ed è condiviso tra i worker
+    (WAL + busy timeout). Oltre `max_bytes` elimina le voci usate meno di recente.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float, clock: Callable[[], float]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    def get(self, key: str) -> Tuple[Optional[str], bool]:
+        """Restituisce (valore, scaduto)"""
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            if now - row[1] > self._ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None, True
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[0], False
+
+    def set(self, key: str, value: str) -> int:
+        """Memorizza il valore e restituisce il numero di voci eliminate per spazio"""
+        now = self._clock()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self._ttl,))
+
+            evicted = 0
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            while total > self._max_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+                total -= row[1]
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TwoTierResponseCache(IResponseCache):
+    """
+    Cache delle risposte a due livelli.
+    - memoria: LRU con al massimo `max_entries` voci e scadenza `ttl`
+    - disco (facoltativo): SQLite limitato a `disk_max_bytes`, promosso in
+      memoria a ogni hit
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 24 * 3600,
+        sqlite_path: Optional[str] = None,
+        disk_max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.time
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disk = _SQLiteTier(sqlite_path, disk_max_bytes, ttl, clock) if sqlite_path else None
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0
+        }
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, created = entry
+        if self._clock() - created > self._ttl:
+            del self._memory[key]
+            self._stats["expired"] += 1
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str, created: Optional[float] = None) -> None:
+        self._memory[key] = (value, created if created is not None else self._clock())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is not None:
+            self._stats["memory_hits"] += 1
+            return value
+
+        if self._disk is not None:
+            value, expired = await asyncio.to_thread(self._disk.get, key)
+            if expired:
+                self._stats["expired"] += 1
+            if value is not None:
+                self._stats["disk_hits"] += 1
+                self._memory_set(key, value)
+                return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self._memory_set(key, value)
+        if self._disk is not None:
+            self._stats["disk_evictions"] += await asyncio.to_thread(self._disk.set, key, value)
+
+    async def delete(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.delete, key)
+
+    def stats(self) -> dict:
+        lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = lookups - self._stats["misses"]
+        return {
+            **self._stats,
+            "memory_entries": len(self._memory),
+            "hit_ratio": round(hits / lookups, 3) if lookups else None
+        }
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
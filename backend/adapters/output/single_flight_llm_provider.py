@@ -0,0 +1,106 @@
+"""
+Output Adapter: Single-Flight LLM Provider
+Decorator di ILLMProvider che unisce le richieste identiche in corso in un'unica chiamata
+"""
+import asyncio
+from typing import AsyncGenerator, Dict, List, Optional
+
+from application.ports.output import ILLMProvider
+
+from .response_cache import cache_key
+
+
+class _Flight:
+    """Chiamata condivisa e numero di richieste in attesa del suo risultato"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlightLLMProvider(ILLMProvider):
+    """
+    Le richieste concorrenti con gli stessi messaggi, operazione e temperatura
+    condividono una sola chiamata al provider e ricevono tutte il risultato.
+
+    La chiamata gira in un task separato: se un client si disconnette viene
+    annullata solo la sua attesa. Quando se ne va l'ultimo in attesa, la
+    chiamata viene annullata e lo stream verso il provider chiuso.
+    """
+
+    def __init__(self, inner: ILLMProvider):
+        self._inner = inner
+        self._flights: Dict[str, _Flight] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    async def generate_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> str:
+        key = cache_key(operation, messages, temperature, model or "")
+        flight = self._flights.get(key)
+
+        if flight is None:
+            self._calls += 1
+            flight = _Flight(asyncio.create_task(self._inner.generate_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                operation=operation
+            )))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self._coalesced += 1
+            print(f"Richiesta '{operation}' identica già in corso: attendo il suo risultato", flush=True)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                print(f"Nessun client in attesa di '{operation}': annullo la chiamata al provider", flush=True)
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def generate_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = 0.1,
+        operation: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """Gli stream non vengono condivisi: ogni client riceve i propri chunk"""
+        stream = self._inner.generate_completion_stream(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            operation=operation
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    async def report_parse_result(self, raw_response: str, success: bool) -> None:
+        await self._inner.report_parse_result(raw_response, success)
+
+    async def validate_connection(self) -> bool:
+        return await self._inner.validate_connection()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "upstream_calls": self._calls,
+            "coalesced": self._coalesced
+        }
@@ -0,0 +1,191 @@
+"""
+Output Adapter Support: SSE Decoder
+Decoder incrementali a livello di byte per gli stream dei provider:
+SSE in formato OpenAI e NDJSON dell'API nativa di Ollama
+"""
+import json
+from typing import List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover - dipende dall'ambiente
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+_DONE = b"[DONE]"
+_CONTENT_KEY = b'"content"'
+_ERROR_KEY = b'"error"'
+
+
+def _provider_error(error) -> RuntimeError:
+    message = error.get("message", error) if isinstance(error, dict) else error
+    return RuntimeError(f"Errore dal provider: {message}")
+
+
+def _extract_content(payload: bytes) -> Optional[str]:
+    """
+    Estrae choices[0].delta.content da un payload JSON.
+    Restituisce "" per i frame validi senza testo (ruolo, finish_reason, usage)
+    e None per i frame non interpretabili.
+
+    Raises:
+        RuntimeError: frame di errore del provider ({"error": {...}})
+    """
+    if _CONTENT_KEY not in payload and _ERROR_KEY not in payload:
+        # Frame di solo ruolo/finish_reason/usage: nessun parsing necessario
+        return ""
+    try:
+        data = _loads(payload)
+        if data.get("error"):
+            raise _provider_error(data["error"])
+        choices = data.get("choices")
+        if not choices:
+            return ""
+        return choices[0].get("delta", {}).get("content") or ""
+    except (ValueError, AttributeError, TypeError, IndexError):
+        return None
+
+
+class SSEDecoder:
+    """
+    Decoder SSE incrementale: riceve i byte così come arrivano dalla rete e
+    restituisce il testo dei delta completi.
+
+    - gli eventi terminano con una riga vuota; più righe `data:` dello stesso
+      evento vengono unite con "\\n" come da specifica
+    - le righe di commento (":") e i campi diversi da `data` vengono ignorati
+    - `[DONE]` chiude lo stream (`done`)
+    - i frame non interpretabili non vengono scartati in silenzio: sono contati
+      in `malformed` e il primo è conservato in `malformed_sample`
+    - un frame di errore del provider ({"error": ...}) interrompe lo stream con
+      un'eccezione, così fallback e circuit breaker lo vedono come un errore
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self._data: List[bytes] = []
+        self.done = False
+        self.malformed = 0
+        self.malformed_sample: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> List[str]:
+        """Aggiunge i byte ricevuti e restituisce i contenuti degli eventi completati"""
+        if self.done:
+            return []
+
+        buffer = self._buffer + data if self._buffer else data
+        lines = buffer.split(b"\n")
+        self._buffer = lines.pop()
+
+        contents: List[str] = []
+        for line in lines:
+            self._process_line(line, contents)
+            if self.done:
+                break
+        return contents
+
+    def finish(self) -> List[str]:
+        """Da chiamare a fine stream: chiude l'ultimo evento se manca la riga vuota"""
+        contents: List[str] = []
+        if self._buffer and not self.done:
+            self._process_line(self._buffer, contents)
+        self._buffer = b""
+        if self._data and not self.done:
+            self._dispatch(contents)
+        return contents
+
+    def _process_line(self, line: bytes, contents: List[str]) -> None:
+        if line.endswith(b"\r"):
+            line = line[:-1]
+
+        if not line:
+            if self._data:
+                self._dispatch(contents)
+            return
+
+        if line.startswith(b"data:"):
+            value = line[5:]
+            if value.startswith(b" "):
+                value = value[1:]
+            self._data.append(value)
+
+    def _dispatch(self, contents: List[str]) -> None:
+        data, self._data = self._data, []
+        payload = data[0] if len(data) == 1 else b"\n".join(data)
+
+        if payload.strip() == _DONE:
+            self.done = True
+            return
+
+        content = _extract_content(payload)
+        if content is None and len(data) > 1:
+            # Provider non conformi inviano più eventi senza riga vuota di separazione
+            parts = [_extract_content(part) for part in data if part.strip() != _DONE]
+            if all(part is not None for part in parts):
+                self.done = any(part.strip() == _DONE for part in data)
+                contents.extend(part for part in parts if part)
+                return
+
+        if content is None:
+            self.malformed += 1
+            if self.malformed_sample is None:
+                self.malformed_sample = payload[:200]
+        elif content:
+            contents.append(content)
+
+
+class OllamaNDJSONDecoder:
+    """
+    Decoder incrementale per /api/chat di Ollama: un oggetto JSON per riga,
+    con il testo in message.content e "done": true sull'ultima riga.
+    Stessa interfaccia di SSEDecoder (feed, finish, done, malformed).
+    Un oggetto con "error" interrompe lo stream con un'eccezione.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self.done = False
+        self.malformed = 0
+        self.malformed_sample: Optional[bytes] = None
+
+    def feed(self, data: bytes) -> List[str]:
+        if self.done:
+            return []
+
+        buffer = self._buffer + data if self._buffer else data
+        lines = buffer.split(b"\n")
+        self._buffer = lines.pop()
+
+        contents: List[str] = []
+        for line in lines:
+            self._process_line(line, contents)
+            if self.done:
+                break
+        return contents
+
+    def finish(self) -> List[str]:
+        contents: List[str] = []
+        if self._buffer and not self.done:
+            self._process_line(self._buffer, contents)
+        self._buffer = b""
+        return contents
+
+    def _process_line(self, line: bytes, contents: List[str]) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            data = _loads(line)
+            if data.get("error"):
+                raise _provider_error(data["error"])
+            content = (data.get("message") or {}).get("content") or ""
+            self.done = bool(data.get("done"))
+        except (ValueError, AttributeError, TypeError):
+            self.malformed += 1
+            if self.malformed_sample is None:
+                self.malformed_sample = line[:200]
+            return
+        if content:
+            contents.append(content)
@@ -0,0 +1,98 @@
+"""
+Output Adapter Support: Stream Resume
+Ripresa di una generazione interrotta su un altro provider, senza duplicare il testo
+"""
+from typing import Dict, List
+
+CONTINUATION_INSTRUCTION = (
+    "La tua risposta precedente si è interrotta a metà. "
+    "Continua ESATTAMENTE dal punto in cui si è interrotta, carattere per carattere, "
+    "senza ripetere nulla di quanto già scritto e senza aggiungere commenti o introduzioni. "
+    "Mantieni lo stesso formato (incluso l'oggetto JSON, se presente)."
+)
+
+
+def build_continuation_messages(
+    messages: List[Dict[str, str]],
+    partial_output: str
+) -> List[Dict[str, str]]:
+    """Aggiunge alla conversazione l'output parziale e la richiesta di proseguire"""
+    return [
+        *messages,
+        {"role": "assistant", "content": partial_output},
+        {"role": "user", "content": CONTINUATION_INSTRUCTION},
+    ]
+
+
+class BoundaryDeduplicator:
+    """
+    Rimuove la parte ripetuta all'inizio della continuazione.
+
+    I modelli spesso riprendono ripetendo le ultime parole già inviate, o
+    ricominciano da capo. Il deduplicatore trattiene i primi `window` caratteri
+    della continuazione e poi:
+    - se la continuazione ripete l'output dall'inizio, ne scarta la replica
+      finché coincide con l'output già inviato (da lì in poi il testo passa)
+    - altrimenti scarta la sovrapposizione più lunga tra la coda dell'output già
+      inviato e l'inizio della continuazione (almeno `min_overlap` caratteri)
+    """
+
+    def __init__(self, previous_output: str, window: int = 200, min_overlap: int = 4):
+        self._previous = previous_output
+        self._window = window
+        self._min_overlap = min_overlap
+        self._buffer = ""
+        self._decided = False
+        self._replaying = False
+        self._replayed = 0
+
+    def feed(self, chunk: str) -> str:
+        """Restituisce la parte del chunk da inoltrare al client"""
+        if self._decided:
+            return self._skip(chunk)
+
+        self._buffer += chunk
+        if len(self._buffer) < self._window and len(self._buffer) < len(self._previous):
+            return ""
+        return self._decide()
+
+    def finish(self) -> str:
+        """Da chiamare a fine stream: rilascia quanto ancora trattenuto"""
+        if self._decided:
+            return ""
+        return self._decide()
+
+    def _decide(self) -> str:
+        self._decided = True
+        buffer, self._buffer = self._buffer, ""
+        previous = self._previous
+
+        probe = min(len(previous), len(buffer), self._window)
+        if probe >= self._min_overlap and buffer[:probe] == previous[:probe]:
+            # Il modello ha ricominciato da capo: salta la replica dell'output già inviato
+            self._replaying = True
+            return self._skip(buffer)
+
+        max_overlap = min(len(previous), len(buffer))
+        for size in range(max_overlap, self._min_overlap - 1, -1):
+            if previous.endswith(buffer[:size]):
+                return buffer[size:]
+        return buffer
+
+    def _skip(self, chunk: str) -> str:
+        """Scarta solo i caratteri che coincidono con l'output già inviato"""
+        if not self._replaying:
+            return chunk
+        previous = self._previous
+        index = 0
+        while (
+            index < len(chunk)
+            and self._replayed < len(previous)
+            and chunk[index] == previous[self._replayed]
+        ):
+            index += 1
+            self._replayed += 1
+        if index < len(chunk):
+            # Replica completa o divergente: il resto è testo nuovo
+            self._replaying = False
+        return chunk[index:]
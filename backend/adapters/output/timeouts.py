@@ -0,0 +1,52 @@
+"""
+Output Adapter Support: Phase Timeouts
+Timeout separati per connessione, primo token e inattività tra i chunk
+"""
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class PhaseTimeouts:
+    """Scadenze (secondi) delle fasi di una chiamata in streaming"""
+    connect: float = 5.0
+    first_token: float = 30.0
+    idle: float = 20.0
+
+    def override(self, values: Optional[Dict[str, float]]) -> "PhaseTimeouts":
+        """Restituisce una copia con i soli campi specificati sovrascritti"""
+        if not values:
+            return self
+        return replace(self, **{k: v for k, v in values.items() if v is not None})
+
+
+class ProviderTimeoutError(Exception):
+    """Il provider non ha rispettato la scadenza di una fase"""
+
+    def __init__(self, provider_name: str, phase: str, seconds: float):
+        super().__init__(f"Timeout '{phase}' di {provider_name} dopo {seconds:g}s")
+        self.phase = phase
+        self.seconds = seconds
+
+
+class TimeoutPolicy:
+    """
+    Risolve i timeout per provider e operazione.
+    Precedenza: default < provider < operazione (es. generate ha tempi più lunghi).
+    """
+
+    def __init__(
+        self,
+        default: Optional[PhaseTimeouts] = None,
+        per_provider: Optional[Dict[str, Dict[str, float]]] = None,
+        per_operation: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self._default = default or PhaseTimeouts()
+        self._per_provider = per_provider or {}
+        self._per_operation = per_operation or {}
+
+    def resolve(self, provider_key: str, operation: Optional[str] = None) -> PhaseTimeouts:
+        timeouts = self._default.override(self._per_provider.get(provider_key))
+        if operation:
+            timeouts = timeouts.override(self._per_operation.get(operation))
+        return timeouts
@@ -0,0 +1,122 @@
+"""
+Output Adapter Support: Token Budget
+Stima locale dei token e profili di capacità (contesto, output massimo) dei provider
+"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Caratteri per token medi su testo italiano/inglese, per famiglia di tokenizer.
+# Valori prudenti: meglio sovrastimare che troncare il prompt.
+_CHARS_PER_TOKEN = {
+    "gpt": 3.8,
+    "llama3": 3.6,
+    "llama": 3.0,
+    "mistral": 3.1,
+    "mixtral": 3.1,
+    "qwen": 3.4,
+    "gemma": 3.7,
+    "phi": 3.2,
+    "deepseek": 3.4,
+    "gemini": 3.8,
+    "claude": 3.5,
+    "kimi": 3.6,
+    "command": 3.8,
+}
+_DEFAULT_CHARS_PER_TOKEN = 3.0
+
+# Finestra di contesto e output atteso (token) di default per famiglia: l'output
+# atteso dimensiona num_ctx e il controllo del contesto, ma non limita la risposta
+_CONTEXT_WINDOWS = {
+    "gpt": (128000, 4096),
+    "llama3": (8192, 2048),
+    "llama3.1": (131072, 8192),
+    "llama3.2": (131072, 8192),
+    "llama3.3": (131072, 8192),
+    "mistral": (32768, 4096),
+    "mixtral": (32768, 4096),
+    "qwen": (32768, 8192),
+    "gemma": (8192, 2048),
+    "phi": (4096, 1024),
+    "deepseek": (65536, 8192),
+    "gemini": (1048576, 8192),
+    "claude": (200000, 8192),
+    "kimi": (131072, 8192),
+    "command": (128000, 4096),
+}
+# Famiglia sconosciuta: nessun filtro sul contesto; la finestra serve solo al num_ctx di Ollama
+_DEFAULT_PROFILE = (4096, 1024)
+
+# Token aggiuntivi per messaggio (ruolo e delimitatori del chat template)
+_MESSAGE_OVERHEAD = 4
+
+_FAMILY = re.compile(
+    r"(gpt|llama-?3\.\d|llama-?3|llama|mixtral|mistral|qwen|gemma|gemini|phi|deepseek|claude|kimi|command)"
+)
+
+
+def model_family(model: Optional[str]) -> str:
+    """Famiglia del modello dal nome (es. "llama-3.1-8b-instant" -> "llama3.1")"""
+    match = _FAMILY.search((model or "").lower())
+    return match.group(1).replace("-", "") if match else ""
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """
+    Profilo di capacità di un provider e stima dei token dei suoi prompt.
+    Senza famiglia nota né contesto configurato il provider non viene filtrato.
+    La risposta è limitata solo da un max_output configurato o, con contesto
+    noto, dallo spazio che il prompt lascia nella finestra.
+    """
+    context_window: int
+    max_output: int
+    chars_per_token: float
+    known_context: bool = True
+    output_capped: bool = True
+
+    @classmethod
+    def for_provider(cls, provider: Dict) -> "TokenBudget":
+        """Profilo dalla famiglia del modello, con override da configurazione"""
+        family = model_family(provider.get("model"))
+        profile = _CONTEXT_WINDOWS.get(family) or _CONTEXT_WINDOWS.get(family.split(".")[0])
+        context, output = profile or _DEFAULT_PROFILE
+        ratio = _CHARS_PER_TOKEN.get(family) or _CHARS_PER_TOKEN.get(family.split(".")[0], _DEFAULT_CHARS_PER_TOKEN)
+        return cls(
+            context_window=int(provider.get("context_window") or context),
+            max_output=int(provider.get("max_output") or output),
+            chars_per_token=float(provider.get("chars_per_token") or ratio),
+            known_context=bool(profile or provider.get("context_window")),
+            output_capped=bool(provider.get("max_output"))
+        )
+
+    def estimate(self, messages: List[Dict[str, str]]) -> int:
+        """Stima dei token del prompt"""
+        chars = sum(len(m.get("content", "")) for m in messages)
+        return math.ceil(chars / self.chars_per_token) + _MESSAGE_OVERHEAD * len(messages)
+
+    def fits(self, prompt_tokens: int, min_output: int) -> bool:
+        """True se il prompt lascia spazio ad almeno `min_output` token di risposta"""
+        if not self.known_context:
+            return True
+        return prompt_tokens + min(min_output, self.max_output) <= self.context_window
+
+    def max_tokens(self, prompt_tokens: int) -> Optional[int]:
+        """Token di risposta consentiti dato il prompt (None: nessun limite da inviare)"""
+        room = self.context_window - prompt_tokens if self.known_context else None
+        if self.output_capped:
+            return max(1, min(self.max_output, room)) if room is not None else self.max_output
+        if room is not None and room < self.max_output:
+            # Prompt lungo: la risposta non può comunque superare la finestra
+            return max(1, room)
+        return None
+
+    def num_ctx(self, prompt_tokens: int, step: int = 4096) -> int:
+        """
+        Contesto Ollama per il prompt: prompt più output massimo, arrotondato a
+        multipli di `step` (ogni valore diverso costringe Ollama a ricaricare il
+        modello) e limitato alla finestra del modello.
+        """
+        needed = prompt_tokens + self.max_output
+        return min(self.context_window, max(step, math.ceil(needed / step) * step))
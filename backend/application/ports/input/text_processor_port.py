@@ -3,7 +3,8 @@ Primary Port (Input): Text Processor
 Interfaccia per le operazioni di elaborazione testo
 """
 from abc import ABC, abstractmethod
-from domain.models import TextDocument, LLMResult
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class ITextProcessor(ABC):
@@ -81,6 +82,26 @@ class ITextProcessor(ABC):
         """
         pass
     
+    @abstractmethod
+    def analyze_all_hats(
+        self,
+        document: TextDocument,
+        hats: Optional[List[str]] = None,
+        single_call: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, LLMResult]]:
+        """
+        Analizza un documento con più cappelli in parallelo
+        
+        Args:
+            document: Documento da analizzare
+            hats: Cappelli da utilizzare (default: tutti e sei)
+            single_call: Un'unica richiesta all'LLM per tutti i cappelli
+            
+        Yields:
+            Coppie (cappello, LLMResult) in ordine di completamento
+        """
+        pass
+    
     @abstractmethod
     async def generate(
         self,
@@ -98,3 +119,79 @@ class ITextProcessor(ABC):
             LLMResult: Risultato della generazione
         """
         pass
+    
+    @abstractmethod
+    def summarize_stream(
+        self,
+        document: TextDocument, 
+        percentage: int
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Riassume un documento in streaming
+        
+        Yields:
+            L'LLMOutcome appena disponibile, i frammenti del testo risultante
+            man mano che arrivano e infine l'LLMResult
+        """
+        pass
+    
+    @abstractmethod
+    def improve_stream(
+        self,
+        document: TextDocument, 
+        criterion: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Migliora un documento in streaming
+        
+        Yields:
+            L'LLMOutcome appena disponibile, i frammenti del testo risultante
+            man mano che arrivano e infine l'LLMResult
+        """
+        pass
+    
+    @abstractmethod
+    def translate_stream(
+        self,
+        document: TextDocument, 
+        target_language: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Traduce un documento in streaming
+        
+        Yields:
+            L'LLMOutcome appena disponibile, i frammenti del testo risultante
+            man mano che arrivano e infine l'LLMResult
+        """
+        pass
+    
+    @abstractmethod
+    def analyze_six_hats_stream(
+        self,
+        document: TextDocument, 
+        hat: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Analizza un documento con un cappello in streaming
+        
+        Yields:
+            L'LLMOutcome appena disponibile, i frammenti del testo risultante
+            man mano che arrivano e infine l'LLMResult
+        """
+        pass
+    
+    @abstractmethod
+    def generate_stream(
+        self,
+        prompt: str,
+        context_text: str = "",
+        word_count: int = 300
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Genera testo in streaming
+        
+        Yields:
+            L'LLMOutcome appena disponibile, i frammenti del testo risultante
+            man mano che arrivano e infine l'LLMResult
+        """
+        pass
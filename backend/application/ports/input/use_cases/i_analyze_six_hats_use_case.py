@@ -5,8 +5,9 @@ Definisce il contratto per l'analisi con metodo Six Thinking Hats.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Tuple, Union
 
-from domain.models import LLMResult, TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class IAnalyzeSixHatsUseCase(ABC):
@@ -48,4 +49,52 @@ class IAnalyzeSixHatsUseCase(ABC):
         Note:
             Non solleva eccezioni. Tutti gli errori sono incapsulati in LLMResult.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def analyze_all_hats(
+        self,
+        document: TextDocument,
+        hats: Optional[List[str]] = None,
+        single_call: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, LLMResult]]:
+        """
+        Analizza documento con più cappelli contemporaneamente
+        
+        Args:
+            document: Documento da analizzare (TextDocument entity)
+            hats: Cappelli da utilizzare (default: tutti e sei)
+            single_call: Se True, un'unica richiesta all'LLM per tutti i
+                         cappelli invece di una per cappello
+            
+        Yields:
+            Coppie (cappello, LLMResult) man mano che ogni analisi termina
+            
+        Note:
+            Non solleva eccezioni per i singoli cappelli: l'errore di uno è
+            riportato nel suo LLMResult e non interrompe gli altri.
+        """
+        pass
+    
+    @abstractmethod
+    def analyze_six_hats_stream(
+        self, 
+        document: TextDocument, 
+        hat: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Analizza il documento con un cappello in streaming
+        
+        Args:
+            document: Documento da analizzare (TextDocument entity)
+            hat: Colore cappello che identifica la prospettiva di analisi
+            
+        Yields:
+            LLMOutcome: Esito, appena il modello lo ha prodotto
+            str: Frammento decodificato del testo risultante, man mano che arriva
+            LLMResult: Risultato finale, sempre come ultimo elemento
+            
+        Note:
+            Non solleva eccezioni. Tutti gli errori sono incapsulati nel LLMResult finale.
+        """
+        pass
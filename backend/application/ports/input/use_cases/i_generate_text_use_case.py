@@ -5,8 +5,9 @@ Definisce il contratto per la generazione di testo originale.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Union
 
-from domain.models import LLMResult
+from domain.models import LLMOutcome, LLMResult
 
 
 class IGenerateTextUseCase(ABC):
@@ -38,4 +39,29 @@ class IGenerateTextUseCase(ABC):
             Utilizza temperatura più alta (0.7) per favorire creatività.
             Non solleva eccezioni. Tutti gli errori sono incapsulati in LLMResult.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def generate_text_stream(
+        self, 
+        prompt: str,
+        context_text: str = "",
+        word_count: int = 300
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Genera testo in streaming
+        
+        Args:
+            prompt: Richiesta utente per generazione testo
+            context_text: Testo di contesto facoltativo
+            word_count: Lunghezza indicativa in parole
+            
+        Yields:
+            LLMOutcome: Esito, appena il modello lo ha prodotto
+            str: Frammento decodificato del testo risultante, man mano che arriva
+            LLMResult: Risultato finale, sempre come ultimo elemento
+            
+        Note:
+            Non solleva eccezioni. Tutti gli errori sono incapsulati nel LLMResult finale.
+        """
+        pass
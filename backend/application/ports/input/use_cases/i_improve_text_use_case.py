@@ -5,8 +5,9 @@ Definisce il contratto per l'operazione di miglioramento testo.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Union
 
-from domain.models import LLMResult, TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class IImproveTextUseCase(ABC):
@@ -42,4 +43,27 @@ class IImproveTextUseCase(ABC):
         Note:
             Non solleva eccezioni. Tutti gli errori sono incapsulati in LLMResult.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def improve_text_stream(
+        self, 
+        document: TextDocument, 
+        criterion: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Migliora il documento in streaming
+        
+        Args:
+            document: Documento da migliorare (TextDocument entity)
+            criterion: Criterio di miglioramento
+            
+        Yields:
+            LLMOutcome: Esito, appena il modello lo ha prodotto
+            str: Frammento decodificato del testo risultante, man mano che arriva
+            LLMResult: Risultato finale, sempre come ultimo elemento
+            
+        Note:
+            Non solleva eccezioni. Tutti gli errori sono incapsulati nel LLMResult finale.
+        """
+        pass
@@ -5,8 +5,9 @@ Definisce il contratto per l'operazione di riassunto documenti.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Union
 
-from domain.models import LLMResult, TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class ISummarizeTextUseCase(ABC):
@@ -45,4 +46,27 @@ class ISummarizeTextUseCase(ABC):
         Note:
             Non solleva eccezioni. Tutti gli errori sono incapsulati in LLMResult.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def summarize_text_stream(
+        self, 
+        document: TextDocument, 
+        percentage: int
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Esegue riassunto del documento in streaming
+        
+        Args:
+            document: Documento da riassumere (TextDocument entity)
+            percentage: Percentuale di riduzione desiderata (range: 10-90)
+            
+        Yields:
+            LLMOutcome: Esito, appena il modello lo ha prodotto
+            str: Frammento decodificato del testo risultante, man mano che arriva
+            LLMResult: Risultato finale, sempre come ultimo elemento
+            
+        Note:
+            Non solleva eccezioni. Tutti gli errori sono incapsulati nel LLMResult finale.
+        """
+        pass
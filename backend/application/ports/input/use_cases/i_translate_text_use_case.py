@@ -5,8 +5,9 @@ Definisce il contratto per l'operazione di traduzione.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Union
 
-from domain.models import LLMResult, TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class ITranslateTextUseCase(ABC):
@@ -44,4 +45,27 @@ class ITranslateTextUseCase(ABC):
             La lingua sorgente viene rilevata automaticamente dall'LLM.
             Non solleva eccezioni. Tutti gli errori sono incapsulati in LLMResult.
         """
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def translate_text_stream(
+        self, 
+        document: TextDocument, 
+        target_language: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """
+        Traduce il documento in streaming
+        
+        Args:
+            document: Documento da tradurre (TextDocument entity)
+            target_language: Lingua di destinazione
+            
+        Yields:
+            LLMOutcome: Esito, appena il modello lo ha prodotto
+            str: Frammento decodificato del testo risultante, man mano che arriva
+            LLMResult: Risultato finale, sempre come ultimo elemento
+            
+        Note:
+            Non solleva eccezioni. Tutti gli errori sono incapsulati nel LLMResult finale.
+        """
+        pass
@@ -1,9 +1,12 @@
 from .llm_provider_port import ILLMProvider
 from .prompt_builder_port import IPromptBuilder
-from .response_parser_port import IResponseParser
+from .response_cache_port import IResponseCache
+from .response_parser_port import IResponseParser, IStreamingResponseParser
 
 __all__ = [
     "ILLMProvider",
     "IPromptBuilder",
-    "IResponseParser"
+    "IResponseCache",
+    "IResponseParser",
+    "IStreamingResponseParser"
 ]
@@ -3,7 +3,7 @@ Secondary Port (Output): LLM Provider
 Interfaccia per comunicare con servizi LLM esterni
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Optional
 
 
 class ILLMProvider(ABC):
@@ -14,7 +14,8 @@ class ILLMProvider(ABC):
         self, 
         messages: List[Dict[str, str]],
         model: str = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        operation: Optional[str] = None
     ) -> str:
         """
         Genera una completion dall'LLM
@@ -23,6 +24,8 @@ class ILLMProvider(ABC):
             messages: Lista di messaggi (system, user, assistant)
             model: Nome del modello da utilizzare
             temperature: Temperatura per la generazione
+            operation: Operazione richiesta (summarize, translate, ...), usata
+                       per timeout e politiche specifiche dell'operazione
             
         Returns:
             str: Testo generato dall'LLM
@@ -34,7 +37,8 @@ class ILLMProvider(ABC):
         self,
         messages: List[Dict[str, str]],
         model: str,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        operation: Optional[str] = None
     ) -> AsyncGenerator[str, None]:
         """
         Genera una completion con streaming
@@ -43,12 +47,25 @@ class ILLMProvider(ABC):
             messages: Lista di messaggi
             model: Nome del modello
             temperature: Temperatura
+            operation: Operazione richiesta (summarize, translate, ...)
             
         Yields:
             str: Chunk di testo generato
         """
         pass
     
+    async def report_parse_result(self, raw_response: str, success: bool) -> None:
+        """
+        Notifica l'esito del parsing di una risposta generata.
+        Facoltativo: i provider che adattano il routing alla qualità delle
+        risposte lo usano per attribuire l'esito al servizio che l'ha prodotta.
+        
+        Args:
+            raw_response: Risposta grezza restituita da generate_completion
+            success: True se la risposta conteneva un JSON valido
+        """
+        return None
+    
     @abstractmethod
     async def validate_connection(self) -> bool:
         """
@@ -82,6 +82,25 @@ class IPromptBuilder(ABC):
         """
         pass
     
+    @abstractmethod
+    def build_multi_hat_prompt(
+        self,
+        document: TextDocument,
+        hats: List[str]
+    ) -> List[Dict[str, str]]:
+        """
+        Costruisce un unico prompt per l'analisi con più cappelli.
+        La risposta attesa è un oggetto JSON con una voce per cappello.
+        
+        Args:
+            document: Documento da analizzare
+            hats: Cappelli da utilizzare
+            
+        Returns:
+            Lista di messaggi per l'LLM
+        """
+        pass
+    
     @abstractmethod
     def build_generate_prompt(
         self,
@@ -0,0 +1,53 @@
+"""
+Secondary Port (Output): Response Cache
+Interfaccia per la cache delle risposte generate dall'LLM
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class IResponseCache(ABC):
+    """Port per la cache delle risposte (Secondary Port - driven)"""
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Legge una risposta dalla cache
+        
+        Args:
+            key: Chiave calcolata da operazione, parametri, contenuto e modello
+            
+        Returns:
+            Risposta memorizzata, None se assente o scaduta
+        """
+        pass
+    
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """
+        Memorizza una risposta
+        
+        Args:
+            key: Chiave della risposta
+            value: Risposta grezza dell'LLM
+        """
+        pass
+    
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Rimuove una risposta (es. risultata non valida al parsing)
+        
+        Args:
+            key: Chiave della risposta
+        """
+        pass
+    
+    def stats(self) -> dict:
+        """
+        Statistiche della cache (hit, miss, eviction)
+        
+        Returns:
+            dict: Contatori della cache
+        """
+        return {}
@@ -3,7 +3,36 @@ Secondary Port (Output): Response Parser
 Interfaccia per parsing delle risposte LLM
 """
 from abc import ABC, abstractmethod
-from domain.models import LLMResult
+from typing import Dict, List, Union
+from domain.models import LLMOutcome, LLMResult
+
+
+class IStreamingResponseParser(ABC):
+    """Parser incrementale di una risposta ricevuta a chunk"""
+    
+    @abstractmethod
+    def feed(self, chunk: str) -> List[Union[LLMOutcome, str]]:
+        """
+        Consuma un chunk della risposta
+        
+        Args:
+            chunk: Testo ricevuto dall'LLM
+            
+        Returns:
+            Eventi pronti: l'LLMOutcome appena l'oggetto outcome è completo,
+            poi i frammenti decodificati di rewritten_text
+        """
+        pass
+    
+    @abstractmethod
+    def finish(self) -> LLMResult:
+        """
+        Interpreta la risposta completa ricevuta fino a questo momento
+        
+        Returns:
+            LLMResult: Stesso risultato di parse_response sul testo completo
+        """
+        pass
 
 
 class IResponseParser(ABC):
@@ -22,6 +51,35 @@ class IResponseParser(ABC):
         """
         pass
     
+    @abstractmethod
+    def parse_multi_response(
+        self,
+        raw_response: str,
+        keys: List[str]
+    ) -> Dict[str, LLMResult]:
+        """
+        Divide una risposta con più risultati (un oggetto JSON per chiave)
+        
+        Args:
+            raw_response: Stringa JSON ricevuta dall'LLM
+            keys: Chiavi attese (es. i cappelli richiesti)
+            
+        Returns:
+            Dict[str, LLMResult]: Un risultato per chiave; le chiavi mancanti
+            o non interpretabili diventano risultati di errore
+        """
+        pass
+    
+    @abstractmethod
+    def stream_parser(self) -> IStreamingResponseParser:
+        """
+        Crea un parser incrementale per una risposta in streaming
+        
+        Returns:
+            IStreamingResponseParser: Parser nuovo, da usare per una sola risposta
+        """
+        pass
+    
     @abstractmethod
     def extract_json(self, text: str) -> dict:
         """
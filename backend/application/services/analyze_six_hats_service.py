@@ -2,11 +2,16 @@
 Use Case: Analyze Six Hats
 Analizza un documento con il metodo dei sei cappelli
 """
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
 from application.ports.input.use_cases import IAnalyzeSixHatsUseCase
 from application.ports.output import (ILLMProvider, IPromptBuilder,
                                       IResponseParser)
 from domain.models import LLMResult, ResultCode, ResultStatus, TextDocument
 
+from .completion_stream import StreamEvent, stream_completion
+
 
 class AnalyzeSixHatsService(IAnalyzeSixHatsUseCase):
     """Use Case per analisi sei cappelli"""
@@ -17,11 +22,15 @@ class AnalyzeSixHatsService(IAnalyzeSixHatsUseCase):
         self,
         llm_provider: ILLMProvider,
         prompt_builder: IPromptBuilder,
-        response_parser: IResponseParser
+        response_parser: IResponseParser,
+        max_parallel: int = 6,
+        single_call: bool = False
     ):
         self._llm_provider = llm_provider
         self._prompt_builder = prompt_builder
         self._response_parser = response_parser
+        self._max_parallel = max(1, max_parallel)
+        self._single_call = single_call
     
     async def analyze_six_hats(
         self, 
@@ -39,6 +48,57 @@ class AnalyzeSixHatsService(IAnalyzeSixHatsUseCase):
             LLMResult: Risultato dell'analisi
         """
         
+        invalid = self._validate(document, hat)
+        if invalid is not None:
+            return invalid
+        
+        messages = self._prompt_builder.build_six_hats_prompt(
+            document, 
+            hat
+        )
+        
+        try:
+            raw_response = await self._llm_provider.generate_completion(
+                messages=messages,
+                temperature=0.1,
+                operation="six_hats"
+            )
+        except Exception as e:
+            return LLMResult(
+                status=ResultStatus.ERROR,
+                code=ResultCode.TECHNICAL_ERROR,
+                violation_category=str(e)
+            )
+        
+        result = self._response_parser.parse_response(raw_response)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            result.status != ResultStatus.ERROR
+        )
+        
+        return result
+    
+    async def analyze_six_hats_stream(
+        self, 
+        document: TextDocument, 
+        hat: str
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Come analyze_six_hats, restituendo l'esito e il testo man mano
+        che arrivano e infine l'LLMResult
+        """
+        invalid = self._validate(document, hat)
+        if invalid is not None:
+            yield invalid
+            return
+        
+        messages = self._prompt_builder.build_six_hats_prompt(document, hat)
+        async for event in stream_completion(
+            self._llm_provider, self._response_parser, messages, "six_hats"
+        ):
+            yield event
+    
+    def _validate(self, document: TextDocument, hat: str) -> Optional[LLMResult]:
         if document.is_empty():
             return LLMResult(
                 status=ResultStatus.INVALID_INPUT,
@@ -53,23 +113,102 @@ class AnalyzeSixHatsService(IAnalyzeSixHatsUseCase):
                 violation_category=f"Cappello '{hat}' non supportato. Cappelli validi: {', '.join(self.VALID_HATS)}"
             )
         
-        messages = self._prompt_builder.build_six_hats_prompt(
-            document, 
-            hat
-        )
+        return None
+    
+    async def analyze_all_hats(
+        self,
+        document: TextDocument,
+        hats: Optional[List[str]] = None,
+        single_call: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, LLMResult]]:
+        """
+        Analizza il documento con più cappelli in parallelo (al massimo
+        `max_parallel` chiamate contemporanee) e restituisce ogni risultato
+        appena pronto. L'errore di un cappello non interrompe gli altri.
+        
+        Con `single_call` tutti i cappelli sono richiesti in un'unica chiamata:
+        documento e istruzioni di sicurezza vengono inviati una volta sola.
+        
+        Args:
+            document: Documento da analizzare
+            hats: Cappelli da utilizzare (default: tutti, nell'ordine di VALID_HATS)
+            single_call: Un'unica chiamata per tutti i cappelli (default: da configurazione)
+            
+        Yields:
+            Coppie (cappello, LLMResult) in ordine di completamento
+        """
+        selected = list(dict.fromkeys((hat or "").lower() for hat in (hats or self.VALID_HATS)))
+        
+        if self._single_call if single_call is None else single_call:
+            for item in (await self._analyze_single_call(document, selected)).items():
+                yield item
+            return
+        
+        semaphore = asyncio.Semaphore(self._max_parallel)
+        
+        async def analyze_hat(hat: str) -> Tuple[str, LLMResult]:
+            async with semaphore:
+                try:
+                    return hat, await self.analyze_six_hats(document, hat)
+                except Exception as e:
+                    return hat, LLMResult(
+                        status=ResultStatus.ERROR,
+                        code=ResultCode.TECHNICAL_ERROR,
+                        violation_category=str(e)
+                    )
+        
+        tasks = [asyncio.create_task(analyze_hat(hat)) for hat in selected]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _analyze_single_call(
+        self,
+        document: TextDocument,
+        hats: List[str]
+    ) -> Dict[str, LLMResult]:
+        """Analizza tutti i cappelli validi con un unico prompt"""
+        results: Dict[str, LLMResult] = {}
+        valid = []
+        for hat in hats:
+            if document.is_empty() or hat not in self.VALID_HATS:
+                # Stesso esito di analyze_six_hats, senza chiamare l'LLM
+                results[hat] = await self.analyze_six_hats(document, hat)
+            else:
+                valid.append(hat)
+        
+        if not valid:
+            return results
+        
+        if len(valid) == 1:
+            results[valid[0]] = await self.analyze_six_hats(document, valid[0])
+            return results
+        
+        messages = self._prompt_builder.build_multi_hat_prompt(document, valid)
         
         try:
             raw_response = await self._llm_provider.generate_completion(
                 messages=messages,
-                temperature=0.1
+                temperature=0.1,
+                operation="six_hats"
             )
         except Exception as e:
-            return LLMResult(
+            error = LLMResult(
                 status=ResultStatus.ERROR,
                 code=ResultCode.TECHNICAL_ERROR,
                 violation_category=str(e)
             )
+            results.update({hat: error for hat in valid})
+            return results
         
-        result = self._response_parser.parse_response(raw_response)
+        parsed = self._response_parser.parse_multi_response(raw_response, valid)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            all(result.status != ResultStatus.ERROR for result in parsed.values())
+        )
         
-        return result
+        results.update(parsed)
+        return results
@@ -0,0 +1,63 @@
+"""
+Application Support: Completion Stream
+Streaming di una completion: l'esito appena disponibile, il testo risultante
+man mano che arriva e infine il risultato interpretato
+"""
+from typing import AsyncIterator, Dict, List, Union
+
+from application.ports.output import ILLMProvider, IResponseParser
+from domain.models import LLMOutcome, LLMResult, ResultCode, ResultStatus
+
+# Esito anticipato, frammento di testo decodificato o, come ultimo elemento, il risultato finale
+StreamEvent = Union[str, LLMOutcome, LLMResult]
+
+
+async def stream_completion(
+    llm_provider: ILLMProvider,
+    response_parser: IResponseParser,
+    messages: List[Dict[str, str]],
+    operation: str,
+    temperature: float = 0.1
+) -> AsyncIterator[StreamEvent]:
+    """
+    Interpreta lo stream del provider con il parser incrementale: inoltra
+    l'LLMOutcome e i frammenti di rewritten_text (senza l'involucro JSON) e
+    infine restituisce l'LLMResult.
+
+    Lo stream del provider viene chiuso appena il resto della risposta non
+    serve: esito diverso da success (rifiuto, input non valido) oppure
+    rewritten_text completo. I token successivi non vengono generati né pagati.
+    Un errore del provider diventa un LLMResult di errore tecnico.
+    """
+    parser = response_parser.stream_parser()
+    chunks: List[str] = []
+    stream = llm_provider.generate_completion_stream(
+        messages=messages,
+        model=None,
+        temperature=temperature,
+        operation=operation
+    )
+    try:
+        async for chunk in stream:
+            chunks.append(chunk)
+            for event in parser.feed(chunk):
+                yield event
+            if parser.terminal:
+                break
+    except Exception as e:
+        yield LLMResult(
+            status=ResultStatus.ERROR,
+            code=ResultCode.TECHNICAL_ERROR,
+            violation_category=str(e)
+        )
+        return
+    finally:
+        # Chiude subito la richiesta HTTP verso il provider (anche se interrotta in anticipo)
+        await stream.aclose()
+
+    result = parser.finish()
+    await llm_provider.report_parse_result(
+        "".join(chunks),
+        result.status != ResultStatus.ERROR
+    )
+    yield result
@@ -2,11 +2,15 @@
 Use Case: Generate Text
 Genera testo basato su un prompt dell'utente
 """
+from typing import AsyncIterator
+
 from application.ports.input.use_cases import IGenerateTextUseCase
 from application.ports.output import (ILLMProvider, IPromptBuilder,
                                       IResponseParser)
 from domain.models import LLMResult, ResultCode, ResultStatus
 
+from .completion_stream import StreamEvent, stream_completion
+
 
 class GenerateTextService(IGenerateTextUseCase):
     """Use Case per generare testo"""
@@ -45,7 +49,8 @@ class GenerateTextService(IGenerateTextUseCase):
         try:
             raw_response = await self._llm_provider.generate_completion(
                 messages=messages,
-                temperature=0.1
+                temperature=0.1,
+                operation="generate"
             )
         except Exception as e:
             return LLMResult(
@@ -55,5 +60,37 @@ class GenerateTextService(IGenerateTextUseCase):
             )
         
         result = self._response_parser.parse_response(raw_response)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            result.status != ResultStatus.ERROR
+        )
         
-        return result
\ No newline at end of file
+        return result
+    
+    async def generate_text_stream(
+        self, 
+        prompt: str,
+        context_text: str = "",
+        word_count: int = 300
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Come generate_text, restituendo l'esito e il testo man mano che
+        arrivano e infine l'LLMResult
+        """
+        if not prompt or prompt.strip() == "":
+            yield LLMResult(
+                status=ResultStatus.INVALID_INPUT,
+                code=ResultCode.EMPTY_PROMPT,
+                violation_category="Il prompt non può essere vuoto"
+            )
+            return
+        
+        messages = self._prompt_builder.build_generate_prompt(
+            prompt, 
+            context_text, 
+            word_count
+        )
+        async for event in stream_completion(
+            self._llm_provider, self._response_parser, messages, "generate"
+        ):
+            yield event
\ No newline at end of file
@@ -2,11 +2,15 @@
 Use Case: Improve Text
 Migliora un documento testuale secondo un criterio
 """
+from typing import AsyncIterator
+
 from application.ports.input.use_cases import IImproveTextUseCase
 from application.ports.output import (ILLMProvider, IPromptBuilder,
                                       IResponseParser)
 from domain.models import LLMResult, ResultCode, ResultStatus, TextDocument
 
+from .completion_stream import StreamEvent, stream_completion
+
 
 class ImproveTextService(IImproveTextUseCase):
     """Use Case per migliorare testo"""
@@ -54,7 +58,8 @@ class ImproveTextService(IImproveTextUseCase):
         try:
             raw_response = await self._llm_provider.generate_completion(
                 messages=messages,
-                temperature=0.1
+                temperature=0.1,
+                operation="improve"
             )
         except Exception as e:
             return LLMResult(
@@ -64,5 +69,34 @@ class ImproveTextService(IImproveTextUseCase):
             )
         
         result = self._response_parser.parse_response(raw_response)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            result.status != ResultStatus.ERROR
+        )
         
         return result
+    
+    async def improve_text_stream(
+        self, 
+        document: TextDocument, 
+        criterion: str = "chiarezza e stile professionale"
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Come improve_text, restituendo l'esito e il testo man mano che
+        arrivano e infine l'LLMResult
+        """
+        if document.is_empty():
+            yield LLMResult(
+                status=ResultStatus.INVALID_INPUT,
+                code=ResultCode.EMPTY_TEXT
+            )
+            return
+        
+        if not criterion or criterion.strip() == "":
+            criterion = "chiarezza e stile professionale"
+        
+        messages = self._prompt_builder.build_improve_prompt(document, criterion)
+        async for event in stream_completion(
+            self._llm_provider, self._response_parser, messages, "improve"
+        ):
+            yield event
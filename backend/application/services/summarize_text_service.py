@@ -2,24 +2,44 @@
 Use Case: Summarize Text
 Riassume un documento testuale riducendone la lunghezza
 """
+import asyncio
+from typing import AsyncIterator, List, Optional
+
 from application.ports.input.use_cases import ISummarizeTextUseCase
 from application.ports.output import (ILLMProvider, IPromptBuilder,
                                       IResponseParser)
 from domain.models import LLMResult, ResultCode, ResultStatus, TextDocument
+from domain.services.markdown_segmenter import segment_markdown
+
+from .completion_stream import StreamEvent, stream_completion
 
 
 class SummarizeTextService(ISummarizeTextUseCase):
-    """Use Case per riassumere testo"""
+    """
+    Use Case per riassumere testo
+    
+    I documenti più lunghi di `chunk_chars` caratteri vengono riassunti in
+    modalità map-reduce: i segmenti (divisi su titoli e paragrafi) sono
+    riassunti in parallelo, al massimo `max_parallel` alla volta, e una
+    passata finale sull'intero documento riporta il totale alla percentuale
+    richiesta.
+    """
+    
+    MAX_REDUCE_DEPTH = 3
     
     def __init__(
         self,
         llm_provider: ILLMProvider,
         prompt_builder: IPromptBuilder,
-        response_parser: IResponseParser
+        response_parser: IResponseParser,
+        chunk_chars: int = 8000,
+        max_parallel: int = 4
     ):
         self._llm_provider = llm_provider
         self._prompt_builder = prompt_builder
         self._response_parser = response_parser
+        self._chunk_chars = chunk_chars
+        self._max_parallel = max(1, max_parallel)
     
     async def summarize_text(
         self, 
@@ -37,6 +57,40 @@ class SummarizeTextService(ISummarizeTextUseCase):
             LLMResult: Risultato dell'operazione
         """
         
+        invalid = self._validate(document, percentage)
+        if invalid is not None:
+            return invalid
+        
+        if document.char_count() > self._chunk_chars:
+            return await self._summarize_map_reduce(document, percentage)
+        
+        return await self._summarize_once(document, percentage)
+    
+    async def summarize_text_stream(
+        self, 
+        document: TextDocument, 
+        percentage: int = 30
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Come summarize_text, restituendo l'esito e il testo man mano che
+        arrivano e infine l'LLMResult. In modalità map-reduce arriva solo il risultato.
+        """
+        invalid = self._validate(document, percentage)
+        if invalid is not None:
+            yield invalid
+            return
+        
+        if document.char_count() > self._chunk_chars:
+            yield await self._summarize_map_reduce(document, percentage)
+            return
+        
+        messages = self._prompt_builder.build_summarize_prompt(document, percentage)
+        async for event in stream_completion(
+            self._llm_provider, self._response_parser, messages, "summarize"
+        ):
+            yield event
+    
+    def _validate(self, document: TextDocument, percentage: int) -> Optional[LLMResult]:
         if document.is_empty():
             return LLMResult(
                 status=ResultStatus.INVALID_INPUT,
@@ -50,6 +104,14 @@ class SummarizeTextService(ISummarizeTextUseCase):
                 violation_category=f"La percentuale deve essere tra 10 e 90, ricevuto: {percentage}"
             )
         
+        return None
+    
+    async def _summarize_once(
+        self, 
+        document: TextDocument, 
+        percentage: int
+    ) -> LLMResult:
+        """Riassunto con una sola chiamata all'LLM"""
         messages = self._prompt_builder.build_summarize_prompt(
             document, 
             percentage
@@ -58,7 +120,8 @@ class SummarizeTextService(ISummarizeTextUseCase):
         try:
             raw_response = await self._llm_provider.generate_completion(
                 messages=messages,
-                temperature=0.1
+                temperature=0.1,
+                operation="summarize"
             )
         except Exception as e:
             return LLMResult(
@@ -68,5 +131,78 @@ class SummarizeTextService(ISummarizeTextUseCase):
             )
         
         result = self._response_parser.parse_response(raw_response)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            result.status != ResultStatus.ERROR
+        )
         
         return result
+    
+    async def _summarize_map_reduce(
+        self, 
+        document: TextDocument, 
+        percentage: int,
+        depth: int = 0
+    ) -> LLMResult:
+        """
+        Map: riassume i segmenti in parallelo con metà della riduzione richiesta,
+        lasciando il resto alla passata finale.
+        Reduce: con più segmenti l'unione dei riassunti viene sempre riassunta
+        come un unico documento, con la percentuale mancante per arrivare alla
+        lunghezza obiettivo (a sua volta in map-reduce se supera `chunk_chars`).
+        """
+        segments = segment_markdown(document.content, self._chunk_chars)
+        print(f"Riassunto map-reduce: {len(segments)} segmenti (livello {depth})", flush=True)
+        if len(segments) == 1:
+            return await self._summarize_once(document, percentage)
+        
+        results = await self._map_segments(segments, max(10, percentage // 2))
+        failed = next((r for r in results if not r.is_successful()), None)
+        if failed is not None:
+            return failed
+        
+        merged = "\n\n".join(r.rewritten_text or "" for r in results).strip()
+        target_chars = document.char_count() * (100 - percentage) / 100
+        remaining = round(100 * (1 - target_chars / max(len(merged), 1)))
+        reduce_percentage = min(max(remaining, 10), 90)
+        reduced_document = TextDocument(content=merged)
+        
+        if len(merged) <= self._chunk_chars:
+            reduced = await self._summarize_once(reduced_document, reduce_percentage)
+        elif depth < self.MAX_REDUCE_DEPTH:
+            reduced = await self._summarize_map_reduce(reduced_document, reduce_percentage, depth + 1)
+        else:
+            reduced = None
+        if reduced is not None:
+            if not reduced.is_successful():
+                return reduced
+            merged = reduced.rewritten_text or merged
+        
+        return LLMResult(
+            status=ResultStatus.SUCCESS,
+            code=ResultCode.OK,
+            rewritten_text=merged,
+            detected_language=results[0].detected_language
+        )
+    
+    async def _map_segments(self, segments: List[str], percentage: int) -> List[LLMResult]:
+        """
+        Riassume i segmenti con parallelismo limitato.
+        Al primo esito negativo (rifiuto o errore) annulla i segmenti rimanenti.
+        """
+        semaphore = asyncio.Semaphore(self._max_parallel)
+        
+        async def summarize_segment(segment: str) -> LLMResult:
+            async with semaphore:
+                return await self._summarize_once(TextDocument(content=segment), percentage)
+        
+        tasks = [asyncio.create_task(summarize_segment(segment)) for segment in segments]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if not result.is_successful():
+                    return [result]
+            return [task.result() for task in tasks]
+        finally:
+            for task in tasks:
+                task.cancel()
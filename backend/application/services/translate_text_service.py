@@ -2,24 +2,53 @@
 Use Case: Translate Text
 Traduce un documento in un'altra lingua
 """
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
 from application.ports.input.use_cases import ITranslateTextUseCase
 from application.ports.output import (ILLMProvider, IPromptBuilder,
-                                      IResponseParser)
+                                      IResponseCache, IResponseParser)
 from domain.models import LLMResult, ResultCode, ResultStatus, TextDocument
+from domain.services.markdown_segmenter import (TextUnit, join_units,
+                                                split_units)
+
+from .completion_stream import StreamEvent, stream_completion
 
 
 class TranslateTextService(ITranslateTextUseCase):
-    """Use Case per tradurre testo"""
+    """
+    Use Case per tradurre testo
+    
+    Con una `segment_cache`, i documenti di almeno `min_segments` unità
+    (titoli, paragrafi, voci di elenco) vengono tradotti in modo incrementale:
+    le unità già tradotte arrivano dalla cache e all'LLM vanno solo quelle
+    nuove o modificate. I blocchi di codice non vengono tradotti.
+    """
+    
+    # Scostamento massimo (fattore) tra il rapporto di lunghezza di un'unità e
+    # quello dell'intero documento, oltre il quale l'allineamento non è credibile
+    MAX_UNIT_RATIO_DEVIATION = 2.0
+    UNIT_LENGTH_SLACK = 10
     
     def __init__(
         self,
         llm_provider: ILLMProvider,
         prompt_builder: IPromptBuilder,
-        response_parser: IResponseParser
+        response_parser: IResponseParser,
+        segment_cache: Optional[IResponseCache] = None,
+        cache_namespace: str = "",
+        min_segments: int = 4,
+        max_parallel: int = 4
     ):
         self._llm_provider = llm_provider
         self._prompt_builder = prompt_builder
         self._response_parser = response_parser
+        self._segment_cache = segment_cache
+        self._cache_namespace = cache_namespace
+        self._min_segments = min_segments
+        self._max_parallel = max(1, max_parallel)
     
     async def translate_text(
         self, 
@@ -37,6 +66,42 @@ class TranslateTextService(ITranslateTextUseCase):
             LLMResult: Risultato dell'operazione
         """
         
+        invalid = self._validate(document, target_language)
+        if invalid is not None:
+            return invalid
+        
+        units = self._incremental_units(document)
+        if units is not None:
+            return await self._translate_incremental(document, units, target_language)
+        
+        return await self._translate_once(document, target_language)
+    
+    async def translate_text_stream(
+        self, 
+        document: TextDocument, 
+        target_language: str
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Come translate_text, restituendo l'esito e il testo man mano che
+        arrivano e infine l'LLMResult. In modalità incrementale arriva solo il risultato.
+        """
+        invalid = self._validate(document, target_language)
+        if invalid is not None:
+            yield invalid
+            return
+        
+        units = self._incremental_units(document)
+        if units is not None:
+            yield await self._translate_incremental(document, units, target_language)
+            return
+        
+        messages = self._prompt_builder.build_translate_prompt(document, target_language)
+        async for event in stream_completion(
+            self._llm_provider, self._response_parser, messages, "translate"
+        ):
+            yield event
+    
+    def _validate(self, document: TextDocument, target_language: str) -> Optional[LLMResult]:
         if document.is_empty():
             return LLMResult(
                 status=ResultStatus.INVALID_INPUT,
@@ -50,6 +115,23 @@ class TranslateTextService(ITranslateTextUseCase):
                 violation_category="Lingua di destinazione non specificata"
             )
         
+        return None
+    
+    def _incremental_units(self, document: TextDocument) -> Optional[List[TextUnit]]:
+        """Unità del documento se va tradotto in modo incrementale, altrimenti None"""
+        if self._segment_cache is None:
+            return None
+        units = split_units(document.content)
+        if sum(unit.translatable for unit in units) >= self._min_segments:
+            return units
+        return None
+    
+    async def _translate_once(
+        self, 
+        document: TextDocument, 
+        target_language: str
+    ) -> LLMResult:
+        """Traduzione con una sola chiamata all'LLM"""
         messages = self._prompt_builder.build_translate_prompt(
             document, 
             target_language
@@ -58,7 +140,8 @@ class TranslateTextService(ITranslateTextUseCase):
         try:
             raw_response = await self._llm_provider.generate_completion(
                 messages=messages,
-                temperature=0.1
+                temperature=0.1,
+                operation="translate"
             )
         except Exception as e:
             return LLMResult(
@@ -68,5 +151,139 @@ class TranslateTextService(ITranslateTextUseCase):
             )
         
         result = self._response_parser.parse_response(raw_response)
+        await self._llm_provider.report_parse_result(
+            raw_response,
+            result.status != ResultStatus.ERROR
+        )
         
         return result
+    
+    def _segment_key(self, text: str, target_language: str) -> str:
+        payload = json.dumps(
+            [self._cache_namespace, target_language.strip().lower(), text],
+            ensure_ascii=False
+        )
+        return "translate_segment:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def _cached_segment(self, key: str) -> Optional[dict]:
+        value = await self._segment_cache.get(key)
+        return json.loads(value) if value is not None else None
+    
+    async def _store_segment(self, key: str, text: str, language: Optional[str]) -> None:
+        await self._segment_cache.set(
+            key,
+            json.dumps({"text": text, "language": language}, ensure_ascii=False)
+        )
+    
+    async def _translate_incremental(
+        self, 
+        document: TextDocument, 
+        units: List[TextUnit], 
+        target_language: str
+    ) -> LLMResult:
+        """
+        Traduce solo le unità non presenti in cache e ricompone il documento.
+        
+        Alla prima traduzione (nessuna unità in cache) il documento viene
+        tradotto con una sola chiamata; se la traduzione ha la stessa struttura
+        dell'originale, le sue unità popolano la cache per le richieste successive.
+        Se un'unità modificata viene rifiutata si ritraduce l'intero documento.
+        """
+        keys = {
+            unit.text: self._segment_key(unit.text, target_language)
+            for unit in units if unit.translatable
+        }
+        cached: Dict[str, dict] = {}
+        for text, key in keys.items():
+            entry = await self._cached_segment(key)
+            if entry is not None:
+                cached[text] = entry
+        
+        if not cached:
+            result = await self._translate_once(document, target_language)
+            if result.is_successful() and result.rewritten_text:
+                await self._seed_cache(units, result, target_language)
+            return result
+        
+        missing = [text for text in keys if text not in cached]
+        print(f"Traduzione incrementale: {len(missing)} unità da tradurre su {len(keys)}", flush=True)
+        
+        semaphore = asyncio.Semaphore(self._max_parallel)
+        
+        async def translate_unit(text: str) -> LLMResult:
+            async with semaphore:
+                return await self._translate_once(TextDocument(content=text), target_language)
+        
+        tasks = [asyncio.create_task(translate_unit(text)) for text in missing]
+        try:
+            for text, task in zip(missing, tasks):
+                result = await task
+                if result.status == ResultStatus.ERROR:
+                    return result
+                if not result.is_successful():
+                    # Un'unità isolata può essere rifiutata per mancanza di contesto
+                    print("Traduzione incrementale rifiutata: ritraduco l'intero documento", flush=True)
+                    return await self._translate_once(document, target_language)
+                translated = (result.rewritten_text or "").strip()
+                cached[text] = {"text": translated, "language": result.detected_language}
+                await self._store_segment(keys[text], translated, result.detected_language)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        translated_units = [
+            unit._replace(text=cached[unit.text]["text"]) if unit.translatable else unit
+            for unit in units
+        ]
+        languages = [entry.get("language") for entry in cached.values() if entry.get("language")]
+        
+        return LLMResult(
+            status=ResultStatus.SUCCESS,
+            code=ResultCode.OK,
+            rewritten_text=join_units(translated_units),
+            detected_language=max(set(languages), key=languages.count) if languages else None
+        )
+    
+    async def _seed_cache(
+        self, 
+        units: List[TextUnit], 
+        result: LLMResult, 
+        target_language: str
+    ) -> None:
+        """Popola la cache delle unità se la traduzione ne conserva la struttura"""
+        source = [unit for unit in units if unit.translatable]
+        translated = [unit for unit in split_units(result.rewritten_text) if unit.translatable]
+        if not self._aligned(source, translated):
+            print("Traduzione non allineata alle unità originali: cache non popolata", flush=True)
+            return
+        
+        for original, target in zip(source, translated):
+            await self._store_segment(
+                self._segment_key(original.text, target_language),
+                target.text,
+                result.detected_language
+            )
+    
+    def _aligned(self, source: List[TextUnit], translated: List[TextUnit]) -> bool:
+        """
+        Verifica che le unità tradotte corrispondano una a una all'originale:
+        stesso numero, stesse righe per unità e lunghezze proporzionali a
+        quelle dell'intero documento (un paragrafo unito o diviso sposta tutto).
+        """
+        if len(source) != len(translated):
+            return False
+        
+        source_chars = sum(len(unit.text) for unit in source)
+        ratio = sum(len(unit.text) for unit in translated) / max(source_chars, 1)
+        deviation = self.MAX_UNIT_RATIO_DEVIATION
+        for original, target in zip(source, translated):
+            if original.text.count("\n") != target.text.count("\n"):
+                return False
+            expected = len(original.text) * ratio
+            if not (
+                expected / deviation - self.UNIT_LENGTH_SLACK
+                <= len(target.text)
+                <= expected * deviation + self.UNIT_LENGTH_SLACK
+            ):
+                return False
+        return True
@@ -0,0 +1,109 @@
+"""
+Benchmark: SSE Decoder
+Confronta il decoder SSE incrementale con il vecchio ciclo aiter_lines + json.loads
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_sse_decoder [stream_registrato.sse ...]
+
+Senza argomenti usa uno stream sintetico nel formato OpenAI/Groq/Ollama.
+Gli stream registrati sono il corpo grezzo di una risposta SSE (es. salvato con
+`curl -N ... > stream.sse`).
+"""
+import asyncio
+import json
+import sys
+import time
+from typing import List
+
+import httpx
+
+from adapters.output.sse_decoder import JSON_BACKEND, SSEDecoder
+
+ROUNDS = 200
+NETWORK_CHUNK = 512
+
+
+def synthetic_stream(tokens: int = 2000) -> bytes:
+    """Stream realistico: frame di ruolo, un frame per token, finish_reason e [DONE]"""
+    base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": 0, "model": "llama3"}
+    frames = [{**base, "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]}]
+    words = "Il riassunto evidenzia i punti chiave del documento e ne mantiene il tono".split()
+    for i in range(tokens):
+        frames.append({**base, "choices": [{"index": 0, "delta": {"content": words[i % len(words)] + " "}, "finish_reason": None}]})
+    frames.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+
+    body = "".join(f"data: {json.dumps(f)}\n\n" for f in frames) + "data: [DONE]\n\n"
+    return body.encode()
+
+
+def split(stream: bytes) -> List[bytes]:
+    return [stream[i:i + NETWORK_CHUNK] for i in range(0, len(stream), NETWORK_CHUNK)]
+
+
+def response_for(chunks: List[bytes]) -> httpx.Response:
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    return httpx.Response(200, content=body())
+
+
+async def legacy_loop(chunks: List[bytes]) -> str:
+    """Il ciclo precedente di _call_api_stream"""
+    out = []
+    async for line in response_for(chunks).aiter_lines():
+        if line.startswith("data: "):
+            data_str = line[6:].strip()
+            if data_str == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data_str)
+                delta = chunk["choices"][0].get("delta", {})
+                content = delta.get("content", "")
+            except (json.JSONDecodeError, KeyError, IndexError):
+                continue
+            if content:
+                out.append(content)
+    return "".join(out)
+
+
+async def decoder_loop(chunks: List[bytes]) -> str:
+    """Il ciclo attuale con SSEDecoder"""
+    out = []
+    decoder = SSEDecoder()
+    async for data in response_for(chunks).aiter_bytes():
+        out.extend(decoder.feed(data))
+        if decoder.done:
+            break
+    else:
+        out.extend(decoder.finish())
+    return "".join(out)
+
+
+async def measure(loop_fn, chunks: List[bytes]) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await loop_fn(chunks)
+    return (time.perf_counter() - started) / ROUNDS
+
+
+async def main(paths: List[str]) -> None:
+    streams = {path: open(path, "rb").read() for path in paths} or {"sintetico": synthetic_stream()}
+    print(f"Backend JSON: {JSON_BACKEND} - {ROUNDS} ripetizioni per stream")
+
+    for name, stream in streams.items():
+        chunks = split(stream)
+        assert await legacy_loop(chunks) == await decoder_loop(chunks), f"Output diverso su {name}"
+
+        legacy = await measure(legacy_loop, chunks)
+        current = await measure(decoder_loop, chunks)
+        print(
+            f"{name}: {len(stream) / 1024:.0f} KiB | "
+            f"aiter_lines+json {legacy * 1000:.2f} ms | "
+            f"SSEDecoder {current * 1000:.2f} ms | "
+            f"x{legacy / current:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -1,8 +1,9 @@
 from .text_document import TextDocument
-from .llm_result import LLMResult, ResultStatus, ResultCode
+from .llm_result import LLMOutcome, LLMResult, ResultStatus, ResultCode
 
 __all__ = [
     "TextDocument",
+    "LLMOutcome",
     "LLMResult",
     "ResultStatus",
     "ResultCode"
@@ -13,6 +13,7 @@ class ResultStatus(Enum):
     REFUSAL = "refusal"
     INVALID_INPUT = "INVALID_INPUT"
     ERROR = "error"
+    CANCELLED = "cancelled"
 
 
 class ResultCode(Enum):
@@ -24,6 +25,28 @@ class ResultCode(Enum):
     MANIPULATION = "MANIPULATION"
     ETHIC_REFUSAL = "ETHIC_REFUSAL"
     TECHNICAL_ERROR = "TECHNICAL_ERROR"
+    CANCELLED = "CANCELLED"
+    SUPERSEDED = "SUPERSEDED"
+
+
+@dataclass
+class LLMOutcome:
+    """Esito di un'elaborazione, disponibile negli stream prima del testo"""
+    status: ResultStatus
+    code: ResultCode
+    violation_category: Optional[str] = None
+    
+    def is_successful(self) -> bool:
+        """Verifica se l'elaborazione è riuscita"""
+        return self.status == ResultStatus.SUCCESS
+    
+    def to_dict(self) -> dict:
+        """Converte in dizionario per serializzazione (campo outcome di LLMResult)"""
+        return {
+            "status": self.status.value,
+            "code": self.code.value,
+            "violation_category": self.violation_category
+        }
 
 
 @dataclass
@@ -1,3 +1,4 @@
+from .markdown_segmenter import segment_markdown
 from .text_processor import TextProcessorService
 
-__all__ = ["TextProcessorService"]
+__all__ = ["TextProcessorService", "segment_markdown"]
@@ -0,0 +1,176 @@
+"""
+Domain Service: Markdown Segmenter
+Divide un documento markdown in segmenti rispettando titoli, paragrafi e blocchi di codice
+"""
+import re
+from typing import List, NamedTuple
+
+_HEADING = re.compile(r"^#{1,6}\s")
+_FENCE = re.compile(r"^(```|~~~)")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+class TextUnit(NamedTuple):
+    """Unità stabile del documento: testo, spazi che la seguono e se va elaborata"""
+    text: str
+    separator: str
+    translatable: bool = True
+
+
+def _split_blocks(text: str) -> List[str]:
+    """Blocchi logici: titoli, paragrafi (separati da righe vuote) e blocchi di codice interi"""
+    blocks: List[str] = []
+    current: List[str] = []
+    in_fence = False
+
+    def close() -> None:
+        if current and any(line.strip() for line in current):
+            blocks.append("\n".join(current).strip("\n"))
+        current.clear()
+
+    for line in text.splitlines():
+        if _FENCE.match(line.strip()):
+            if not in_fence:
+                close()
+            current.append(line)
+            in_fence = not in_fence
+            if not in_fence:
+                close()
+            continue
+
+        if in_fence:
+            current.append(line)
+        elif not line.strip():
+            close()
+        elif _HEADING.match(line):
+            close()
+            current.append(line)
+        else:
+            current.append(line)
+
+    close()
+    return blocks
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    """Spezza un blocco troppo lungo per frasi e, come ultima risorsa, a lunghezza fissa"""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def segment_markdown(text: str, max_chars: int) -> List[str]:
+    """
+    Divide il testo in segmenti di al massimo `max_chars` caratteri.
+
+    I segmenti si chiudono su confini di paragrafo e, quando possibile, prima
+    di un titolo markdown, così ogni sezione resta con il proprio titolo.
+    I blocchi più lunghi di `max_chars` vengono spezzati per frasi.
+
+    Args:
+        text: Testo del documento
+        max_chars: Lunghezza massima di un segmento
+
+    Returns:
+        Lista dei segmenti, nell'ordine del documento
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars deve essere positivo")
+
+    segments: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for block in _split_blocks(text):
+        parts = [block] if len(block) <= max_chars else _split_oversized(block, max_chars)
+        for part in parts:
+            starts_section = _HEADING.match(part) is not None
+            fits = size + (2 if current else 0) + len(part) <= max_chars
+            # Un titolo apre un nuovo segmento se quello corrente è già pieno per metà
+            if current and (not fits or (starts_section and size >= max_chars // 2)):
+                segments.append("\n\n".join(current))
+                current, size = [], 0
+            size += (2 if current else 0) + len(part)
+            current.append(part)
+
+    if current:
+        segments.append("\n\n".join(current))
+    return segments
+
+
+def split_units(text: str) -> List[TextUnit]:
+    """
+    Divide il testo in unità stabili: titoli, paragrafi, voci di elenco e
+    blocchi di codice (non traducibili).
+
+    La divisione dipende solo dal contenuto di ogni unità, quindi modificare un
+    paragrafo non cambia le altre. Il testo originale si ricompone con
+    `join_units`, spazi e righe vuote inclusi.
+    """
+    units: List[TextUnit] = []
+    prefix = text[:len(text) - len(text.lstrip())]
+    current: List[str] = []
+    separator = ""
+    in_fence = False
+
+    def close() -> None:
+        nonlocal separator
+        if current:
+            body = "".join(current)
+            stripped = body.rstrip()
+            units.append(TextUnit(stripped, body[len(stripped):] + separator, not _FENCE.match(stripped)))
+            current.clear()
+        elif separator and units:
+            last = units[-1]
+            units[-1] = last._replace(separator=last.separator + separator)
+        separator = ""
+
+    for line in text[len(prefix):].splitlines(keepends=True):
+        content = line.strip()
+        if in_fence:
+            current.append(line)
+            if _FENCE.match(content):
+                in_fence = False
+                close()
+        elif _FENCE.match(content):
+            close()
+            current.append(line)
+            in_fence = True
+        elif not content:
+            if current:
+                close()
+            separator += line
+        elif _HEADING.match(line) or _LIST_ITEM.match(line):
+            close()
+            current.append(line)
+            if _HEADING.match(line):
+                close()
+        else:
+            if separator:
+                close()
+            current.append(line)
+
+    close()
+    if prefix:
+        units.insert(0, TextUnit("", prefix, False))
+    return units
+
+
+def join_units(units: List[TextUnit]) -> str:
+    """Ricompone il testo dalle unità (eventualmente elaborate)"""
+    return "".join(unit.text + unit.separator for unit in units)
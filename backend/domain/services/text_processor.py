@@ -2,13 +2,15 @@
 Domain Service: Text Processor
 Orchestra i use cases per elaborazione testi
 """
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
 from application.ports.input import ITextProcessor
 from application.ports.input.use_cases import (IAnalyzeSixHatsUseCase,
                                                IGenerateTextUseCase,
                                                IImproveTextUseCase,
                                                ISummarizeTextUseCase,
                                                ITranslateTextUseCase)
-from domain.models import LLMResult, TextDocument
+from domain.models import LLMOutcome, LLMResult, TextDocument
 
 
 class TextProcessorService(ITextProcessor):
@@ -60,6 +62,15 @@ class TextProcessorService(ITextProcessor):
         """Delega al use case specifico"""
         return await self._six_hats.analyze_six_hats(document, hat)
     
+    def analyze_all_hats(
+        self,
+        document: TextDocument,
+        hats: Optional[List[str]] = None,
+        single_call: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._six_hats.analyze_all_hats(document, hats, single_call)
+    
     async def generate(
         self,
         prompt: str,
@@ -71,4 +82,45 @@ class TextProcessorService(ITextProcessor):
             prompt, 
             context_text, 
             word_count
-        )
\ No newline at end of file
+        )
+    
+    def summarize_stream(
+        self,
+        document: TextDocument, 
+        percentage: int
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._summarize.summarize_text_stream(document, percentage)
+    
+    def improve_stream(
+        self,
+        document: TextDocument, 
+        criterion: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._improve.improve_text_stream(document, criterion)
+    
+    def translate_stream(
+        self,
+        document: TextDocument, 
+        target_language: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._translate.translate_text_stream(document, target_language)
+    
+    def analyze_six_hats_stream(
+        self,
+        document: TextDocument, 
+        hat: str
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._six_hats.analyze_six_hats_stream(document, hat)
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        context_text: str = "",
+        word_count: int = 300
+    ) -> AsyncIterator[Union[str, LLMOutcome, LLMResult]]:
+        """Delega al use case specifico"""
+        return self._generate.generate_text_stream(prompt, context_text, word_count)
@@ -2,13 +2,70 @@
 Infrastructure: Configuration
 Gestione configurazione applicazione con Pydantic
 """
-from pydantic_settings import BaseSettings
+from typing import Any, Dict, Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+
     LLM_FALLBACK_ORDER: str = "LOCAL"
 
-    class Config:
-        env_file = ".env"
-        extra = "allow" 
-        
-settings = Settings()
\ No newline at end of file
+
+class ProviderSettings(BaseSettings):
+    """
+    Profilo di un provider LLM, letto dalle variabili <PREFISSO>_*
+    (es. LOCAL_URL, LOCAL_PROTOCOL, LOCAL_OPTIONS='{"num_thread": 4}')
+    """
+    model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore")
+
+    url: str = ""
+    model: str = ""
+    key: Optional[str] = None
+    # openai: /v1/chat/completions con SSE; ollama: /api/chat nativo con NDJSON
+    protocol: Literal["openai", "ollama"] = "openai"
+    # Opzioni di runtime Ollama (num_ctx, num_gpu, num_thread, ...)
+    options: Dict[str, Any] = {}
+    keep_alive: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    http2: bool = False
+    uds: Optional[str] = None
+    # Warm-up e sonde periodiche (default: solo per i provider senza chiave API)
+    probe: Optional[bool] = None
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    context_window: Optional[int] = None
+    max_output: Optional[int] = None
+    chars_per_token: Optional[float] = None
+    timeout_connect: Optional[float] = None
+    timeout_first_token: Optional[float] = None
+    timeout_idle: Optional[float] = None
+
+    @classmethod
+    def load(cls, prefix: str) -> "ProviderSettings":
+        return cls(_env_prefix=f"{prefix}_")
+
+    def looks_like_ollama(self) -> bool:
+        """URL riconosciuti in passato come Ollama (porta 11434 o server interno)"""
+        return "11434" in self.url or "zucchetti" in self.url
+
+    def timeouts(self) -> Dict[str, float]:
+        """Timeout per fase configurati sul profilo"""
+        values = {
+            "connect": self.timeout_connect,
+            "first_token": self.timeout_first_token,
+            "idle": self.timeout_idle
+        }
+        return {phase: value for phase, value in values.items() if value is not None}
+
+    def to_provider(self, name: str) -> Dict[str, Any]:
+        """Dizionario del provider usato dall'adapter LLM"""
+        provider = self.model_dump(exclude={"timeout_connect", "timeout_first_token", "timeout_idle"})
+        provider["name"] = name
+        if self.context_window is None and "num_ctx" in self.options:
+            # Un num_ctx fisso nelle opzioni è anche la finestra di contesto utilizzabile
+            provider["context_window"] = int(self.options["num_ctx"])
+        return provider
+
+
+settings = Settings()
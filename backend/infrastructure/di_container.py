@@ -4,13 +4,23 @@ Wiring di tutte le dipendenze dell'applicazione
 """
 import os
 
+import httpx
+from pydantic import ValidationError
+
 from adapters.output import (JSONParserAdapter, LLMClientAdapter,
                              PromptBuilderAdapter)
+from adapters.output.caching_llm_provider import CachingLLMProvider
+from adapters.output.circuit_breaker import CircuitBreaker, RetryBudget
+from adapters.output.hedging import HedgePolicy
+from adapters.output.provider_router import ProviderRouter
+from adapters.output.response_cache import TwoTierResponseCache
+from adapters.output.single_flight_llm_provider import SingleFlightLLMProvider
+from adapters.output.timeouts import PhaseTimeouts, TimeoutPolicy
 from application.services import (AnalyzeSixHatsService, GenerateTextService,
                                   ImproveTextService, SummarizeTextService,
                                   TranslateTextService)
 from domain.services import TextProcessorService
-from infrastructure.config import Settings
+from infrastructure.config import ProviderSettings, Settings
 
 
 class DIContainer:
@@ -21,6 +31,33 @@ class DIContainer:
     def __init__(self, settings: Settings):
         self._settings = settings
         self._instances = {}
+        self._provider_timeouts = {}
+
+    @staticmethod
+    def _env_bool(name: str, default: bool = False) -> bool:
+        """Legge una variabile d'ambiente booleana (true/1/yes/on)"""
+        value = os.getenv(name)
+        if value is None or value.strip() == "":
+            return default
+        return value.strip().lower() in ("1", "true", "yes", "on")
+
+    @staticmethod
+    def _env_float(name: str, default: float) -> float:
+        """Legge una variabile d'ambiente numerica con fallback al default"""
+        value = os.getenv(name)
+        try:
+            return float(value) if value else default
+        except ValueError:
+            print(f"[{name}] Valore non valido '{value}', uso il default {default}", flush=True)
+            return default
+
+    def _get_pool_limits(self) -> httpx.Limits:
+        """Limiti del connection pool condiviso verso i provider LLM"""
+        return httpx.Limits(
+            max_connections=int(self._env_float("LLM_POOL_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(self._env_float("LLM_POOL_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=self._env_float("LLM_POOL_KEEPALIVE_EXPIRY", 30.0)
+        )
 
     def _get_providers_list(self):
         """Costruisce la lista dei provider dinamicamente in base all'ordine nel .env"""
@@ -31,36 +68,189 @@ class DIContainer:
         order_list = [p.strip().upper() for p in order_str.split(",") if p.strip()]
 
         for prefix in order_list:
-            url = os.getenv(f"{prefix}_URL")
-            model = os.getenv(f"{prefix}_MODEL")
-            key = os.getenv(f"{prefix}_KEY") 
-            
-            if not url or not model:
+            try:
+                profile = ProviderSettings.load(prefix)
+            except ValidationError as e:
+                print(f"[{prefix}] Saltato: configurazione non valida nel file .env: {e}", flush=True)
+                continue
+
+            if not profile.url or not profile.model:
                 print(f"[{prefix}] Saltato: URL o Model mancante nel file .env", flush=True)
                 continue
 
-            providers.append({
-                "name": prefix,
-                "url": url,
-                "model": model,
-                "key": key
-            })
+            if profile.looks_like_ollama() and not profile.options:
+                print(
+                    f"[{prefix}] Attenzione: URL Ollama senza {prefix}_OPTIONS. num_ctx, num_gpu e "
+                    f"num_thread non vengono più impostati in automatico (prima 4096/999/8): "
+                    f"imposta {prefix}_PROTOCOL=ollama e {prefix}_OPTIONS, "
+                    f"es. {{\"num_ctx\": 4096, \"num_gpu\": 999, \"num_thread\": 8}}",
+                    flush=True
+                )
+
+            providers.append(profile.to_provider(prefix))
+            self._provider_timeouts[prefix] = profile.timeouts()
             
         return providers
     
+    def _create_circuit_breaker(self) -> CircuitBreaker:
+        """Circuit breaker per provider, configurabile da .env"""
+        return CircuitBreaker(
+            failure_threshold=int(self._env_float("LLM_BREAKER_FAILURE_THRESHOLD", 3)),
+            recovery_timeout=self._env_float("LLM_BREAKER_RECOVERY_SECONDS", 30.0),
+            probe_interval=self._env_float("LLM_BREAKER_PROBE_INTERVAL", 5.0)
+        )
+
+    def _create_hedge_policy(self):
+        """Politica di hedging, attiva solo con LLM_HEDGING_ENABLED=true"""
+        if not self._env_bool("LLM_HEDGING_ENABLED"):
+            return None
+
+        return HedgePolicy(
+            percentile=self._env_float("LLM_HEDGE_PERCENTILE", 0.9),
+            min_delay=self._env_float("LLM_HEDGE_MIN_DELAY", 0.2),
+            max_delay=self._env_float("LLM_HEDGE_MAX_DELAY", 5.0),
+            default_delay=self._env_float("LLM_HEDGE_DEFAULT_DELAY", 2.0)
+        )
+
+    def _create_router(self):
+        """Router adattivo dei provider, attivo solo con LLM_ROUTING=adaptive"""
+        if os.getenv("LLM_ROUTING", "static").strip().lower() != "adaptive":
+            return None
+
+        return ProviderRouter(
+            alpha=self._env_float("LLM_ROUTER_EWMA_ALPHA", 0.2),
+            explore_ratio=self._env_float("LLM_ROUTER_EXPLORE_RATIO", 0.05),
+            stats_path=os.getenv("LLM_ROUTER_STATS_PATH") or None
+        )
+
+    def _read_phase_timeouts(self, suffix: str) -> dict:
+        """Legge LLM_TIMEOUT_<FASE><suffix> per connect, first_token e idle"""
+        values = {}
+        for phase in ("connect", "first_token", "idle"):
+            name = f"LLM_TIMEOUT_{phase.upper()}{suffix}"
+            if os.getenv(name):
+                values[phase] = self._env_float(name, 0)
+        return values
+
+    def _create_timeout_policy(self, providers) -> TimeoutPolicy:
+        """
+        Timeout per fase: LLM_TIMEOUT_<FASE> (default), <PROVIDER>_TIMEOUT_<FASE>
+        (o LLM_TIMEOUT_<FASE>_<PROVIDER>) e LLM_TIMEOUT_<FASE>_<OPERAZIONE>
+        con FASE in CONNECT, FIRST_TOKEN, IDLE
+        """
+        default = PhaseTimeouts(
+            connect=self._env_float("LLM_TIMEOUT_CONNECT", 5.0),
+            first_token=self._env_float("LLM_TIMEOUT_FIRST_TOKEN", 30.0),
+            idle=self._env_float("LLM_TIMEOUT_IDLE", 20.0)
+        )
+        per_operation = {"generate": {"first_token": 60.0, "idle": 30.0}}
+        for operation in ("summarize", "improve", "translate", "six_hats", "generate"):
+            values = self._read_phase_timeouts(f"_{operation.upper()}")
+            if values:
+                per_operation.setdefault(operation, {}).update(values)
+
+        per_provider = {
+            p["name"]: {
+                **self._read_phase_timeouts(f"_{p['name']}"),
+                **self._provider_timeouts.get(p["name"], {})
+            }
+            for p in providers
+        }
+
+        return TimeoutPolicy(default, per_provider, per_operation)
+
+    def get_llm_provider(self) -> LLMClientAdapter:
+        if "llm_provider" not in self._instances:
+            providers = self._get_providers_list()
+            self._instances["llm_provider"] = LLMClientAdapter(
+                providers=providers,
+                pool_limits=self._get_pool_limits(),
+                breaker_factory=self._create_circuit_breaker,
+                retry_budget=RetryBudget(
+                    ratio=self._env_float("LLM_RETRY_BUDGET_RATIO", 0.2),
+                    min_per_second=self._env_float("LLM_RETRY_BUDGET_MIN_PER_SECOND", 1.0)
+                ),
+                max_attempts=int(self._env_float("LLM_MAX_ATTEMPTS", 0)) or None,
+                hedge_policy=self._create_hedge_policy(),
+                router=self._create_router(),
+                rate_limit_max_wait=self._env_float("LLM_RATE_LIMIT_MAX_WAIT", 10.0),
+                transient_retries=int(self._env_float("LLM_TRANSIENT_RETRIES", 2)),
+                max_retry_backoff=self._env_float("LLM_TRANSIENT_MAX_BACKOFF", 8.0),
+                timeout_policy=self._create_timeout_policy(providers),
+                probe_interval=self._env_float("LLM_HEALTH_PROBE_INTERVAL", 0) or None,
+                warm_up=self._env_bool("LLM_WARMUP", True),
+                min_output_tokens=int(self._env_float("LLM_MIN_OUTPUT_TOKENS", 256))
+            )
+
+        return self._instances["llm_provider"]
+
+    def get_response_cache(self):
+        """Cache delle risposte LLM, disattivabile con LLM_CACHE_ENABLED=false"""
+        if "response_cache" not in self._instances:
+            cache = None
+            if self._env_bool("LLM_CACHE_ENABLED", True):
+                cache = TwoTierResponseCache(
+                    max_entries=int(self._env_float("LLM_CACHE_MAX_ENTRIES", 512)),
+                    ttl=self._env_float("LLM_CACHE_TTL_SECONDS", 24 * 3600),
+                    sqlite_path=os.getenv("LLM_CACHE_SQLITE_PATH") or None,
+                    disk_max_bytes=int(self._env_float("LLM_CACHE_DISK_MAX_MB", 64) * 1024 * 1024)
+                )
+            self._instances["response_cache"] = cache
+
+        return self._instances["response_cache"]
+
+    def get_single_flight(self):
+        """
+        Unione delle richieste identiche in corso, disattivabile con
+        LLM_SINGLE_FLIGHT_ENABLED=false
+        """
+        if "single_flight" not in self._instances:
+            self._instances["single_flight"] = (
+                SingleFlightLLMProvider(self.get_llm_provider())
+                if self._env_bool("LLM_SINGLE_FLIGHT_ENABLED", True) else None
+            )
+
+        return self._instances["single_flight"]
+
     def get_text_processor(self) -> TextProcessorService:
         if "text_processor" not in self._instances:
             
-            providers = self._get_providers_list()
-            llm_provider = LLMClientAdapter(providers=providers)
+            llm_provider = self.get_llm_provider()
+            model_key = llm_provider.model_key
+            single_flight = self.get_single_flight()
+            if single_flight is not None:
+                llm_provider = single_flight
+            cache = self.get_response_cache()
+            if cache is not None:
+                llm_provider = CachingLLMProvider(llm_provider, cache, model_key)
             
             prompt_builder = PromptBuilderAdapter()
             response_parser = JSONParserAdapter()
             
-            summarize_uc = SummarizeTextService(llm_provider, prompt_builder, response_parser)
+            summarize_uc = SummarizeTextService(
+                llm_provider,
+                prompt_builder,
+                response_parser,
+                chunk_chars=int(self._env_float("LLM_SUMMARIZE_CHUNK_CHARS", 8000)),
+                max_parallel=int(self._env_float("LLM_SUMMARIZE_MAX_PARALLEL", 4))
+            )
             improve_uc = ImproveTextService(llm_provider, prompt_builder, response_parser)
-            translate_uc = TranslateTextService(llm_provider, prompt_builder, response_parser)
-            six_hats_uc = AnalyzeSixHatsService(llm_provider, prompt_builder, response_parser)
+            translate_uc = TranslateTextService(
+                llm_provider,
+                prompt_builder,
+                response_parser,
+                segment_cache=cache,
+                cache_namespace=model_key,
+                min_segments=int(self._env_float("LLM_TRANSLATE_MIN_SEGMENTS", 4)),
+                max_parallel=int(self._env_float("LLM_TRANSLATE_MAX_PARALLEL", 4))
+            )
+            six_hats_uc = AnalyzeSixHatsService(
+                llm_provider,
+                prompt_builder,
+                response_parser,
+                max_parallel=int(self._env_float("LLM_SIX_HATS_MAX_PARALLEL", 6)),
+                single_call=self._env_bool("LLM_SIX_HATS_SINGLE_CALL")
+            )
             generate_uc = GenerateTextService(llm_provider, prompt_builder, response_parser)
             
             self._instances["text_processor"] = TextProcessorService(
@@ -71,4 +261,24 @@ class DIContainer:
                 generate_use_case=generate_uc
             )
         
-        return self._instances["text_processor"]
\ No newline at end of file
+        return self._instances["text_processor"]
+
+    def get_metrics_sources(self) -> dict:
+        """Sorgenti delle metriche esposte su /metrics"""
+        sources = {"providers": self.get_llm_provider().get_provider_health}
+        if self.get_response_cache() is not None:
+            sources["cache"] = self.get_response_cache().stats
+        if self.get_single_flight() is not None:
+            sources["single_flight"] = self.get_single_flight().stats
+        return sources
+
+    async def startup(self) -> None:
+        """Apre le risorse condivise (connection pool dei provider LLM)"""
+        await self.get_llm_provider().start()
+
+    async def shutdown(self) -> None:
+        """Rilascia le risorse condivise aperte allo startup"""
+        if "llm_provider" in self._instances:
+            await self._instances["llm_provider"].aclose()
+        if self._instances.get("response_cache") is not None:
+            self._instances["response_cache"].close()
@@ -2,6 +2,8 @@
 Main Entry Point - Hexagonal Architecture
 Wiring e avvio dell'applicazione
 """
+from contextlib import asynccontextmanager
+
 from infrastructure import settings, DIContainer
 from adapters.input import create_fastapi_app
 
@@ -9,7 +11,21 @@ from adapters.input import create_fastapi_app
 container = DIContainer(settings)
 text_processor = container.get_text_processor()
 
-app = create_fastapi_app(text_processor)
+
+@asynccontextmanager
+async def lifespan(app):
+    """Apre le connessioni condivise allo startup e le chiude allo shutdown"""
+    await container.startup()
+    yield
+    await container.shutdown()
+
+
+app = create_fastapi_app(
+    text_processor,
+    lifespan=lifespan,
+    metrics_sources=container.get_metrics_sources(),
+    readiness_check=container.get_llm_provider().get_readiness
+)
 
 if __name__ == "__main__":
     import uvicorn
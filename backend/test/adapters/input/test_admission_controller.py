@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from adapters.input.admission_controller import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_requests_within_limit_are_admitted():
+    """Verifica che le richieste entro il limite passino senza attesa"""
+    controller = AdmissionController(default_limit=2)
+
+    async with controller.slot("summarize"):
+        async with controller.slot("summarize"):
+            assert controller.stats()["summarize"]["active"] == 2
+
+    assert controller.stats()["summarize"]["admitted"] == 2
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_429():
+    """Verifica il rifiuto immediato (429) quando la coda è piena"""
+    controller = AdmissionController(default_limit=1, max_queue=0)
+
+    async with controller.slot("generate"):
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.slot("generate"):
+                pass
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    assert controller.stats()["generate"]["rejected_queue_full"] == 1
+
+@pytest.mark.asyncio
+async def test_queue_wait_timeout_is_rejected_with_503():
+    """Verifica il 503 quando l'attesa in coda supera il massimo"""
+    controller = AdmissionController(default_limit=1, max_queue=5, max_queue_wait=0.05)
+
+    async with controller.slot("translate"):
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.slot("translate"):
+                pass
+
+    assert excinfo.value.status_code == 503
+    assert controller.stats()["translate"]["queue_depth"] == 0
+
+@pytest.mark.asyncio
+async def test_queued_request_runs_when_slot_is_released():
+    """Verifica che una richiesta in coda venga servita appena si libera un posto"""
+    controller = AdmissionController(default_limit=1, max_queue=5, max_queue_wait=1.0)
+    order = []
+
+    async def worker(name, hold):
+        async with controller.slot("improve"):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    first = asyncio.create_task(worker("primo", 0.05))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(worker("secondo", 0))
+    await asyncio.sleep(0.01)
+
+    assert controller.stats()["improve"]["queue_depth"] == 1
+    await asyncio.gather(first, second)
+    assert order == ["primo", "secondo"]
+
+@pytest.mark.asyncio
+async def test_weighted_slot_counts_every_parallel_call():
+    """Verifica che una richiesta con fan-out occupi un posto per chiamata contemporanea"""
+    controller = AdmissionController(default_limit=4, max_queue=0)
+
+    async with controller.slot("six_hats", weight=3):
+        assert controller.stats()["six_hats"]["in_use"] == 3
+        with pytest.raises(AdmissionRejected):
+            async with controller.slot("six_hats", weight=2):
+                pass
+        async with controller.slot("six_hats"):
+            assert controller.stats()["six_hats"]["in_use"] == 4
+
+    # Il peso oltre il limite occupa tutti i posti senza bloccarsi
+    async with controller.slot("six_hats", weight=10):
+        assert controller.stats()["six_hats"]["in_use"] == 4
+    assert controller.stats()["six_hats"]["in_use"] == 0
+
+def test_per_operation_limits_from_env(monkeypatch):
+    """Verifica la lettura dei limiti per operazione dalle variabili d'ambiente"""
+    monkeypatch.setenv("LLM_ADMISSION_LIMIT_GENERATE", "1")
+    monkeypatch.setenv("LLM_ADMISSION_DEFAULT_LIMIT", "6")
+
+    controller = AdmissionController.from_env(["generate", "summarize"])
+
+    assert controller._gate("generate").limit == 1
+    assert controller._gate("summarize").limit == 6
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from adapters.input.request_registry import (
+    DuplicateRequestId,
+    RequestCancelled,
+    RequestRegistry,
+)
+from domain.models import ResultCode, ResultStatus
+
+
+@pytest.mark.asyncio
+async def test_cancel_interrupts_block_and_returns_cancelled_result():
+    """Verifica che l'annullamento interrompa il blocco e produca un risultato ben definito"""
+    registry = RequestRegistry()
+    entry = registry.track("req-1", "summarize")
+
+    async def work():
+        with entry.cancellable():
+            await asyncio.Event().wait()
+
+    task = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    assert registry.cancel("req-1")
+
+    with pytest.raises(RequestCancelled) as excinfo:
+        await task
+
+    assert excinfo.value.result.status == ResultStatus.CANCELLED
+    assert excinfo.value.result.code == ResultCode.CANCELLED
+    assert registry.stats() == {"in_flight": 1, "cancelled": 1, "superseded": 0}
+
+@pytest.mark.asyncio
+async def test_guard_does_not_interrupt_between_events():
+    """Verifica che un annullamento tra un elemento e l'altro fermi lo stream al passo successivo"""
+    registry = RequestRegistry()
+    entry = registry.track("req-1", "generate")
+    closed = []
+
+    async def events():
+        try:
+            yield "primo"
+            yield "secondo"
+        finally:
+            closed.append(True)
+
+    received = []
+    with pytest.raises(RequestCancelled):
+        async for event in entry.guard(events()):
+            received.append(event)
+            registry.cancel("req-1")
+            # L'invio al client non viene interrotto
+            await asyncio.sleep(0)
+
+    assert received == ["primo"]
+    assert closed == [True]
+
+def test_duplicate_and_unknown_request_ids():
+    """Verifica i conflitti sugli id in corso e l'annullamento di id sconosciuti"""
+    registry = RequestRegistry()
+    entry = registry.track("req-1", "improve")
+
+    with pytest.raises(DuplicateRequestId):
+        registry.track("req-1", "improve")
+    assert registry.cancel("altro") is False
+
+    registry.release(entry)
+    assert registry.stats()["in_flight"] == 0
+    assert registry.cancel("req-1") is False
+
+def test_same_supersede_key_cancels_previous_request():
+    """Verifica che una nuova richiesta con la stessa chiave sostituisca quella in corso"""
+    registry = RequestRegistry()
+    older = registry.track("req-1", "summarize", supersede_key="editor")
+    other = registry.track("req-2", "summarize", supersede_key="altro-editor")
+    newer = registry.track("req-3", "summarize", supersede_key="editor")
+
+    assert older.result().code == ResultCode.SUPERSEDED
+    assert not other.cancelled
+    assert not newer.cancelled
+
+    # Il rilascio della richiesta sostituita non libera la chiave della nuova
+    registry.release(older)
+    registry.track("req-4", "summarize", supersede_key="editor")
+    assert newer.result().code == ResultCode.SUPERSEDED
+    assert registry.stats()["superseded"] == 2
@@ -0,0 +1,90 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from adapters.output.caching_llm_provider import CachingLLMProvider
+from adapters.output.response_cache import TwoTierResponseCache
+from application.ports.output import ILLMProvider
+
+MESSAGES = [{"role": "user", "content": "Riassumi questo testo"}]
+
+
+@pytest.fixture
+def inner():
+    provider = MagicMock(spec=ILLMProvider)
+    provider.generate_completion = AsyncMock(return_value='{"data": "ok"}')
+    provider.report_parse_result = AsyncMock()
+    return provider
+
+@pytest.mark.asyncio
+async def test_identical_request_is_served_from_cache(inner):
+    """Verifica che una richiesta identica non richiami l'LLM"""
+    provider = CachingLLMProvider(inner, TwoTierResponseCache(), "LOCAL:llama3")
+
+    first = await provider.generate_completion(MESSAGES, temperature=0.1, operation="summarize")
+    second = await provider.generate_completion(MESSAGES, temperature=0.1, operation="summarize")
+
+    assert first == second == '{"data": "ok"}'
+    inner.generate_completion.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_other_operation_is_not_a_hit(inner):
+    """Verifica che operazioni diverse sullo stesso testo non condividano la cache"""
+    provider = CachingLLMProvider(inner, TwoTierResponseCache(), "LOCAL:llama3")
+
+    await provider.generate_completion(MESSAGES, operation="summarize")
+    await provider.generate_completion(MESSAGES, operation="improve")
+
+    assert inner.generate_completion.await_count == 2
+
+@pytest.mark.asyncio
+async def test_unparsable_response_is_evicted(inner):
+    """Verifica che una risposta non valida al parsing non venga servita di nuovo"""
+    provider = CachingLLMProvider(inner, TwoTierResponseCache(), "LOCAL:llama3")
+
+    raw = await provider.generate_completion(MESSAGES, operation="six_hats")
+    await provider.report_parse_result(raw, False)
+    await provider.generate_completion(MESSAGES, operation="six_hats")
+
+    assert inner.generate_completion.await_count == 2
+    inner.report_parse_result.assert_awaited_with(raw, False)
+
+@pytest.mark.asyncio
+async def test_stream_is_cached_only_when_complete(inner):
+    """Verifica che solo gli stream completi vengano memorizzati"""
+    async def stream(**kwargs):
+        yield "Ciao "
+        yield "mondo"
+
+    inner.generate_completion_stream = MagicMock(side_effect=stream)
+    provider = CachingLLMProvider(inner, TwoTierResponseCache(), "LOCAL:llama3")
+
+    partial = provider.generate_completion_stream(MESSAGES, operation="generate")
+    assert await partial.__anext__() == "Ciao "
+    await partial.aclose()
+
+    assert [c async for c in provider.generate_completion_stream(MESSAGES, operation="generate")] == ["Ciao ", "mondo"]
+    assert [c async for c in provider.generate_completion_stream(MESSAGES, operation="generate")] == ["Ciao mondo"]
+    assert inner.generate_completion_stream.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_aborted_stream_closes_inner_stream_immediately(inner):
+    """Verifica che chiudere lo stream chiuda subito quello interno, senza attendere il GC"""
+    closed = []
+
+    async def stream(**kwargs):
+        try:
+            yield "Ciao "
+            yield "mondo"
+        finally:
+            closed.append(True)
+
+    inner.generate_completion_stream = MagicMock(side_effect=stream)
+    provider = CachingLLMProvider(inner, TwoTierResponseCache(), "LOCAL:llama3")
+
+    partial = provider.generate_completion_stream(MESSAGES, operation="generate")
+    assert await partial.__anext__() == "Ciao "
+    await partial.aclose()
+
+    assert closed == [True]
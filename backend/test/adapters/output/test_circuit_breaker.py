@@ -0,0 +1,76 @@
+import pytest
+from adapters.output.circuit_breaker import CircuitBreaker, CircuitState, RetryBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=2, recovery_timeout=30.0, probe_interval=5.0, clock=clock)
+
+def test_breaker_opens_after_threshold(breaker):
+    """Verifica che il circuito si apra dopo N errori consecutivi"""
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+def test_success_resets_failure_count(breaker):
+    """Verifica che un successo azzeri il conteggio degli errori"""
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+def test_half_open_allows_trickle_of_probes(breaker, clock):
+    """Verifica che in half-open passi solo una richiesta di prova per intervallo"""
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 31.0
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    clock.now = 36.0
+    assert breaker.allow_request() is True
+
+def test_half_open_probe_outcome(breaker, clock):
+    """Verifica che la prova richiuda il circuito se riesce e lo riapra se fallisce"""
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 31.0
+    breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 62.0
+    breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+
+def test_retry_budget_is_exhausted_and_refilled(clock):
+    """Verifica che il budget limiti i retry e si ricarichi con il traffico"""
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_balance=1.0, clock=clock)
+
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend() is True
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from adapters.output.health_prober import HealthProber
+
+PROVIDERS = [{"name": "LOCAL"}, {"name": "GROQ"}]
+
+
+def make_prober(probe, interval=None):
+    return HealthProber(PROVIDERS, probe, lambda p: p["name"], interval=interval)
+
+@pytest.mark.asyncio
+async def test_probe_all_records_state_and_latency():
+    """Verifica che ogni provider riporti stato e latenza dell'ultima sonda"""
+    async def probe(provider):
+        if provider["name"] == "GROQ":
+            raise Exception("HTTP 500")
+
+    prober = make_prober(probe)
+    assert not prober.has_probed()
+
+    await prober.probe_all()
+
+    snapshot = prober.snapshot()
+    assert snapshot["LOCAL"]["status"] == "ready"
+    assert snapshot["LOCAL"]["latency"] is not None
+    assert snapshot["GROQ"]["status"] == "down"
+    assert snapshot["GROQ"]["last_error"] == "HTTP 500"
+    assert snapshot["GROQ"]["consecutive_failures"] == 1
+    assert prober.is_ready()
+
+@pytest.mark.asyncio
+async def test_not_ready_when_every_probe_fails():
+    """Verifica che senza provider raggiungibili il servizio non sia pronto"""
+    async def probe(provider):
+        raise Exception("Connection refused")
+
+    prober = make_prober(probe)
+    await prober.probe_all()
+
+    assert prober.has_probed()
+    assert not prober.is_ready()
+
+@pytest.mark.asyncio
+async def test_periodic_probes_run_until_stopped():
+    """Verifica che le sonde periodiche si ripetano e si fermino allo shutdown"""
+    calls = []
+
+    async def probe(provider):
+        calls.append(provider["name"])
+
+    prober = make_prober(probe, interval=0.01)
+    prober.start()
+    await asyncio.sleep(0.05)
+    await prober.stop()
+
+    count = len(calls)
+    assert count >= 4
+    await asyncio.sleep(0.03)
+    assert len(calls) == count
+
+
+@pytest.mark.asyncio
+async def test_down_providers_are_reprobed_with_backoff():
+    """Verifica che senza sonde periodiche un provider down venga risondato finché non torna pronto"""
+    calls = []
+
+    async def probe(provider):
+        calls.append(provider["name"])
+        if provider["name"] == "LOCAL" and calls.count("LOCAL") < 3:
+            raise Exception("Connection refused")
+
+    prober = HealthProber(PROVIDERS, probe, lambda p: p["name"], interval=None, retry_delay=0.01)
+    prober.start()
+    await asyncio.sleep(0.1)
+    await prober.stop()
+
+    assert prober.snapshot()["LOCAL"]["status"] == "ready"
+    assert calls.count("LOCAL") == 3
+    # Il provider già pronto non viene risondato
+    assert calls.count("GROQ") == 1
+
+
+def test_request_results_update_state():
+    """Verifica che l'esito delle richieste reali aggiorni lo stato dei provider sondati"""
+    async def probe(provider):
+        pass
+
+    prober = make_prober(probe)
+    prober.record_result({"name": "LOCAL"}, Exception("HTTP 500"))
+    assert prober.snapshot()["LOCAL"]["status"] == "down"
+    assert not prober.is_ready()
+
+    prober.record_result({"name": "LOCAL"})
+    prober.record_result({"name": "ALTRO"})
+    assert prober.snapshot()["LOCAL"]["status"] == "ready"
+    assert "ALTRO" not in prober.snapshot()
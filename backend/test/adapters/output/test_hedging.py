@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from adapters.output.hedging import HedgePolicy, PumpedStream
+
+
+def test_delay_uses_default_until_enough_samples():
+    """Verifica il ritardo di default quando mancano campioni"""
+    policy = HedgePolicy(default_delay=1.5, min_samples=3)
+    policy.record_ttft("LOCAL", 0.1)
+
+    assert policy.delay_for("LOCAL") == 1.5
+    assert policy.delay_for("GROQ") == 1.5
+
+def test_delay_follows_percentile_and_is_clamped():
+    """Verifica che il ritardo segua il percentile dei TTFT e rispetti i limiti"""
+    policy = HedgePolicy(percentile=0.9, min_delay=0.2, max_delay=5.0, min_samples=10)
+    for i in range(1, 11):
+        policy.record_ttft("LOCAL", i * 0.1)
+
+    assert policy.delay_for("LOCAL") == pytest.approx(1.0)
+
+    for _ in range(10):
+        policy.record_ttft("SLOW", 30.0)
+    assert policy.delay_for("SLOW") == 5.0
+
+@pytest.mark.asyncio
+async def test_pumped_stream_forwards_chunks_and_errors():
+    """Verifica che il pump inoltri i chunk e propaghi gli errori dello stream"""
+    async def source():
+        yield "a"
+        yield "b"
+        raise RuntimeError("stream interrotto")
+
+    stream = PumpedStream(source())
+    received = []
+
+    with pytest.raises(RuntimeError):
+        async for chunk in stream:
+            received.append(chunk)
+
+    assert received == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_pumped_stream_aclose_closes_source():
+    """Verifica che aclose() interrompa lo stream sottostante"""
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            yield "a"
+            await asyncio.sleep(10)
+        finally:
+            closed.set()
+
+    stream = PumpedStream(source())
+    assert await stream.__anext__() == "a"
+
+    await stream.aclose()
+
+    assert closed.is_set()
+
+@pytest.mark.asyncio
+async def test_pumped_stream_applies_backpressure_to_source():
+    """Verifica che il pump smetta di leggere quando il consumatore resta indietro"""
+    produced = []
+
+    async def source():
+        for i in range(100):
+            produced.append(i)
+            yield str(i)
+
+    stream = PumpedStream(source(), max_buffered=4)
+    await asyncio.sleep(0.01)
+
+    # 4 chunk in coda più quello in attesa di spazio
+    assert len(produced) == 5
+    assert await stream.__anext__() == "0"
+
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pumped_stream_aclose_closes_source_blocked_on_full_queue():
+    """Verifica che lo stream venga chiuso anche se il pump è fermo sulla coda piena"""
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            for i in range(100):
+                yield str(i)
+        finally:
+            closed.set()
+
+    stream = PumpedStream(source(), max_buffered=2)
+    await asyncio.sleep(0.01)
+
+    await stream.aclose()
+
+    assert closed.is_set()
@@ -55,4 +55,36 @@ def test_parse_with_special_characters(parser):
     result = parser.parse_response(raw)
     
     assert result.status == ResultStatus.SUCCESS
-    assert "Riga 1" in result.rewritten_text
\ No newline at end of file
+    assert "Riga 1" in result.rewritten_text
+
+
+def test_parse_multi_response_splits_by_key(parser):
+    """Verifica che una risposta con più cappelli venga divisa in un risultato per cappello"""
+    raw = """```json
+    {
+      "Nero": {"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "Rischi"}},
+      "verde": {"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "Idee"}}
+    }
+    ```"""
+    results = parser.parse_multi_response(raw, ["nero", "verde", "blu"])
+
+    assert results["nero"].rewritten_text == "Rischi"
+    assert results["verde"].rewritten_text == "Idee"
+    assert results["blu"].status == ResultStatus.ERROR
+    assert "blu" in results["blu"].violation_category
+
+
+def test_parse_multi_response_shared_outcome(parser):
+    """Verifica che un rifiuto unico al primo livello valga per tutti i cappelli"""
+    raw = '{"outcome": {"status": "refusal", "code": "MANIPULATION"}, "data": null}'
+    results = parser.parse_multi_response(raw, ["nero", "verde"])
+
+    assert all(r.code == ResultCode.MANIPULATION for r in results.values())
+
+
+def test_parse_multi_response_invalid_json(parser):
+    """Verifica che un JSON non valido produca un errore per ogni cappello"""
+    results = parser.parse_multi_response("nessun json", ["nero", "verde"])
+
+    assert set(results) == {"nero", "verde"}
+    assert all(r.code == ResultCode.TECHNICAL_ERROR for r in results.values())
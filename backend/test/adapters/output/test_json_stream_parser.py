@@ -0,0 +1,105 @@
+import pytest
+
+from adapters.output.json_parser_adapter import JSONParserAdapter
+from domain.models import LLMOutcome, ResultCode, ResultStatus
+
+RESPONSE = (
+    'Ecco il risultato:\n```json\n'
+    '{"outcome": {"status": "success", "code": "OK", "violation_category": null}, '
+    '"data": {"rewritten_text": "Riga 1\\nRiga \\"2\\" \\u00e8 ok \\ud83d\\ude00 {graffe}", "detected_language": "it"}}'
+    '\n```\nNota finale {non json}'
+)
+
+
+def feed_all(raw, size):
+    parser = JSONParserAdapter().stream_parser()
+    events = []
+    for i in range(0, len(raw), size):
+        events.extend(parser.feed(raw[i:i + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, 1000])
+def test_stream_parser_is_chunking_independent(size):
+    """Verifica che il testo decodificato non dipenda da come è spezzato lo stream"""
+    parser, events = feed_all(RESPONSE, size)
+
+    text = "".join(e for e in events if isinstance(e, str))
+    assert text == 'Riga 1\nRiga "2" è ok 😀 {graffe}'
+    assert parser.text_complete and parser.done
+    assert parser.finish().rewritten_text == text
+
+
+def test_stream_parser_emits_outcome_before_text():
+    """Verifica che l'outcome arrivi appena completo, prima del testo"""
+    parser = JSONParserAdapter().stream_parser()
+
+    assert parser.feed('{"outcome": {"status": "refusal", "code": "ETHIC_REF') == []
+    events = parser.feed('USAL"}, "data": {"rewritten_text": "No')
+
+    assert isinstance(events[0], LLMOutcome)
+    assert events[0].status == ResultStatus.REFUSAL
+    assert events[0].code == ResultCode.ETHIC_REFUSAL
+    assert events[1:] == ["No"]
+    assert parser.outcome is events[0]
+
+
+def test_stream_parser_ignores_other_fields_and_chatter():
+    """Verifica che solo data.rewritten_text venga emesso come testo"""
+    raw = (
+        '{"note": {"rewritten_text": "no"}, "outcome": {"status": "success", "code": "OK"}, '
+        '"data": {"detected_language": "it", "rewritten_text": "sì"}} {"rewritten_text": "dopo"}'
+    )
+    parser, events = feed_all(raw, 3)
+
+    assert "".join(e for e in events if isinstance(e, str)) == "sì"
+
+
+def test_stream_parser_accepts_raw_newlines():
+    """Verifica il recupero di output con a capo non escapati, come extract_json"""
+    raw = '{"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "a\nb"}}'
+    parser, events = feed_all(raw, 4)
+
+    assert "".join(e for e in events if isinstance(e, str)) == "a\nb"
+    assert parser.finish().rewritten_text == "a\nb"
+
+
+def test_stream_parser_terminal_on_non_success_outcome():
+    """Verifica che un esito negativo renda lo stream terminabile con un risultato valido"""
+    parser = JSONParserAdapter().stream_parser()
+    parser.feed('```json\n{"outcome": {"status": "INVALID_INPUT", "code": "EMPTY_TEXT", "violation_category": null}, "da')
+
+    assert parser.terminal
+    result = parser.finish()
+    assert result.status == ResultStatus.INVALID_INPUT
+    assert result.code == ResultCode.EMPTY_TEXT
+    assert result.rewritten_text is None
+
+
+def test_stream_parser_not_terminal_while_text_open():
+    """Verifica che un esito positivo non basti: serve rewritten_text completo"""
+    parser = JSONParserAdapter().stream_parser()
+    parser.feed('{"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "in cor')
+
+    assert not parser.terminal
+    parser.feed('so"')
+    assert parser.terminal
+    assert parser.finish().rewritten_text == "in corso"
+
+
+def test_stream_parser_data_before_outcome():
+    """Verifica che con data prima di outcome lo stream resti aperto fino all'outcome"""
+    raw = (
+        '{"data": {"rewritten_text": "Testo riscritto", "detected_language": "it"}, '
+        '"outcome": {"status": "success", "code": "OK", "violation_category": null}}'
+    )
+    parser = JSONParserAdapter().stream_parser()
+    parser.feed(raw[:raw.index('"outcome"')])
+
+    assert parser.text_complete and not parser.terminal
+    parser.feed(raw[raw.index('"outcome"'):-1])
+    assert parser.terminal
+    result = parser.finish()
+    assert result.status == ResultStatus.SUCCESS
+    assert result.rewritten_text == "Testo riscritto"
+    assert result == JSONParserAdapter().parse_response(raw)
@@ -1,7 +1,13 @@
+import asyncio
 import pytest
 import json
+import httpx
 from unittest.mock import AsyncMock, patch, MagicMock
 from adapters.output.llm_client_adapter import LLMClientAdapter
+from adapters.output.circuit_breaker import CircuitBreaker, RetryBudget
+from adapters.output.hedging import HedgePolicy
+from adapters.output.provider_router import ProviderRouter
+from adapters.output.timeouts import PhaseTimeouts, ProviderTimeoutError, TimeoutPolicy
 
 @pytest.fixture
 def providers():
@@ -55,6 +61,482 @@ async def test_all_providers_fail_raises_exception(adapter):
         assert "Nessun servizio AI disponibile" in str(excinfo.value)
 
 @pytest.mark.asyncio
-async def test_validate_connection_always_true(adapter):
-    """Verifica il metodo obbligatorio dal contratto"""
-    assert await adapter.validate_connection() is True
\ No newline at end of file
+async def test_validate_connection_uses_probes(adapter):
+    """Verifica il metodo obbligatorio dal contratto: pronto se almeno un provider risponde"""
+    async def probe(provider):
+        if provider["name"] == "Primary":
+            raise Exception("Connection refused")
+
+    with patch.object(adapter._prober, "_probe", side_effect=probe):
+        assert await adapter.validate_connection() is True
+
+    health = adapter.get_readiness()["providers"]
+    assert health["Primary"]["status"] == "down"
+    assert health["Fallback"]["status"] == "ready"
+
+@pytest.mark.asyncio
+async def test_probe_is_a_minimal_request_with_keep_alive(providers):
+    """Verifica che la sonda chieda un solo token e mantenga il modello caricato"""
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "p"}}]})
+
+    providers[0]["keep_alive"] = "30m"
+    adapter = LLMClientAdapter(providers, warm_up=True)
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+        assert adapter.get_readiness()["ready"] is False
+        await adapter.start()
+        await asyncio.sleep(0.05)
+
+        assert adapter.get_readiness()["ready"] is True
+        await adapter.aclose()
+
+    assert requests[0]["max_tokens"] == 1
+    assert requests[0]["stream"] is False
+    assert requests[0]["keep_alive"] == "30m"
+
+def test_probes_skip_metered_providers_by_default():
+    """Verifica che i provider con chiave API non vengano sondati se non richiesto"""
+    adapter = LLMClientAdapter([
+        {"name": "LOCAL", "url": "http://local", "model": "m"},
+        {"name": "GROQ", "url": "http://groq", "model": "m", "key": "k"},
+        {"name": "GOOGLE", "url": "http://google", "model": "m", "key": "k", "probe": True}
+    ], warm_up=True)
+
+    assert set(adapter.get_readiness()["providers"]) == {"LOCAL", "GOOGLE"}
+
+@pytest.mark.asyncio
+async def test_readiness_follows_unprobed_circuits_and_real_requests():
+    """Verifica che un provider locale down all'avvio non renda il servizio non pronto per sempre"""
+    adapter = LLMClientAdapter([
+        {"name": "LOCAL", "url": "http://local", "model": "m"},
+        {"name": "GROQ", "url": "http://groq", "model": "m", "key": "k"}
+    ], warm_up=True, breaker_factory=lambda: CircuitBreaker(failure_threshold=1))
+
+    async def probe(provider):
+        raise Exception("Connection refused")
+
+    with patch.object(adapter._prober, "_probe", side_effect=probe):
+        await adapter._prober.probe_all()
+
+    # GROQ non è sondato ma ha il circuito chiuso
+    assert adapter.get_readiness()["ready"] is True
+    adapter._record_failure({"name": "GROQ"}, Exception("HTTP 500"))
+    assert adapter.get_readiness()["ready"] is False
+
+    async def mock_stream(provider, *args, **kwargs):
+        yield "ok"
+
+    with patch.object(adapter, "_providers_for_request", return_value=[adapter._providers[0]]):
+        with patch.object(LLMClientAdapter, "_call_api_stream", side_effect=mock_stream):
+            assert await adapter.generate_completion([{"role": "user", "content": "hi"}]) == "ok"
+
+    assert adapter.get_readiness()["providers"]["LOCAL"]["status"] == "ready"
+    assert adapter.get_readiness()["ready"] is True
+
+
+@pytest.mark.asyncio
+async def test_aborted_stream_closes_provider_stream_immediately(adapter):
+    """Verifica che chiudere lo stream chiuda subito quello verso il provider"""
+    closed = []
+
+    async def mock_stream(*args, **kwargs):
+        try:
+            yield "Ciao "
+            yield "mondo"
+        finally:
+            closed.append(True)
+
+    with patch.object(LLMClientAdapter, "_call_api_stream", side_effect=mock_stream):
+        stream = adapter.generate_completion_stream([{"role": "user", "content": "hi"}])
+        assert await stream.__anext__() == "Ciao "
+        await stream.aclose()
+
+        assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_probe_consumes_rate_limit():
+    """Verifica che la sonda passi dal rate limiter e non parta con il bucket esaurito"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "p"}}]})
+
+    provider = {"name": "LOCAL", "url": "http://local", "model": "m", "rpm": 1}
+    adapter = LLMClientAdapter([provider], rate_limit_max_wait=0)
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+        await adapter._probe_provider(provider)
+        await adapter._probe_provider(provider)
+        await adapter.aclose()
+
+    assert len(requests) == 1
+
+@pytest.mark.asyncio
+async def test_client_is_shared_between_calls_and_closed_on_shutdown(adapter, providers):
+    """Verifica che il connection pool sia unico per provider e venga chiuso allo shutdown"""
+    await adapter.start()
+    client = adapter._get_client(providers[0])
+
+    assert adapter._get_client(providers[0]) is client
+    assert adapter._get_client(providers[1]) is not client
+
+    await adapter.aclose()
+
+    assert client.is_closed
+    assert adapter._clients == {}
+
+@pytest.mark.asyncio
+async def test_call_api_stream_reuses_pooled_client(providers):
+    """Verifica che più chiamate in streaming usino lo stesso client condiviso"""
+    def handler(request):
+        body = (
+            'data: {"choices": [{"delta": {"content": "ok"}}]}\n\n'
+            'data: [DONE]\n\n'
+        )
+        return httpx.Response(200, text=body)
+
+    adapter = LLMClientAdapter(providers)
+    created = []
+
+    def create_client(provider):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        created.append(client)
+        return client
+
+    with patch.object(adapter, "_create_client", side_effect=create_client):
+        for _ in range(3):
+            chunks = [c async for c in adapter._call_api_stream(providers[0], [], 0.1)]
+            assert chunks == ["ok"]
+
+    assert len(created) == 1
+    await adapter.aclose()
+
+@pytest.mark.asyncio
+async def test_uds_provider_uses_unix_socket_transport():
+    """Verifica che un provider con socket Unix usi un transport dedicato"""
+    provider = {"name": "LOCAL", "url": "http://localhost/v1/chat/completions",
+                "model": "llama3", "uds": "/tmp/ollama.sock"}
+    adapter = LLMClientAdapter([provider])
+
+    client = adapter._get_client(provider)
+
+    assert isinstance(client._transport, httpx.AsyncHTTPTransport)
+    await adapter.aclose()
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_dead_provider(providers):
+    """Verifica che un provider con circuito aperto venga saltato senza chiamarlo"""
+    adapter = LLMClientAdapter(providers, breaker_factory=lambda: CircuitBreaker(failure_threshold=1))
+    called = []
+
+    async def mock_stream(provider, *args, **kwargs):
+        called.append(provider["name"])
+        if provider["name"] == "Primary":
+            raise Exception("Primary Down")
+        yield "ok"
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        await adapter.generate_completion([{"role": "user", "content": "hi"}])
+        await adapter.generate_completion([{"role": "user", "content": "hi"}])
+
+    assert called == ["Primary", "Fallback", "Fallback"]
+    assert adapter.get_provider_health()["Primary"]["state"] == "open"
+
+@pytest.mark.asyncio
+async def test_retry_budget_caps_fallback_attempts(providers):
+    """Verifica che a budget esaurito non si tenti il fallback"""
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_balance=0.0)
+    adapter = LLMClientAdapter(providers, retry_budget=budget)
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=Exception("Down")) as mock_call:
+        with pytest.raises(Exception, match="Nessun servizio AI disponibile"):
+            await adapter.generate_completion([{"role": "user", "content": "hi"}])
+
+    assert mock_call.call_count == 1
+
+@pytest.mark.asyncio
+async def test_hedged_request_uses_fastest_provider_and_cancels_slow_one(providers):
+    """Verifica che con hedging vinca il primo provider che produce token e l'altro venga chiuso"""
+    adapter = LLMClientAdapter(providers, hedge_policy=HedgePolicy(default_delay=0.05))
+    primary_closed = asyncio.Event()
+
+    async def mock_stream(provider, *args, **kwargs):
+        if provider["name"] == "Primary":
+            try:
+                await asyncio.sleep(10)
+                yield "lento"
+            finally:
+                primary_closed.set()
+        else:
+            yield "veloce"
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        result = await asyncio.wait_for(
+            adapter.generate_completion([{"role": "user", "content": "hi"}]), timeout=2
+        )
+
+    assert result == "veloce"
+    assert primary_closed.is_set()
+
+@pytest.mark.asyncio
+async def test_hedge_not_started_when_first_token_is_fast(providers):
+    """Verifica che l'hedge non parta se il primo provider risponde entro il ritardo"""
+    adapter = LLMClientAdapter(providers, hedge_policy=HedgePolicy(default_delay=1.0))
+    called = []
+
+    async def mock_stream(provider, *args, **kwargs):
+        called.append(provider["name"])
+        yield "ok"
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        result = await adapter.generate_completion([{"role": "user", "content": "hi"}])
+
+    assert result == "ok"
+    assert called == ["Primary"]
+
+@pytest.mark.asyncio
+async def test_router_feedback_reorders_providers(providers):
+    """Verifica che il router riceva latenza ed esito del parsing e riordini i provider"""
+    router = ProviderRouter(explore_ratio=0.0)
+    adapter = LLMClientAdapter(providers, router=router)
+
+    async def mock_stream(provider, *args, **kwargs):
+        yield "risposta"
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        raw = await adapter.generate_completion([{"role": "user", "content": "hi"}])
+    await adapter.report_parse_result(raw, success=False)
+
+    router.record_success("Fallback", ttft=0.0, chunk_count=1, generation_seconds=0.0)
+
+    assert router.snapshot()["Primary"]["parse_success_rate"] < 1.0
+    assert list(adapter._providers_for_request())[0]["name"] == "Fallback"
+
+@pytest.mark.asyncio
+async def test_transient_429_is_retried_before_fallback(providers):
+    """Verifica che un 429 transitorio venga ripetuto sullo stesso provider"""
+    responses = iter([
+        httpx.Response(429, headers={"retry-after": "0"}),
+        httpx.Response(200, text='data: {"choices": [{"delta": {"content": "ok"}}]}\n\ndata: [DONE]\n\n'),
+    ])
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        return next(responses)
+
+    adapter = LLMClientAdapter(providers)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with patch.object(adapter, "_create_client", return_value=client):
+        result = await adapter.generate_completion([{"role": "user", "content": "hi"}])
+
+    assert result == "ok"
+    assert seen == ["http://primary.ai", "http://primary.ai"]
+    assert adapter.get_provider_health()["Primary"]["state"] == "closed"
+    await adapter.aclose()
+
+@pytest.mark.asyncio
+async def test_rate_limited_provider_falls_back_without_opening_circuit(providers):
+    """Verifica che un provider in rate limit venga saltato senza contare come guasto"""
+    adapter = LLMClientAdapter(providers, rate_limit_max_wait=1.0,
+                               breaker_factory=lambda: CircuitBreaker(failure_threshold=1))
+    adapter._rate_limiters["Primary"].block_for(60)
+
+    async def mock_stream(provider, *args, **kwargs):
+        yield provider["name"]
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        result = await adapter.generate_completion([{"role": "user", "content": "hi"}])
+
+    assert result == "Fallback"
+    assert adapter.get_provider_health()["Primary"]["state"] == "closed"
+
+def _stalling_transport(first_chunks):
+    """Transport che invia alcuni chunk SSE e poi resta bloccato"""
+    class StallingStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for content in first_chunks:
+                yield f'data: {json.dumps({"choices": [{"delta": {"content": content}}]})}\n\n'.encode()
+            await asyncio.sleep(10)
+
+    return httpx.MockTransport(lambda request: httpx.Response(200, stream=StallingStream()))
+
+@pytest.mark.asyncio
+async def test_first_token_timeout_fails_over_quickly(providers):
+    """Verifica che un provider che non invia token venga abbandonato alla scadenza del primo token"""
+    policy = TimeoutPolicy(PhaseTimeouts(connect=1, first_token=0.05, idle=1))
+    adapter = LLMClientAdapter(providers[:1], timeout_policy=policy)
+
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=_stalling_transport([]))):
+        with pytest.raises(Exception, match="first_token"):
+            await asyncio.wait_for(adapter.generate_completion([{"role": "user", "content": "hi"}]), timeout=2)
+
+    await adapter.aclose()
+
+@pytest.mark.asyncio
+async def test_idle_timeout_between_chunks(providers):
+    """Verifica che uno stream che si blocca a metà scada per inattività"""
+    policy = TimeoutPolicy(PhaseTimeouts(connect=1, first_token=1, idle=0.05))
+    adapter = LLMClientAdapter(providers[:1], timeout_policy=policy)
+    received = []
+
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=_stalling_transport(["a", "b"]))):
+        with pytest.raises(ProviderTimeoutError) as excinfo:
+            async for chunk in adapter._call_api_stream(providers[0], [], 0.1):
+                received.append(chunk)
+
+    assert received == ["a", "b"]
+    assert excinfo.value.phase == "idle"
+    await adapter.aclose()
+
+@pytest.mark.asyncio
+async def test_operation_timeouts_are_resolved_per_request(providers):
+    """Verifica che l'operazione richiesta selezioni i timeout specifici"""
+    policy = TimeoutPolicy(per_operation={"generate": {"first_token": 99}})
+    adapter = LLMClientAdapter(providers, timeout_policy=policy)
+    seen = []
+
+    async def mock_stream(provider, messages, temperature, timeouts):
+        seen.append(timeouts.first_token)
+        yield "ok"
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        await adapter.generate_completion([{"role": "user", "content": "hi"}], operation="generate")
+
+    assert seen == [99]
+
+@pytest.mark.asyncio
+async def test_mid_stream_failure_resumes_on_next_provider(providers):
+    """Verifica che un provider caduto a metà venga proseguito dal successivo senza duplicati"""
+    continuation_requests = []
+
+    async def mock_stream(provider, messages, *args, **kwargs):
+        if provider["name"] == "Primary":
+            yield "Uno due "
+            yield "tre "
+            raise Exception("Connessione persa")
+        continuation_requests.append(messages)
+        yield "tre quattro"
+
+    adapter = LLMClientAdapter(providers)
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        chunks = [c async for c in adapter.generate_completion_stream([{"role": "user", "content": "conta"}])]
+
+    assert "".join(chunks) == "Uno due tre quattro"
+    assert continuation_requests[0][1] == {"role": "assistant", "content": "Uno due tre "}
+
+@pytest.mark.asyncio
+async def test_provider_with_small_context_is_skipped():
+    """Verifica che un provider con contesto insufficiente venga saltato senza chiamarlo"""
+    providers = [
+        {"name": "LOCAL", "url": "http://localhost:11434/v1/chat/completions", "model": "llama3", "context_window": 4096},
+        {"name": "GROQ", "url": "http://groq.ai", "model": "llama-3.1-8b-instant"}
+    ]
+    adapter = LLMClientAdapter(providers)
+    called = []
+
+    async def mock_stream(provider, *args, **kwargs):
+        called.append(provider["name"])
+        yield "ok"
+
+    long_prompt = [{"role": "user", "content": "parola " * 3000}]
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        assert await adapter.generate_completion(long_prompt) == "ok"
+        assert await adapter.generate_completion([{"role": "user", "content": "breve"}]) == "ok"
+
+    assert called == ["GROQ", "LOCAL"]
+
+@pytest.mark.asyncio
+async def test_num_ctx_and_max_tokens_follow_prompt_size():
+    """Verifica che num_ctx e max_tokens vengano calcolati dalla dimensione del prompt"""
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, text='{"message": {"content": "ok"}, "done": true}\n')
+
+    provider = {
+        "name": "LOCAL", "url": "http://localhost:11434/api/chat", "model": "llama3.1:8b",
+        "protocol": "ollama", "max_output": 1000, "options": {"num_thread": 4}
+    }
+    adapter = LLMClientAdapter([provider])
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+        for words in (10, 5000):
+            [c async for c in adapter._call_api_stream(provider, [{"role": "user", "content": "parola " * words}])]
+
+    assert bodies[0]["options"]["num_ctx"] == 4096
+    assert bodies[1]["options"]["num_ctx"] == 12288
+    assert bodies[0]["options"]["num_predict"] == 1000
+    assert bodies[0]["options"]["num_thread"] == 4
+
+
+@pytest.mark.asyncio
+async def test_unknown_model_family_sends_no_max_tokens():
+    """Verifica che per una famiglia non riconosciuta non venga inviato max_tokens"""
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, text='data: {"choices": [{"delta": {"content": "ok"}}]}\n\ndata: [DONE]\n\n')
+
+    provider = {"name": "HOSTED", "url": "https://api.example.com/v1/chat/completions", "model": "modello-sconosciuto"}
+    adapter = LLMClientAdapter([provider])
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+        [c async for c in adapter._call_api_stream(provider, [{"role": "user", "content": "parola " * 5000}])]
+
+    assert "max_tokens" not in bodies[0]
+
+@pytest.mark.asyncio
+async def test_ollama_native_protocol_streams_ndjson():
+    """Verifica lo streaming NDJSON di /api/chat e che non vengano inviate opzioni non configurate"""
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        lines = [
+            {"message": {"role": "assistant", "content": "Ciao "}, "done": False},
+            {"message": {"role": "assistant", "content": "mondo"}, "done": False},
+            {"message": {"role": "assistant", "content": ""}, "done": True, "eval_count": 2},
+        ]
+        return httpx.Response(200, text="".join(json.dumps(line) + "\n" for line in lines))
+
+    providers = [
+        {"name": "LOCAL", "url": "http://ollama:11434/api/chat", "model": "llama3", "protocol": "ollama", "keep_alive": "30m"},
+        {"name": "GROQ", "url": "http://zucchetti.groq.ai:11434/v1", "model": "llama3"}
+    ]
+    adapter = LLMClientAdapter(providers)
+    with patch.object(adapter, "_create_client", return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler))):
+        chunks = [c async for c in adapter._call_api_stream(providers[0], [{"role": "user", "content": "hi"}])]
+        [c async for c in adapter._call_api_stream(providers[1], [{"role": "user", "content": "hi"}])]
+
+    assert chunks == ["Ciao ", "mondo"]
+    assert bodies[0]["keep_alive"] == "30m"
+    assert "temperature" in bodies[0]["options"]
+    # Niente più opzioni Ollama dedotte dall'URL
+    assert "options" not in bodies[1]
+
+@pytest.mark.asyncio
+async def test_max_concurrency_queues_requests_per_provider(providers):
+    """Verifica che max_concurrency limiti le chiamate contemporanee verso un provider"""
+    providers[0]["max_concurrency"] = 1
+    adapter = LLMClientAdapter(providers[:1])
+    active, peak = 0, 0
+
+    async def mock_stream(*args, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        yield "ok"
+        active -= 1
+
+    with patch.object(LLMClientAdapter, '_call_api_stream', side_effect=mock_stream):
+        results = await asyncio.gather(*(adapter.generate_completion([{"role": "user", "content": "hi"}]) for _ in range(3)))
+
+    assert results == ["ok"] * 3
+    assert peak == 1
@@ -30,10 +30,10 @@ def test_build_six_hats_specific_instruction(builder):
     doc = TextDocument(content="Idea di business")
     
     messages = builder.build_six_hats_prompt(doc, "nero")
-    system_content = messages[0]["content"]
+    user_content = messages[1]["content"]
     
-    assert "CAPPELLO NERO" in system_content.upper()
-    assert "avvocato del diavolo" in system_content.lower()
+    assert "CAPPELLO NERO" in user_content.upper()
+    assert "avvocato del diavolo" in user_content.lower()
 
 def test_build_generate_prompt_with_context(builder):
     """Verifica che la generazione includa il contesto se fornito"""
@@ -45,7 +45,7 @@ def test_build_generate_prompt_with_context(builder):
     
     assert "<context>" in user_content
     assert context in user_content
-    assert "100" in messages[0]["content"] # Word count nel system prompt
+    assert "100" in user_content # Word count nel messaggio utente
 
 def test_build_translate_target_language(builder):
     """Verifica che la lingua di destinazione sia corretta nel prompt"""
@@ -55,4 +55,46 @@ def test_build_translate_target_language(builder):
     messages = builder.build_translate_prompt(doc, target)
     
     assert target in messages[1]["content"]
-    assert "motore di traduzione AI" in messages[0]["content"]
\ No newline at end of file
+    assert "motore di traduzione AI" in messages[0]["content"]
+
+def test_system_prompt_is_byte_stable(builder):
+    """Verifica che il messaggio di sistema non dipenda dai parametri della chiamata"""
+    doc_a = TextDocument(content="Primo testo")
+    doc_b = TextDocument(content="Secondo testo, diverso")
+
+    pairs = [
+        (builder.build_summarize_prompt(doc_a, 20), builder.build_summarize_prompt(doc_b, 80)),
+        (builder.build_improve_prompt(doc_a, "formale"), builder.build_improve_prompt(doc_b, "conciso")),
+        (builder.build_translate_prompt(doc_a, "Inglese"), builder.build_translate_prompt(doc_b, "Tedesco")),
+        (builder.build_six_hats_prompt(doc_a, "nero"), builder.build_six_hats_prompt(doc_b, "verde")),
+        (builder.build_generate_prompt("Scrivi", word_count=100), builder.build_generate_prompt("Altro", "ctx", 500)),
+    ]
+    for first, second in pairs:
+        assert first[0]["content"].encode() == second[0]["content"].encode()
+        assert first[0]["content"] is second[0]["content"]
+
+
+def test_variable_parameters_follow_the_text(builder):
+    """Verifica che i parametri variabili siano in coda al messaggio utente"""
+    doc = TextDocument(content="Testo con {graffe} da preservare")
+
+    messages = builder.build_summarize_prompt(doc, 35)
+    user_content = messages[1]["content"]
+
+    assert "35" not in messages[0]["content"]
+    assert user_content.index("</text_to_process>") < user_content.index("35%")
+    assert "{graffe}" in user_content
+    assert "\n    " not in user_content
+
+
+def test_build_multi_hat_prompt_sends_document_once(builder):
+    """Verifica che il prompt multi-cappello contenga il testo una volta e tutte le istruzioni"""
+    doc = TextDocument(content="Idea di business")
+
+    messages = builder.build_multi_hat_prompt(doc, ["Nero", "verde"])
+    user_content = messages[1]["content"]
+
+    assert user_content.count("Idea di business") == 1
+    assert "CAPPELLO NERO" in user_content and "CAPPELLO VERDE" in user_content
+    assert "avvocato del diavolo" in user_content.lower()
+    assert messages[0]["content"] == builder.build_multi_hat_prompt(doc, ["blu", "rosso"])[0]["content"]
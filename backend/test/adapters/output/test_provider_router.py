@@ -0,0 +1,59 @@
+import pytest
+from adapters.output.provider_router import ProviderRouter
+
+
+def key(provider):
+    return provider["name"]
+
+@pytest.fixture
+def providers():
+    return [{"name": "LOCAL"}, {"name": "GROQ"}, {"name": "GOOGLE"}]
+
+@pytest.fixture
+def router():
+    return ProviderRouter(alpha=0.5, explore_ratio=0.0, rng=lambda: 1.0)
+
+def test_order_keeps_static_order_without_stats(router, providers):
+    """Verifica che senza statistiche si mantenga l'ordine di LLM_FALLBACK_ORDER"""
+    assert [p["name"] for p in router.order(providers, key)] == ["LOCAL", "GROQ", "GOOGLE"]
+
+def test_order_prefers_faster_provider(router, providers):
+    """Verifica che un provider saturo venga superato da uno più veloce"""
+    router.record_success("LOCAL", ttft=8.0, chunk_count=100, generation_seconds=20.0)
+    router.record_success("GROQ", ttft=0.3, chunk_count=100, generation_seconds=1.0)
+
+    ordered = [p["name"] for p in router.order(providers, key)]
+
+    assert ordered == ["GROQ", "LOCAL", "GOOGLE"]
+
+def test_errors_and_parse_failures_penalize_provider(router, providers):
+    """Verifica che errori e JSON non validi peggiorino il costo atteso"""
+    router.record_success("LOCAL", ttft=0.5, chunk_count=10, generation_seconds=1.0)
+    router.record_success("GROQ", ttft=0.5, chunk_count=10, generation_seconds=1.0)
+    baseline = router.expected_cost("GROQ")
+
+    router.record_failure("GROQ")
+    router.record_parse_result("LOCAL", success=False)
+
+    assert router.expected_cost("GROQ") > baseline
+    assert router.expected_cost("LOCAL") > baseline
+
+def test_exploration_moves_random_provider_first(providers):
+    """Verifica che l'esplorazione porti in testa un provider sfavorito"""
+    values = iter([0.0, 0.9])
+    router = ProviderRouter(explore_ratio=0.1, rng=lambda: next(values))
+
+    ordered = [p["name"] for p in router.order(providers, key)]
+
+    assert ordered[0] == "GOOGLE"
+
+def test_stats_survive_restart(tmp_path):
+    """Verifica che le statistiche vengano salvate e ricaricate da file"""
+    path = str(tmp_path / "router_stats.json")
+    router = ProviderRouter(stats_path=path)
+    router.record_success("GROQ", ttft=0.4, chunk_count=50, generation_seconds=2.0)
+    router.save()
+
+    restored = ProviderRouter(stats_path=path)
+
+    assert restored.expected_cost("GROQ") == pytest.approx(router.expected_cost("GROQ"))
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from adapters.output.rate_limiter import (ProviderRateLimiter, RateLimitExceeded,
+                                          TokenBucket, parse_duration)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_duration_formats():
+    """Verifica il parsing delle durate usate negli header dei provider"""
+    assert parse_duration("12") == 12.0
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("250ms") == pytest.approx(0.25)
+    assert parse_duration(None) is None
+    assert parse_duration("boh") is None
+
+def test_token_bucket_refills_over_time():
+    """Verifica consumo e ricarica del bucket"""
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1, clock=clock)
+
+    bucket.consume(2)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+    clock.now = 1.0
+    assert bucket.wait_time(1) == 0.0
+
+def test_unconfigured_limiter_is_unlimited():
+    """Verifica che senza limiti noti non si attenda mai"""
+    limiter = ProviderRateLimiter("GROQ")
+
+    assert limiter._wait_time(10_000) == 0.0
+
+def test_headers_update_buckets():
+    """Verifica che gli header x-ratelimit-* riallineino i bucket"""
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("GROQ", clock=clock)
+
+    limiter.update_from_headers({
+        "x-ratelimit-limit-tokens": "6000",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "6s",
+    })
+
+    assert limiter.tokens.refill_per_second == pytest.approx(1000.0)
+    assert limiter._wait_time(500) == pytest.approx(0.5)
+
+@pytest.mark.asyncio
+async def test_retry_after_beyond_max_wait_raises():
+    """Verifica che un Retry-After lungo faccia passare subito al fallback"""
+    limiter = ProviderRateLimiter("GOOGLE", max_wait=5.0)
+    limiter.update_from_headers({"retry-after": "60"})
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire(100)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquires_are_paced():
+    """Verifica che una raffica di richieste concorrenti parta cadenzata, non tutta insieme"""
+    limiter = ProviderRateLimiter("GROQ", requests_per_minute=600)
+    limiter.requests.consume(600)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    departures = []
+
+    async def request():
+        await limiter.acquire(0)
+        departures.append(loop.time() - started)
+
+    await asyncio.gather(*(request() for _ in range(4)))
+
+    gaps = [b - a for a, b in zip(departures, departures[1:])]
+    assert departures[0] == pytest.approx(0.1, abs=0.05)
+    assert all(gap >= 0.08 for gap in gaps)
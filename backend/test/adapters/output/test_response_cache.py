@@ -0,0 +1,83 @@
+import pytest
+
+from adapters.output.response_cache import TwoTierResponseCache, cache_key
+
+MESSAGES = [{"role": "system", "content": "Riassumi"}, {"role": "user", "content": "Testo"}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_cache_key_depends_on_operation_content_and_model():
+    """Verifica che la chiave cambi con operazione, contenuto, temperatura e modello"""
+    base = cache_key("summarize", MESSAGES, 0.1, "LOCAL:llama3")
+
+    assert base == cache_key("summarize", [dict(m) for m in MESSAGES], 0.1, "LOCAL:llama3")
+    assert base != cache_key("improve", MESSAGES, 0.1, "LOCAL:llama3")
+    assert base != cache_key("summarize", MESSAGES, 0.7, "LOCAL:llama3")
+    assert base != cache_key("summarize", MESSAGES, 0.1, "LOCAL:llama3.1")
+    assert base != cache_key("summarize", [MESSAGES[0], {"role": "user", "content": "Altro"}], 0.1, "LOCAL:llama3")
+
+def test_cache_key_normalizes_unicode_and_trailing_spaces():
+    """Verifica che testi equivalenti producano la stessa chiave"""
+    composed = [{"role": "user", "content": "caffè"}]
+    decomposed = [{"role": "user", "content": "caffè  \n"}]
+
+    assert cache_key("summarize", composed, 0.1, "m") == cache_key("summarize", decomposed, 0.1, "m")
+
+@pytest.mark.asyncio
+async def test_memory_tier_lru_and_ttl():
+    """Verifica eviction LRU e scadenza TTL del livello in memoria"""
+    clock = FakeClock()
+    cache = TwoTierResponseCache(max_entries=2, ttl=60, clock=clock)
+
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")
+
+    assert await cache.get("b") is None
+    clock.now += 61
+    assert await cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["memory_evictions"] == 1
+    assert stats["expired"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Verifica che il livello SQLite sopravviva a un riavvio e promuova gli hit in memoria"""
+    path = str(tmp_path / "cache.sqlite3")
+    first = TwoTierResponseCache(sqlite_path=path)
+    await first.set("chiave", '{"ok": true}')
+    first.close()
+
+    second = TwoTierResponseCache(sqlite_path=path)
+    assert await second.get("chiave") == '{"ok": true}'
+    assert await second.get("chiave") == '{"ok": true}'
+
+    stats = second.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    second.close()
+
+@pytest.mark.asyncio
+async def test_disk_tier_is_size_bounded(tmp_path):
+    """Verifica che il livello su disco elimini le voci meno usate oltre la dimensione massima"""
+    clock = FakeClock()
+    cache = TwoTierResponseCache(max_entries=1, sqlite_path=str(tmp_path / "c.db"), disk_max_bytes=250, clock=clock)
+
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        await cache.set(key, "x" * 100)
+
+    assert cache.stats()["disk_evictions"] == 1
+    assert await cache.get("a") is None
+    assert await cache.get("b") == "x" * 100
+    cache.close()
@@ -0,0 +1,104 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from adapters.output.single_flight_llm_provider import SingleFlightLLMProvider
+from application.ports.output import ILLMProvider
+
+MESSAGES = [{"role": "user", "content": "Riassumi questo testo"}]
+
+
+def slow_provider(calls, cancelled):
+    async def generate(**kwargs):
+        calls.append(kwargs["operation"])
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(kwargs["operation"])
+            raise
+        return f"risposta {kwargs['operation']}"
+
+    provider = MagicMock(spec=ILLMProvider)
+    provider.generate_completion = AsyncMock(side_effect=generate)
+    return provider
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    """Verifica che richieste identiche contemporanee usino una sola chiamata upstream"""
+    calls, cancelled = [], []
+    provider = SingleFlightLLMProvider(slow_provider(calls, cancelled))
+
+    results = await asyncio.gather(*(
+        provider.generate_completion(MESSAGES, operation="summarize") for _ in range(3)
+    ))
+
+    assert results == ["risposta summarize"] * 3
+    assert calls == ["summarize"]
+    assert provider.stats() == {"in_flight": 0, "upstream_calls": 1, "coalesced": 2}
+
+@pytest.mark.asyncio
+async def test_different_operations_are_not_coalesced():
+    """Verifica che operazioni diverse sullo stesso testo restino separate"""
+    calls, cancelled = [], []
+    provider = SingleFlightLLMProvider(slow_provider(calls, cancelled))
+
+    await asyncio.gather(
+        provider.generate_completion(MESSAGES, operation="summarize"),
+        provider.generate_completion(MESSAGES, operation="improve")
+    )
+
+    assert sorted(calls) == ["improve", "summarize"]
+
+@pytest.mark.asyncio
+async def test_disconnected_waiter_does_not_cancel_the_others():
+    """Verifica che l'abbandono di un client non annulli la chiamata per gli altri"""
+    calls, cancelled = [], []
+    provider = SingleFlightLLMProvider(slow_provider(calls, cancelled))
+
+    leaving = asyncio.create_task(provider.generate_completion(MESSAGES, operation="summarize"))
+    staying = asyncio.create_task(provider.generate_completion(MESSAGES, operation="summarize"))
+    await asyncio.sleep(0.01)
+    leaving.cancel()
+
+    assert await staying == "risposta summarize"
+    assert leaving.cancelled()
+    assert cancelled == []
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_upstream_call():
+    """Verifica che l'abbandono dell'ultimo client annulli la chiamata upstream"""
+    calls, cancelled = [], []
+    provider = SingleFlightLLMProvider(slow_provider(calls, cancelled))
+
+    waiters = [asyncio.create_task(provider.generate_completion(MESSAGES, operation="summarize")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.sleep(0.01)
+
+    assert cancelled == ["summarize"]
+    assert provider.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_aborted_stream_closes_inner_stream_immediately():
+    """Verifica che chiudere lo stream chiuda subito quello interno, senza attendere il GC"""
+    closed = []
+
+    async def stream(**kwargs):
+        try:
+            yield "Ciao "
+            yield "mondo"
+        finally:
+            closed.append(True)
+
+    inner = MagicMock(spec=ILLMProvider)
+    inner.generate_completion_stream = MagicMock(side_effect=stream)
+    provider = SingleFlightLLMProvider(inner)
+
+    partial = provider.generate_completion_stream(MESSAGES, operation="generate")
+    assert await partial.__anext__() == "Ciao "
+    await partial.aclose()
+
+    assert closed == [True]
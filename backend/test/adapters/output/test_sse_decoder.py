@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from adapters.output.sse_decoder import SSEDecoder
+
+
+def frame(content):
+    return f'data: {json.dumps({"choices": [{"delta": {"content": content}}]})}\n\n'.encode()
+
+def decode(chunks):
+    decoder = SSEDecoder()
+    contents = []
+    for chunk in chunks:
+        contents.extend(decoder.feed(chunk))
+    contents.extend(decoder.finish())
+    return decoder, contents
+
+def test_events_split_across_network_chunks():
+    """Verifica che eventi spezzati in più pacchetti (anche dentro un carattere UTF-8) vengano ricomposti"""
+    stream = frame("Caffè ") + frame("lungo")
+    chunks = [stream[i:i + 7] for i in range(0, len(stream), 7)]
+
+    decoder, contents = decode(chunks)
+
+    assert contents == ["Caffè ", "lungo"]
+    assert decoder.malformed == 0
+
+def test_crlf_comments_and_role_frames():
+    """Verifica righe CRLF, commenti keep-alive e frame senza testo"""
+    stream = (
+        b": keep-alive\r\n\r\n"
+        b'data: {"choices": [{"delta": {"role": "assistant"}}]}\r\n\r\n'
+        b'event: message\r\ndata: {"choices": [{"delta": {"content": "ok"}}]}\r\n\r\n'
+        b'data: {"choices": [], "usage": {"total_tokens": 3}}\r\n\r\n'
+    )
+
+    _, contents = decode([stream])
+
+    assert contents == ["ok"]
+
+def test_multi_line_data_event_is_joined():
+    """Verifica che più righe data dello stesso evento formino un unico JSON"""
+    stream = b'data: {"choices": [{"delta":\ndata: {"content": "uno"}}]}\n\n'
+
+    _, contents = decode([stream])
+
+    assert contents == ["uno"]
+
+def test_done_stops_decoding():
+    """Verifica che [DONE] chiuda lo stream e i byte successivi vengano ignorati"""
+    decoder, contents = decode([frame("a") + b"data: [DONE]\n\n" + frame("b")])
+
+    assert contents == ["a"]
+    assert decoder.done
+
+def test_malformed_frames_are_counted():
+    """Verifica che i frame non validi vengano contati invece di essere ignorati in silenzio"""
+    decoder, contents = decode([frame("a") + b'data: {"content": troncato\n\n' + frame("b")])
+
+    assert contents == ["a", "b"]
+    assert decoder.malformed == 1
+    assert decoder.malformed_sample.startswith(b'{"content"')
+
+def test_last_event_without_trailing_blank_line():
+    """Verifica che l'ultimo evento venga emesso anche senza riga vuota finale"""
+    _, contents = decode([frame("a") + b'data: {"choices": [{"delta": {"content": "b"}}]}'])
+
+    assert contents == ["a", "b"]
+
+def test_error_frame_raises_provider_error():
+    """Verifica che un frame {"error": ...} interrompa lo stream invece di passare come vuoto"""
+    stream = frame("a") + b'data: {"error": {"message": "Rate limit exceeded", "code": 429}}\n\n'
+
+    with pytest.raises(RuntimeError, match="Rate limit exceeded"):
+        decode([stream])
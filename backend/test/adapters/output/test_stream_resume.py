@@ -0,0 +1,45 @@
+from adapters.output.stream_resume import (BoundaryDeduplicator,
+                                           build_continuation_messages)
+
+
+def feed_all(dedup, chunks):
+    return "".join(dedup.feed(c) for c in chunks) + dedup.finish()
+
+def test_continuation_messages_append_partial_output():
+    """Verifica che la richiesta di ripresa contenga l'output parziale come risposta dell'assistente"""
+    messages = [{"role": "system", "content": "S"}, {"role": "user", "content": "U"}]
+
+    continued = build_continuation_messages(messages, '{"outcome": {')
+
+    assert continued[:2] == messages
+    assert continued[2] == {"role": "assistant", "content": '{"outcome": {'}
+    assert continued[3]["role"] == "user"
+
+def test_overlap_at_boundary_is_removed():
+    """Verifica la rimozione delle parole ripetute al punto di ripresa"""
+    dedup = BoundaryDeduplicator("Il gatto dorme sul divano", window=20)
+
+    assert feed_all(dedup, ["sul divano", " rosso", " tutto il giorno."]) == " rosso tutto il giorno."
+
+def test_full_replay_is_skipped():
+    """Verifica che una continuazione ripartita da capo non duplichi il testo"""
+    dedup = BoundaryDeduplicator("Prima frase. Seconda", window=10)
+
+    result = feed_all(dedup, ["Prima ", "frase. Sec", "onda frase.", " Terza."])
+
+    assert result == " frase. Terza."
+
+def test_clean_continuation_is_forwarded_unchanged():
+    """Verifica che una continuazione senza sovrapposizioni passi intatta"""
+    dedup = BoundaryDeduplicator("Primo paragrafo.", window=10)
+
+    assert feed_all(dedup, [" Secondo", " paragrafo."]) == " Secondo paragrafo."
+
+
+def test_replay_diverging_after_window_keeps_new_text():
+    """Verifica che una replica che diverge dopo la finestra non perda il testo divergente"""
+    dedup = BoundaryDeduplicator("Prima frase. Seconda frase completa", window=10)
+
+    result = feed_all(dedup, ["Prima fras", "e. Seconda", " versione", " diversa."])
+
+    assert result == "versione diversa."
@@ -0,0 +1,20 @@
+from adapters.output.timeouts import PhaseTimeouts, TimeoutPolicy
+
+
+def test_default_timeouts_are_used_without_overrides():
+    """Verifica i timeout di default"""
+    policy = TimeoutPolicy(PhaseTimeouts(connect=3, first_token=10, idle=5))
+
+    assert policy.resolve("LOCAL") == PhaseTimeouts(connect=3, first_token=10, idle=5)
+
+def test_provider_and_operation_overrides():
+    """Verifica la precedenza default < provider < operazione"""
+    policy = TimeoutPolicy(
+        PhaseTimeouts(connect=3, first_token=10, idle=5),
+        per_provider={"LOCAL": {"first_token": 20, "idle": 8}},
+        per_operation={"generate": {"first_token": 60}},
+    )
+
+    assert policy.resolve("LOCAL", "translate") == PhaseTimeouts(connect=3, first_token=20, idle=8)
+    assert policy.resolve("LOCAL", "generate") == PhaseTimeouts(connect=3, first_token=60, idle=8)
+    assert policy.resolve("GROQ", "generate") == PhaseTimeouts(connect=3, first_token=60, idle=5)
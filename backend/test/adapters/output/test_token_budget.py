@@ -0,0 +1,69 @@
+from adapters.output.token_budget import TokenBudget, model_family
+
+
+def test_model_family_from_model_names():
+    """Verifica il riconoscimento della famiglia dai nomi usati da Ollama e Groq"""
+    assert model_family("llama3:8b") == "llama3"
+    assert model_family("llama-3.1-8b-instant") == "llama3.1"
+    assert model_family("qwen2.5:7b-instruct") == "qwen"
+    assert model_family("gpt-4o-mini") == "gpt"
+    assert model_family("gemini-2.0-flash") == "gemini"
+    assert model_family("moonshotai/kimi-k2-instruct") == "kimi"
+    assert model_family("modello-sconosciuto") == ""
+
+def test_profile_defaults_and_overrides():
+    """Verifica profili di default per famiglia e override da configurazione"""
+    groq = TokenBudget.for_provider({"model": "llama-3.1-8b-instant"})
+    local = TokenBudget.for_provider({"model": "llama3:8b", "context_window": 16384, "max_output": 512})
+
+    assert groq.context_window == 131072
+    assert local.context_window == 16384
+    assert local.max_output == 512
+    assert local.chars_per_token == 3.6
+
+def test_estimate_counts_characters_and_message_overhead():
+    budget = TokenBudget(context_window=4096, max_output=1024, chars_per_token=4.0)
+
+    assert budget.estimate([{"role": "user", "content": "a" * 400}]) == 104
+
+def test_fits_and_max_tokens():
+    """Verifica che il prompt lasci spazio all'output e che max_tokens non superi il contesto"""
+    budget = TokenBudget(context_window=4096, max_output=1024, chars_per_token=4.0)
+
+    assert budget.fits(3800, min_output=256)
+    assert not budget.fits(3900, min_output=256)
+    assert budget.max_tokens(1000) == 1024
+    assert budget.max_tokens(3800) == 296
+
+def test_num_ctx_is_bucketed_and_capped():
+    """Verifica che num_ctx cresca a gradini (niente ricarichi del modello) entro la finestra"""
+    budget = TokenBudget(context_window=16384, max_output=1024, chars_per_token=4.0)
+
+    assert budget.num_ctx(500) == 4096
+    assert budget.num_ctx(3500) == 8192
+    assert budget.num_ctx(20000) == 16384
+
+
+def test_unknown_family_is_not_filtered_or_capped():
+    """Verifica che senza profilo noto il provider non venga filtrato né limitato in output"""
+    unknown = TokenBudget.for_provider({"model": "modello-sconosciuto"})
+    configured = TokenBudget.for_provider({"model": "modello-sconosciuto", "max_output": 512})
+    gemini = TokenBudget.for_provider({"model": "gemini-2.0-flash"})
+
+    assert unknown.fits(50000, min_output=256)
+    assert unknown.max_tokens(1000) is None
+    assert configured.max_tokens(1000) == 512
+    assert gemini.fits(4700, min_output=256)
+    assert gemini.max_tokens(4700) is None
+
+
+def test_profile_output_does_not_cap_response():
+    """Verifica che l'output del profilo non limiti la risposta se non configurato"""
+    llama = TokenBudget.for_provider({"model": "llama3:8b"})
+    windowed = TokenBudget.for_provider({"model": "modello-sconosciuto", "context_window": 16384})
+
+    assert llama.max_tokens(1000) is None
+    # Solo lo spazio rimasto nella finestra limita la risposta
+    assert llama.max_tokens(7000) == 1192
+    assert not windowed.fits(16200, min_output=256)
+    assert windowed.max_tokens(1000) is None
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -82,4 +83,115 @@ async def test_six_hats_llm_exception(use_case, mocks):
     result = await use_case.analyze_six_hats(doc, hat="nero")
     
     assert result.status == ResultStatus.ERROR
-    assert "LLM Down" in result.violation_category
\ No newline at end of file
+    assert "LLM Down" in result.violation_category
+
+
+@pytest.mark.asyncio
+async def test_all_hats_run_concurrently_and_stream_as_completed(use_case, mocks):
+    """Verifica che i cappelli partano insieme e i risultati arrivino in ordine di completamento"""
+    doc = TextDocument(content="Testo")
+    started = []
+    all_started = asyncio.Event()
+    delays = {"bianco": 0.03, "nero": 0.01, "verde": 0.02}
+
+    def build(document, hat):
+        return [{"role": "user", "content": hat}]
+
+    async def complete(messages, temperature, operation):
+        hat = messages[0]["content"]
+        started.append(hat)
+        if len(started) == len(delays):
+            all_started.set()
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        await asyncio.sleep(delays[hat])
+        return hat
+
+    mocks["builder"].build_six_hats_prompt.side_effect = build
+    mocks["llm"].generate_completion.side_effect = complete
+    mocks["parser"].parse_response.side_effect = lambda raw: LLMResult(
+        status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text=raw
+    )
+
+    results = [item async for item in use_case.analyze_all_hats(doc, ["bianco", "nero", "verde"])]
+
+    assert [hat for hat, _ in results] == ["nero", "verde", "bianco"]
+    assert all(result.rewritten_text == hat for hat, result in results)
+
+
+@pytest.mark.asyncio
+async def test_all_hats_failure_does_not_fail_batch(use_case, mocks):
+    """Verifica che l'errore di un cappello sia riportato senza interrompere gli altri"""
+    doc = TextDocument(content="Testo")
+    mocks["builder"].build_six_hats_prompt.side_effect = lambda document, hat: [{"role": "user", "content": hat}]
+
+    async def complete(messages, temperature, operation):
+        if messages[0]["content"] == "rosso":
+            raise RuntimeError("provider down")
+        return "raw"
+
+    mocks["llm"].generate_completion.side_effect = complete
+    mocks["parser"].parse_response.return_value = LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK)
+
+    results = dict([item async for item in use_case.analyze_all_hats(doc)])
+
+    assert set(results) == set(AnalyzeSixHatsService.VALID_HATS)
+    assert results["rosso"].code == ResultCode.TECHNICAL_ERROR
+    assert "provider down" in results["rosso"].violation_category
+    assert sum(r.is_successful() for r in results.values()) == 5
+
+
+@pytest.mark.asyncio
+async def test_all_hats_respects_max_parallel(mocks):
+    """Verifica che le chiamate contemporanee non superino max_parallel"""
+    use_case = AnalyzeSixHatsService(mocks["llm"], mocks["builder"], mocks["parser"], max_parallel=2)
+    active = 0
+    peak = 0
+
+    async def complete(messages, temperature, operation):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "raw"
+
+    mocks["llm"].generate_completion.side_effect = complete
+    mocks["parser"].parse_response.return_value = LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK)
+
+    results = [item async for item in use_case.analyze_all_hats(TextDocument(content="Testo"))]
+
+    assert len(results) == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_all_hats_single_call_uses_one_request(use_case, mocks):
+    """Verifica che la modalità single_call faccia una sola chiamata e divida il risultato"""
+    doc = TextDocument(content="Testo")
+    mocks["builder"].build_multi_hat_prompt.return_value = [{"role": "user", "content": "multi"}]
+    mocks["llm"].generate_completion.return_value = "raw"
+    mocks["parser"].parse_multi_response.return_value = {
+        "nero": LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="n"),
+        "verde": LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="v"),
+    }
+
+    results = dict([item async for item in use_case.analyze_all_hats(doc, ["nero", "verde", "viola"], single_call=True)])
+
+    mocks["llm"].generate_completion.assert_awaited_once()
+    mocks["builder"].build_multi_hat_prompt.assert_called_once_with(doc, ["nero", "verde"])
+    mocks["parser"].parse_multi_response.assert_called_once_with("raw", ["nero", "verde"])
+    mocks["llm"].report_parse_result.assert_awaited_once_with("raw", True)
+    assert results["nero"].rewritten_text == "n"
+    assert results["viola"].status == ResultStatus.INVALID_INPUT
+
+
+@pytest.mark.asyncio
+async def test_all_hats_single_call_error_applies_to_every_hat(use_case, mocks):
+    """Verifica che l'errore della chiamata unica sia riportato per ogni cappello"""
+    mocks["builder"].build_multi_hat_prompt.return_value = []
+    mocks["llm"].generate_completion.side_effect = RuntimeError("provider down")
+
+    results = dict([item async for item in use_case.analyze_all_hats(TextDocument(content="Testo"), single_call=True)])
+
+    assert set(results) == set(AnalyzeSixHatsService.VALID_HATS)
+    assert all(r.code == ResultCode.TECHNICAL_ERROR for r in results.values())
@@ -1,7 +1,8 @@
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from domain.models import LLMResult, ResultCode, ResultStatus
+from adapters.output.json_parser_adapter import JSONParserAdapter
+from domain.models import LLMOutcome, LLMResult, ResultCode, ResultStatus
 
 from backend.application.services.generate_text_service import \
     GenerateTextService
@@ -73,4 +74,104 @@ async def test_generate_handles_llm_exception(use_case, mocks):
     
     assert result.status == ResultStatus.ERROR
     assert result.code == ResultCode.TECHNICAL_ERROR
-    assert "Quota API esaurita" in result.violation_category
\ No newline at end of file
+    assert "Quota API esaurita" in result.violation_category
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_yields_outcome_text_then_result(mocks):
+    """Verifica che lo streaming emetta l'esito, il testo decodificato e il risultato finale"""
+    use_case = GenerateTextService(mocks["llm"], mocks["builder"], JSONParserAdapter())
+    chunks = ['{"outcome": {"status": "success", "code": "OK"}', ', "data": {"rewritten_text": "Ciao\\', 'n mondo"}}']
+
+    async def stream(**kwargs):
+        for chunk in chunks:
+            yield chunk
+
+    mocks["llm"].generate_completion_stream = MagicMock(side_effect=stream)
+
+    events = [event async for event in use_case.generate_text_stream("Scrivi una mail")]
+
+    assert isinstance(events[0], LLMOutcome) and events[0].is_successful()
+    assert "".join(e for e in events if isinstance(e, str)) == "Ciao\n mondo"
+    assert events[-1].rewritten_text == "Ciao\n mondo"
+    mocks["llm"].report_parse_result.assert_awaited_once_with("".join(chunks), True)
+    assert mocks["llm"].generate_completion_stream.call_args.kwargs["operation"] == "generate"
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_provider_error_becomes_result(mocks):
+    """Verifica che un errore a metà stream diventi un LLMResult di errore tecnico"""
+    use_case = GenerateTextService(mocks["llm"], mocks["builder"], JSONParserAdapter())
+
+    async def stream(**kwargs):
+        yield '{"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "parz'
+        raise RuntimeError("stream interrotto")
+
+    mocks["llm"].generate_completion_stream = MagicMock(side_effect=stream)
+
+    events = [event async for event in use_case.generate_text_stream("Scrivi una mail")]
+
+    assert events[1] == "parz"
+    assert events[-1].code == ResultCode.TECHNICAL_ERROR
+    assert "stream interrotto" in events[-1].violation_category
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_empty_prompt(use_case, mocks):
+    """Verifica che la validazione avvenga senza aprire lo stream"""
+    events = [event async for event in use_case.generate_text_stream("  ")]
+
+    assert len(events) == 1
+    assert events[0].code == ResultCode.EMPTY_PROMPT
+    mocks["llm"].generate_completion_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_aborts_upstream_on_refusal(mocks):
+    """Verifica che un rifiuto chiuda lo stream del provider appena l'outcome è completo"""
+    use_case = GenerateTextService(mocks["llm"], mocks["builder"], JSONParserAdapter())
+    consumed = []
+    closed = False
+
+    async def stream(**kwargs):
+        nonlocal closed
+        try:
+            for chunk in ['{"outcome": {"status": "refusal", "code": "ETHIC_REFUSAL"}', ', "data": ', '{"rewritten_text": "spiegazione lunga"}}']:
+                consumed.append(chunk)
+                yield chunk
+        finally:
+            closed = True
+
+    mocks["llm"].generate_completion_stream = MagicMock(side_effect=stream)
+
+    events = [event async for event in use_case.generate_text_stream("Scrivi qualcosa")]
+
+    assert len(consumed) == 1 and closed
+    assert events[-1].status == ResultStatus.REFUSAL
+    assert events[-1].code == ResultCode.ETHIC_REFUSAL
+    assert events[-1].rewritten_text is None
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_stops_when_text_closes(mocks):
+    """Verifica che la chiusura di rewritten_text interrompa lo stream senza attendere il resto"""
+    use_case = GenerateTextService(mocks["llm"], mocks["builder"], JSONParserAdapter())
+    consumed = []
+
+    async def stream(**kwargs):
+        for chunk in [
+            '{"outcome": {"status": "success", "code": "OK"}, "data": {"detected_language": "it", ',
+            '"rewritten_text": "Testo"',
+            ' }} Nota: ho usato il markdown...',
+        ]:
+            consumed.append(chunk)
+            yield chunk
+
+    mocks["llm"].generate_completion_stream = MagicMock(side_effect=stream)
+
+    events = [event async for event in use_case.generate_text_stream("Scrivi qualcosa")]
+
+    assert len(consumed) == 2
+    assert events[-1].is_successful()
+    assert events[-1].rewritten_text == "Testo"
+    assert events[-1].detected_language == "it"
@@ -80,4 +80,75 @@ async def test_summarize_llm_exception(use_case, mocks):
     result = await use_case.summarize_text(doc)
     
     assert result.status == ResultStatus.ERROR
-    assert "Timeout API" in result.violation_category
\ No newline at end of file
+    assert "Timeout API" in result.violation_category
+
+
+@pytest.fixture
+def chunked_use_case(mocks):
+    """Use Case con soglia bassa per attivare il map-reduce"""
+    return SummarizeTextService(
+        llm_provider=mocks["llm"],
+        prompt_builder=mocks["builder"],
+        response_parser=mocks["parser"],
+        chunk_chars=200,
+        max_parallel=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_long_document_is_summarized_map_reduce(chunked_use_case, mocks):
+    """Verifica che un documento lungo venga riassunto per segmenti e poi ridotto alla percentuale richiesta"""
+    doc = TextDocument(content="\n\n".join(f"Paragrafo {i}: " + "testo " * 12 for i in range(4)))
+    mocks["builder"].build_summarize_prompt.side_effect = lambda document, percentage: [document.content, percentage]
+    mocks["llm"].generate_completion.return_value = "raw"
+    mocks["parser"].parse_response.side_effect = [
+        LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="r" * 90, detected_language="it")
+        for _ in range(2)
+    ] + [LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="Riassunto finale", detected_language="it")]
+
+    result = await chunked_use_case.summarize_text(doc, percentage=70)
+
+    calls = mocks["builder"].build_summarize_prompt.call_args_list
+    assert len(calls) == 3
+    # Il map applica metà della riduzione, il reduce quella mancante per arrivare al 70% del totale
+    assert [c.args[1] for c in calls[:2]] == [35, 35]
+    assert 30 < calls[2].args[1] < 70
+    assert calls[2].args[0].content == "r" * 90 + "\n\n" + "r" * 90
+    assert result.rewritten_text == "Riassunto finale"
+    assert result.detected_language == "it"
+
+
+
+@pytest.mark.asyncio
+async def test_reduce_runs_even_when_map_output_is_short(chunked_use_case, mocks):
+    """Verifica che con più segmenti la passata di reduce sull'intero documento venga sempre eseguita"""
+    doc = TextDocument(content="\n\n".join(f"Paragrafo {i}: " + "testo " * 12 for i in range(4)))
+    mocks["builder"].build_summarize_prompt.side_effect = lambda document, percentage: [document.content, percentage]
+    mocks["llm"].generate_completion.return_value = "raw"
+    mocks["parser"].parse_response.side_effect = [
+        LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="breve", detected_language="it")
+        for _ in range(2)
+    ] + [LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text="Unico riassunto", detected_language="it")]
+
+    result = await chunked_use_case.summarize_text(doc, percentage=30)
+
+    calls = mocks["builder"].build_summarize_prompt.call_args_list
+    assert len(calls) == 3
+    assert calls[2].args[0].content == "breve\n\nbreve"
+    assert calls[2].args[1] == 10
+    assert result.rewritten_text == "Unico riassunto"
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_stops_on_refusal(chunked_use_case, mocks):
+    """Verifica che un rifiuto su un segmento venga restituito senza passata di reduce"""
+    doc = TextDocument(content="\n\n".join("parola " * 25 for _ in range(3)))
+    mocks["builder"].build_summarize_prompt.return_value = ["prompt"]
+    mocks["llm"].generate_completion.return_value = "raw"
+    refusal = LLMResult(status=ResultStatus.REFUSAL, code=ResultCode.MANIPULATION_ATTEMPT)
+    mocks["parser"].parse_response.return_value = refusal
+
+    result = await chunked_use_case.summarize_text(doc, percentage=30)
+
+    assert result == refusal
+    assert mocks["llm"].generate_completion.await_count <= 3
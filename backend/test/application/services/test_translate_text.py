@@ -1,7 +1,8 @@
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from domain.models import LLMResult, ResultStatus, TextDocument
+from application.ports.output import IResponseCache
+from domain.models import LLMResult, ResultCode, ResultStatus, TextDocument
 
 from backend.application.services.translate_text_service import \
     TranslateTextService
@@ -57,4 +58,103 @@ async def test_translate_full_flow_success(use_case):
     builder.build_translate_prompt.assert_called_once()
     llm.generate_completion.assert_called_once()
     parser.parse_response.assert_called_with("Raw AI Response")
-    assert result == expected_final_result
\ No newline at end of file
+    assert result == expected_final_result
+
+
+class DictCache(IResponseCache):
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+DOCUMENT = "# Titolo\n\nPrimo paragrafo.\n\nSecondo paragrafo.\n\n- voce"
+
+
+@pytest.fixture
+def incremental_use_case():
+    llm_provider = AsyncMock()
+    prompt_builder = MagicMock()
+    prompt_builder.build_translate_prompt.side_effect = lambda document, language: document.content
+    response_parser = MagicMock()
+    response_parser.parse_response.side_effect = lambda raw: LLMResult(
+        status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text=raw, detected_language="it"
+    )
+    # L'LLM finto "traduce" in maiuscolo
+    llm_provider.generate_completion.side_effect = lambda messages, **kwargs: messages.upper()
+    uc = TranslateTextService(
+        llm_provider, prompt_builder, response_parser,
+        segment_cache=DictCache(), min_segments=3
+    )
+    return uc, llm_provider
+
+
+@pytest.mark.asyncio
+async def test_only_changed_segments_are_retranslated(incremental_use_case):
+    uc, llm = incremental_use_case
+
+    first = await uc.translate_text(TextDocument(content=DOCUMENT), "en")
+    assert first.rewritten_text == DOCUMENT.upper()
+    assert llm.generate_completion.await_count == 1
+
+    edited = DOCUMENT.replace("Secondo paragrafo.", "Secondo paragrafo modificato.")
+    second = await uc.translate_text(TextDocument(content=edited), "en")
+
+    assert second.rewritten_text == edited.upper()
+    assert second.detected_language == "it"
+    assert llm.generate_completion.await_count == 2
+    assert llm.generate_completion.await_args.kwargs["messages"] == "Secondo paragrafo modificato."
+
+
+@pytest.mark.asyncio
+async def test_segment_cache_is_per_target_language(incremental_use_case):
+    uc, llm = incremental_use_case
+
+    await uc.translate_text(TextDocument(content=DOCUMENT), "en")
+    await uc.translate_text(TextDocument(content=DOCUMENT), "de")
+
+    assert llm.generate_completion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_misaligned_translation_does_not_seed_cache(incremental_use_case):
+    uc, llm = incremental_use_case
+    document = (
+        "# Titolo\n\nPrimo paragrafo piuttosto lungo con molte parole.\n\n"
+        "Secondo paragrafo, anch'esso lungo e articolato.\n\n- voce"
+    )
+    # Il modello unisce i due paragrafi e ne aggiunge uno: stesso numero di unità, ma spostate
+    llm.generate_completion.side_effect = lambda messages, **kwargs: (
+        "# TITLE\n\nFIRST PARAGRAPH QUITE LONG WITH MANY WORDS. SECOND PARAGRAPH, ALSO LONG AND ARTICULATE."
+        "\n\n- ITEM\n\nNOTE."
+    )
+
+    await uc.translate_text(TextDocument(content=document), "en")
+
+    assert uc._segment_cache.data == {}
+
+
+@pytest.mark.asyncio
+async def test_refused_unit_falls_back_to_full_document(incremental_use_case):
+    uc, llm = incremental_use_case
+    await uc.translate_text(TextDocument(content=DOCUMENT), "en")
+
+    edited = DOCUMENT.replace("Secondo paragrafo.", "Secondo paragrafo modificato.")
+    uc._response_parser.parse_response.side_effect = lambda raw: (
+        LLMResult(status=ResultStatus.REFUSAL, code=ResultCode.MANIPULATION_ATTEMPT)
+        if raw == "SECONDO PARAGRAFO MODIFICATO."
+        else LLMResult(status=ResultStatus.SUCCESS, code=ResultCode.OK, rewritten_text=raw)
+    )
+
+    result = await uc.translate_text(TextDocument(content=edited), "en")
+
+    assert result.rewritten_text == edited.upper()
+    assert llm.generate_completion.await_count == 3
+    assert llm.generate_completion.await_args.kwargs["messages"] == edited
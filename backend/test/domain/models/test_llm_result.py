@@ -1,5 +1,5 @@
 import pytest
-from domain.models.llm_result import LLMResult, ResultStatus, ResultCode
+from domain.models.llm_result import LLMOutcome, LLMResult, ResultStatus, ResultCode
 
 def test_llm_result_is_successful():
     """Verifica che is_successful funzioni correttamente in base allo stato"""
@@ -42,4 +42,13 @@ def test_llm_result_to_dict_error():
     
     assert d["outcome"]["status"] == "INVALID_INPUT"
     assert d["outcome"]["violation_category"] == "EmptyContent"
-    assert d["data"] is None  # Importante: se non c'è testo, data è None
\ No newline at end of file
+    assert d["data"] is None  # Importante: se non c'è testo, data è None
+
+
+def test_llm_outcome_to_dict_matches_result_outcome():
+    """Verifica che l'outcome anticipato abbia la stessa forma di quello del risultato"""
+    outcome = LLMOutcome(status=ResultStatus.REFUSAL, code=ResultCode.ETHIC_REFUSAL, violation_category="x")
+    result = LLMResult(status=ResultStatus.REFUSAL, code=ResultCode.ETHIC_REFUSAL, violation_category="x")
+
+    assert outcome.to_dict() == result.to_dict()["outcome"]
+    assert outcome.is_successful() is False
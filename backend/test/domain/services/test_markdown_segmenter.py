@@ -0,0 +1,72 @@
+import pytest
+
+from domain.services.markdown_segmenter import (join_units, segment_markdown,
+                                                split_units)
+
+
+def test_short_text_is_a_single_segment():
+    """Verifica che un testo corto resti intero"""
+    text = "# Titolo\n\nPrimo paragrafo.\n\nSecondo paragrafo."
+
+    assert segment_markdown(text, 1000) == [text]
+
+def test_segments_respect_paragraph_boundaries_and_limit():
+    """Verifica che i segmenti non superino il limite e non spezzino i paragrafi"""
+    paragraphs = [f"Paragrafo {i} " + "parola " * 10 for i in range(10)]
+    text = "\n\n".join(p.strip() for p in paragraphs)
+
+    segments = segment_markdown(text, 200)
+
+    assert len(segments) > 1
+    assert all(len(s) <= 200 for s in segments)
+    assert "\n\n".join(segments) == text
+
+def test_heading_starts_a_new_segment():
+    """Verifica che una sezione inizi un nuovo segmento insieme al proprio titolo"""
+    text = "# Uno\n\n" + "a" * 60 + "\n\n# Due\n\n" + "b" * 20
+
+    segments = segment_markdown(text, 100)
+
+    assert segments[1].startswith("# Due")
+
+def test_code_block_is_never_split_on_blank_lines():
+    """Verifica che un blocco di codice con righe vuote resti nello stesso segmento"""
+    code = "```python\ndef f():\n\n    return 1\n```"
+    text = "Introduzione.\n\n" + code + "\n\nFine."
+
+    segments = segment_markdown(text, len(code) + 5)
+
+    assert code in segments
+
+def test_oversized_paragraph_is_split_by_sentences():
+    """Verifica che un paragrafo troppo lungo venga spezzato per frasi"""
+    text = " ".join(f"Frase numero {i}." for i in range(20))
+
+    segments = segment_markdown(text, 60)
+
+    assert all(len(s) <= 60 for s in segments)
+    assert all(s.endswith(".") for s in segments)
+    assert " ".join(segments) == text
+
+def test_invalid_limit():
+    with pytest.raises(ValueError):
+        segment_markdown("testo", 0)
+
+def test_units_rebuild_the_original_text():
+    """Verifica che le unità ricompongano esattamente il testo, spazi compresi"""
+    text = "\n# Titolo\n\nPrimo paragrafo\nsu due righe.\n\n- voce uno\n- voce due\n\n```\ncodice\n\nqui\n```\nFine.\n"
+
+    units = split_units(text)
+
+    assert join_units(units) == text
+    assert [u.text for u in units if u.translatable] == [
+        "# Titolo", "Primo paragrafo\nsu due righe.", "- voce uno", "- voce due", "Fine."
+    ]
+    assert "```\ncodice\n\nqui\n```" in [u.text for u in units if not u.translatable]
+
+def test_editing_a_paragraph_leaves_other_units_unchanged():
+    """Verifica che modificare un paragrafo non cambi le altre unità"""
+    before = split_units("Uno.\n\nDue.\n\nTre.")
+    after = split_units("Uno.\n\nDue modificato.\n\nTre.")
+
+    assert [u.text for u in before if u.text != "Due."] == [u.text for u in after if u.text != "Due modificato."]
@@ -1,5 +1,4 @@
 import pytest
-import os
 from unittest.mock import MagicMock
 from infrastructure.di_container import DIContainer
 from domain.services import TextProcessorService
@@ -8,14 +7,14 @@ from domain.services import TextProcessorService
 def mock_settings():
     return MagicMock()
 
-def test_get_providers_list_parsing(mock_settings):
+def test_get_providers_list_parsing(mock_settings, monkeypatch):
     """Verifica che la lista dei provider venga costruita correttamente dalle env vars"""
     # Simuliamo le variabili d'ambiente
-    os.environ["LLM_FALLBACK_ORDER"] = "LOCAL,AZURE"
-    os.environ["LOCAL_URL"] = "http://localhost"
-    os.environ["LOCAL_MODEL"] = "llama3"
-    os.environ["AZURE_URL"] = "http://azure.ai"
-    os.environ["AZURE_MODEL"] = "gpt-4"
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "LOCAL,AZURE")
+    monkeypatch.setenv("LOCAL_URL", "http://localhost")
+    monkeypatch.setenv("LOCAL_MODEL", "llama3")
+    monkeypatch.setenv("AZURE_URL", "http://azure.ai")
+    monkeypatch.setenv("AZURE_MODEL", "gpt-4")
     
     container = DIContainer(mock_settings)
     providers = container._get_providers_list()
@@ -42,12 +41,78 @@ def test_get_text_processor_wiring(mock_settings):
     # Verifichiamo che uno dei use case interni sia presente
     assert processor.summarize is not None
 
-def test_get_providers_skips_invalid_configs(mock_settings):
+def test_get_providers_skips_invalid_configs(mock_settings, monkeypatch):
     """Verifica che i provider incompleti vengano saltati senza crashare"""
-    os.environ["LLM_FALLBACK_ORDER"] = "INCOMPLETE"
-    os.environ["INCOMPLETE_URL"] = "" # URL mancante
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "INCOMPLETE")
+    monkeypatch.setenv("INCOMPLETE_URL", "") # URL mancante
     
     container = DIContainer(mock_settings)
     providers = container._get_providers_list()
     
-    assert len(providers) == 0
\ No newline at end of file
+    assert len(providers) == 0
+
+
+def test_get_providers_reads_pool_options(mock_settings, monkeypatch):
+    """Verifica che HTTP/2 e socket Unix vengano letti per ogni provider"""
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "LOCAL,GROQ")
+    monkeypatch.setenv("LOCAL_URL", "http://localhost/v1/chat/completions")
+    monkeypatch.setenv("LOCAL_MODEL", "llama3")
+    monkeypatch.setenv("LOCAL_UDS", "/tmp/ollama.sock")
+    monkeypatch.setenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+    monkeypatch.setenv("GROQ_MODEL", "llama-3.1-8b")
+    monkeypatch.setenv("GROQ_HTTP2", "true")
+
+    providers = DIContainer(mock_settings)._get_providers_list()
+
+    assert providers[0]["uds"] == "/tmp/ollama.sock"
+    assert providers[0]["http2"] is False
+    assert providers[1]["http2"] is True
+
+
+def test_provider_profile_is_loaded_from_settings(mock_settings, monkeypatch):
+    """Verifica protocollo, opzioni, concorrenza e timeout del profilo di un provider"""
+    env = {
+        "LLM_FALLBACK_ORDER": "CPU",
+        "CPU_URL": "http://cpu-node:11434/api/chat",
+        "CPU_MODEL": "qwen2.5:3b",
+        "CPU_PROTOCOL": "ollama",
+        "CPU_OPTIONS": '{"num_thread": 6, "num_ctx": 8192}',
+        "CPU_MAX_CONCURRENCY": "2",
+        "CPU_TIMEOUT_FIRST_TOKEN": "90",
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    container = DIContainer(mock_settings)
+    providers = container._get_providers_list()
+    policy = container._create_timeout_policy(providers)
+
+    assert providers[0]["protocol"] == "ollama"
+    assert providers[0]["options"] == {"num_thread": 6, "num_ctx": 8192}
+    assert providers[0]["context_window"] == 8192
+    assert providers[0]["max_concurrency"] == 2
+    assert policy.resolve("CPU").first_token == 90
+
+
+def test_invalid_provider_profile_is_skipped(mock_settings, monkeypatch):
+    """Verifica che un profilo con valori non validi venga saltato"""
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "BAD")
+    monkeypatch.setenv("BAD_URL", "http://x")
+    monkeypatch.setenv("BAD_MODEL", "m")
+    monkeypatch.setenv("BAD_PROTOCOL", "grpc")
+
+    providers = DIContainer(mock_settings)._get_providers_list()
+
+    assert providers == []
+
+
+def test_ollama_url_without_options_logs_migration_warning(mock_settings, monkeypatch, capsys):
+    """Verifica l'avviso per le configurazioni Ollama che si affidavano alle opzioni automatiche"""
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "LOCAL")
+    monkeypatch.setenv("LOCAL_URL", "http://localhost:11434/v1/chat/completions")
+    monkeypatch.setenv("LOCAL_MODEL", "llama3")
+    monkeypatch.delenv("LOCAL_OPTIONS", raising=False)
+
+    DIContainer(mock_settings)._get_providers_list()
+
+    assert "LOCAL_OPTIONS" in capsys.readouterr().out
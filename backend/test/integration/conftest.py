@@ -1,12 +1,50 @@
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from adapters.input import create_fastapi_app
+from adapters.output.json_parser_adapter import JSONParserAdapter
+from application.services.completion_stream import stream_completion
 from domain.models import LLMResult, ResultCode, ResultStatus
 
 
+class FakeUpstream:
+    """Stream del provider che invia un chunk e poi resta in attesa"""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.closed = False
+
+    async def generate_completion_stream(self, messages, model=None, temperature=0.1, operation=None):
+        try:
+            yield '{"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "Inizio'
+            self.started.set()
+            await asyncio.Event().wait()
+        finally:
+            self.closed = True
+
+    async def report_parse_result(self, raw_response, success):
+        pass
+
+
+class UpstreamTextProcessor:
+    """Text processor che inoltra summarize allo stream di `upstream`"""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.summarize_started = False
+
+    async def summarize(self, document, percentage):
+        self.summarize_started = True
+        async for _ in self.upstream.generate_completion_stream([]):
+            pass
+
+    def summarize_stream(self, document, percentage):
+        return stream_completion(self.upstream, JSONParserAdapter(), [], "summarize")
+
+
 @pytest.fixture
 def mock_text_processor():
     class MockTextProcessor:
@@ -40,6 +78,26 @@ def mock_text_processor():
                 rewritten_text="six hats output",
             )
         )
+
+        async def analyze_all_hats(self, document, hats=None, single_call=None):
+            for hat in hats or ["bianco", "nero"]:
+                yield hat, LLMResult(
+                    status=ResultStatus.SUCCESS,
+                    code=ResultCode.OK,
+                    rewritten_text=f"{hat} output",
+                )
+
+        def generate_stream(self, prompt, context_text="", word_count=300):
+            async def events():
+                yield "generated "
+                yield "output"
+                yield LLMResult(
+                    status=ResultStatus.SUCCESS,
+                    code=ResultCode.OK,
+                    rewritten_text="generated output",
+                )
+            return events()
+
         generate = AsyncMock(
             return_value=LLMResult(
                 status=ResultStatus.SUCCESS,
@@ -55,3 +113,14 @@ def mock_text_processor():
 def client(mock_text_processor):
     app = create_fastapi_app(mock_text_processor)
     return TestClient(app)
+
+
+@pytest.fixture
+def upstream_processor_factory():
+    """Crea text processor con un proprio upstream finto (processor.upstream)"""
+    return lambda: UpstreamTextProcessor(FakeUpstream())
+
+
+@pytest.fixture
+def upstream_processor(upstream_processor_factory):
+    return upstream_processor_factory()
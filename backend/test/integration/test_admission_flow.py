@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from adapters.input import create_fastapi_app
+from adapters.input.admission_controller import AdmissionController
+
+
+def test_saturated_operation_returns_429_with_retry_after(mock_text_processor):
+    controller = AdmissionController(default_limit=1, max_queue=0)
+    client = TestClient(create_fastapi_app(mock_text_processor, admission_controller=controller))
+
+    # Occupa l'unico posto disponibile per "summarize"
+    controller._gate("summarize").semaphore._value = 0
+
+    response = client.post("/llm/summarize", json={"text": "Testo", "percentage": 50})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    mock_text_processor.summarize.assert_not_awaited()
+
+
+def test_metrics_expose_admission_queue_stats(client):
+    client.post("/llm/improve", json={"text": "Testo"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    stats = response.json()["admission"]["improve"]
+    assert stats["admitted"] == 1
+    assert stats["queue_depth"] == 0
@@ -0,0 +1,219 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from adapters.input import create_fastapi_app
+from adapters.input.admission_controller import AdmissionController
+from adapters.output import (JSONParserAdapter, LLMClientAdapter,
+                             PromptBuilderAdapter)
+from adapters.output.caching_llm_provider import CachingLLMProvider
+from adapters.output.response_cache import TwoTierResponseCache
+from adapters.output.single_flight_llm_provider import SingleFlightLLMProvider
+from application.services import SummarizeTextService
+from domain.services import TextProcessorService
+
+
+def async_client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class ProviderStream(httpx.AsyncByteStream):
+    """Corpo SSE del provider: invia i frame e poi resta aperto (il modello sta ancora generando)"""
+
+    def __init__(self, *contents):
+        self.contents = contents
+        self.sent = asyncio.Event()
+        self.closed = False
+
+    async def __aiter__(self):
+        for content in self.contents:
+            yield f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}\n\n".encode()
+        self.sent.set()
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def real_stack_app(provider_stream):
+    """App con lo stack reale (cache, single-flight, client LLM) e il provider su MockTransport"""
+    transport = httpx.MockTransport(lambda request: httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=provider_stream
+    ))
+    adapter = LLMClientAdapter([
+        {"name": "LOCAL", "url": "http://provider/v1/chat/completions", "model": "llama3.1:8b"}
+    ])
+    adapter._create_client = lambda provider: httpx.AsyncClient(transport=transport)
+    llm_provider = CachingLLMProvider(SingleFlightLLMProvider(adapter), TwoTierResponseCache(), adapter.model_key)
+    summarize = SummarizeTextService(llm_provider, PromptBuilderAdapter(), JSONParserAdapter())
+    return create_fastapi_app(TextProcessorService(summarize, None, None, None, None))
+
+
+@pytest.mark.asyncio
+async def test_delete_cancels_running_request_and_closes_upstream(upstream_processor):
+    upstream = upstream_processor.upstream
+    app = create_fastapi_app(upstream_processor)
+
+    async with async_client(app) as client:
+        pending = asyncio.create_task(client.post(
+            "/llm/summarize",
+            json={"text": "Testo", "percentage": 50},
+            headers={"X-Request-ID": "editor-42"}
+        ))
+        await asyncio.wait_for(upstream.started.wait(), timeout=2)
+
+        cancel = await client.delete("/llm/requests/editor-42")
+        response = await asyncio.wait_for(pending, timeout=2)
+
+    assert cancel.status_code == 200
+    assert upstream.closed
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "editor-42"
+    assert response.json()["outcome"]["status"] == "cancelled"
+    assert response.json()["outcome"]["code"] == "CANCELLED"
+
+
+@pytest.mark.asyncio
+async def test_delete_cancels_stream_with_final_result_event(upstream_processor):
+    upstream = upstream_processor.upstream
+    app = create_fastapi_app(upstream_processor)
+
+    async with async_client(app) as client:
+        pending = asyncio.create_task(client.post(
+            "/llm/summarize/stream",
+            json={"text": "Testo", "percentage": 50},
+            headers={"X-Request-ID": "stream-1"}
+        ))
+        await asyncio.wait_for(upstream.started.wait(), timeout=2)
+
+        await client.delete("/llm/requests/stream-1")
+        response = await asyncio.wait_for(pending, timeout=2)
+
+    assert upstream.closed
+    assert 'event: token\ndata: {"text": "Inizio"}' in response.text
+    assert response.text.rstrip().endswith(
+        'event: result\ndata: {"outcome": {"status": "cancelled", "code": "CANCELLED", '
+        '"violation_category": null}, "data": null}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_cancels_request_waiting_in_queue(upstream_processor):
+    processor = upstream_processor
+    controller = AdmissionController(default_limit=1, max_queue=5)
+    app = create_fastapi_app(processor, admission_controller=controller)
+    # Occupa l'unico posto disponibile per "summarize"
+    controller._gate("summarize").semaphore._value = 0
+
+    async with async_client(app) as client:
+        pending = asyncio.create_task(client.post(
+            "/llm/summarize",
+            json={"text": "Testo", "percentage": 50},
+            headers={"X-Request-ID": "queued"}
+        ))
+        while controller.stats()["summarize"]["queue_depth"] == 0:
+            await asyncio.sleep(0.01)
+
+        await client.delete("/llm/requests/queued")
+        response = await asyncio.wait_for(pending, timeout=2)
+        metrics = (await client.get("/metrics")).json()
+
+    assert response.json()["outcome"]["code"] == "CANCELLED"
+    assert not processor.summarize_started
+    assert metrics["requests"] == {"in_flight": 0, "cancelled": 1, "superseded": 0}
+    assert metrics["admission"]["summarize"]["queue_depth"] == 0
+
+
+def test_request_id_is_generated_when_missing(client):
+    response = client.post("/llm/improve", json={"text": "Testo"})
+
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+def test_delete_unknown_request_returns_404(client):
+    response = client.delete("/llm/requests/inesistente")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_new_request_supersedes_older_one_with_same_key(upstream_processor_factory):
+    older_processor, newer_processor = upstream_processor_factory(), upstream_processor_factory()
+    first, second = older_processor.upstream, newer_processor.upstream
+    processors = iter([older_processor, newer_processor])
+
+    class SessionTextProcessor:
+        async def summarize(self, document, percentage):
+            await next(processors).summarize(document, percentage)
+
+    app = create_fastapi_app(SessionTextProcessor())
+
+    async with async_client(app) as client:
+        older = asyncio.create_task(client.post(
+            "/llm/summarize",
+            json={"text": "Testo", "percentage": 30, "supersede_key": "editor-1"}
+        ))
+        await asyncio.wait_for(first.started.wait(), timeout=2)
+
+        newer = asyncio.create_task(client.post(
+            "/llm/summarize",
+            json={"text": "Testo", "percentage": 50, "supersede_key": "editor-1"},
+            headers={"X-Request-ID": "newer"}
+        ))
+        superseded = await asyncio.wait_for(older, timeout=2)
+        await asyncio.wait_for(second.started.wait(), timeout=2)
+
+        assert first.closed
+        assert not second.closed
+        await client.delete("/llm/requests/newer")
+        await asyncio.wait_for(newer, timeout=2)
+        metrics = (await client.get("/metrics")).json()
+
+    assert superseded.json()["outcome"] == {
+        "status": "cancelled",
+        "code": "SUPERSEDED",
+        "violation_category": None
+    }
+    assert metrics["requests"] == {"in_flight": 0, "cancelled": 1, "superseded": 1}
+
+
+@pytest.mark.asyncio
+async def test_delete_closes_provider_stream_through_real_stack():
+    provider_stream = ProviderStream('{"outcome": {"status": "success", "code": "OK"}, "data": {"rewritten_text": "Inizio')
+    app = real_stack_app(provider_stream)
+
+    async with async_client(app) as client:
+        pending = asyncio.create_task(client.post(
+            "/llm/summarize/stream",
+            json={"text": "Testo da riassumere", "percentage": 50},
+            headers={"X-Request-ID": "real-1"}
+        ))
+        await asyncio.wait_for(provider_stream.sent.wait(), timeout=2)
+
+        await client.delete("/llm/requests/real-1")
+        response = await asyncio.wait_for(pending, timeout=2)
+
+    assert provider_stream.closed
+    assert 'event: token\ndata: {"text": "Inizio"}' in response.text
+    assert '"code": "CANCELLED"' in response.text.rstrip().split("\n\n")[-1]
+
+
+@pytest.mark.asyncio
+async def test_complete_result_closes_provider_stream_through_real_stack():
+    provider_stream = ProviderStream(
+        '{"outcome": {"status": "success", "code": "OK"}, ',
+        '"data": {"rewritten_text": "Riassunto", "detected_language": "it"}}'
+    )
+    app = real_stack_app(provider_stream)
+
+    async with async_client(app) as client:
+        response = await asyncio.wait_for(client.post(
+            "/llm/summarize/stream",
+            json={"text": "Testo da riassumere", "percentage": 50}
+        ), timeout=2)
+
+    # Il resto della generazione non serve: la connessione al provider è già chiusa
+    assert provider_stream.closed
+    assert response.text.rstrip().split("\n\n")[-1].startswith('event: result\ndata: {"outcome": {"status": "success"')
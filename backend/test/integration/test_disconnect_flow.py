@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from adapters.input import create_fastapi_app
+from adapters.input.admission_controller import AdmissionController
+
+
+def http_scope(path):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("test", 1234),
+        "server": ("test", 80),
+    }
+
+
+def disconnecting_receive(upstream, body):
+    """Invia il corpo e segnala `http.disconnect` poco dopo l'inizio della risposta upstream"""
+    messages = [{"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await upstream.started.wait()
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def discard(message):
+    pass
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_request_and_closes_upstream(upstream_processor):
+    upstream = upstream_processor.upstream
+    app = create_fastapi_app(upstream_processor)
+    tasks_before = asyncio.all_tasks()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(
+            app(
+                http_scope("/llm/summarize"),
+                disconnecting_receive(upstream, {"text": "Testo", "percentage": 50}),
+                discard
+            ),
+            # Nessun polling: l'annullamento segue subito `http.disconnect`
+            timeout=0.25
+        )
+    # Lo stream upstream è già chiuso quando la richiesta termina
+    assert upstream.closed
+
+    await settle()
+    assert asyncio.all_tasks() == tasks_before
+
+
+@pytest.mark.asyncio
+async def test_disconnect_closes_upstream_of_stream_endpoint(upstream_processor):
+    upstream = upstream_processor.upstream
+    controller = AdmissionController(default_limit=1)
+    app = create_fastapi_app(upstream_processor, admission_controller=controller)
+    tasks_before = asyncio.all_tasks()
+
+    await asyncio.wait_for(
+        app(
+            http_scope("/llm/summarize/stream"),
+            disconnecting_receive(upstream, {"text": "Testo", "percentage": 50}),
+            discard
+        ),
+        timeout=2
+    )
+    await settle()
+
+    assert upstream.closed
+    assert asyncio.all_tasks() == tasks_before
+    # Il posto in coda viene rilasciato dal generatore della risposta
+    assert controller.stats()["summarize"]["active"] == 0
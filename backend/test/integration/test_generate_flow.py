@@ -1,3 +1,6 @@
+import json
+
+
 def test_generate_flow_returns_llm_result_and_calls_processor(client, mock_text_processor):
     response = client.post(
         "/llm/generate",
@@ -25,3 +28,21 @@ def test_generate_flow_validation_error_when_prompt_is_missing(client):
     )
 
     assert response.status_code == 422
+
+
+def test_generate_stream_flow_sends_tokens_then_result(client):
+    response = client.post(
+        "/llm/generate/stream",
+        json={"prompt": "Scrivi una introduzione"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("data: ", 1)[1]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert events[0] == ("token", {"text": "generated "})
+    assert events[1] == ("token", {"text": "output"})
+    assert events[-1][0] == "result"
+    assert events[-1][1]["data"]["rewritten_text"] == "generated output"
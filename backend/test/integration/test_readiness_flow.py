@@ -0,0 +1,15 @@
+from fastapi.testclient import TestClient
+
+from adapters.input import create_fastapi_app
+
+
+def test_ready_reports_provider_state(mock_text_processor):
+    state = {"ready": False, "providers": {"LOCAL": {"status": "down"}}}
+    client = TestClient(create_fastapi_app(mock_text_processor, readiness_check=lambda: state))
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["providers"]["LOCAL"]["status"] == "down"
+
+    state["ready"] = True
+    assert client.get("/ready").status_code == 200
@@ -1,3 +1,9 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from adapters.input import create_fastapi_app
+from adapters.input.admission_controller import AdmissionController
 from domain.models import TextDocument
 
 
@@ -28,3 +34,63 @@ def test_six_hats_flow_maps_runtime_error_to_500(client, mock_text_processor):
 
     assert response.status_code == 500
     assert "Errore del servizio AI: provider down" in response.json()["detail"]
+
+
+def test_all_hats_flow_streams_ndjson(client):
+    response = client.post(
+        "/llm/six-hats/all",
+        json={"text": "Analizza questo testo", "hats": ["verde", "blu"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["hat"] for line in lines] == ["verde", "blu"]
+    assert lines[0]["outcome"]["status"] == "success"
+    assert lines[0]["data"]["rewritten_text"] == "verde output"
+
+
+def test_all_hats_flow_streams_sse_when_requested(client):
+    response = client.post(
+        "/llm/six-hats/all",
+        json={"text": "Analizza questo testo"},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = response.text.strip().split("\n\n")
+    assert events[0].startswith("event: hat\ndata: ")
+    assert json.loads(events[0].split("data: ", 1)[1])["hat"] == "bianco"
+    assert events[-1] == "event: done\ndata: {}"
+
+
+def test_all_hats_flow_ends_with_error_line_on_failure(client, mock_text_processor):
+    async def failing(document, hats=None, single_call=None):
+        yield "bianco", (await mock_text_processor.analyze_six_hats(document, "bianco"))
+        raise RuntimeError("provider giù")
+
+    mock_text_processor.analyze_all_hats = failing
+
+    ndjson = client.post("/llm/six-hats/all", json={"text": "Testo"})
+    sse = client.post("/llm/six-hats/all", json={"text": "Testo"}, headers={"Accept": "text/event-stream"})
+
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert lines[0]["hat"] == "bianco"
+    assert lines[-1] == {"detail": "Errore del servizio AI: provider giù"}
+    assert sse.text.strip().split("\n\n")[-1] == 'event: error\ndata: {"detail": "Errore del servizio AI: provider giù"}'
+
+
+def test_all_hats_fan_out_counts_against_admission_limit(mock_text_processor):
+    controller = AdmissionController(default_limit=6, max_queue=0)
+    client = TestClient(create_fastapi_app(mock_text_processor, admission_controller=controller))
+    # Un'altra richiesta "six_hats" occupa già un posto
+    controller._gate("six_hats").in_use = 1
+
+    fan_out = client.post("/llm/six-hats/all", json={"text": "Testo"})
+    single_call = client.post("/llm/six-hats/all", json={"text": "Testo", "single_call": True})
+    two_hats = client.post("/llm/six-hats/all", json={"text": "Testo", "hats": ["bianco", "nero"]})
+
+    assert fan_out.status_code == 429
+    assert single_call.status_code == 200
+    assert two_hats.status_code == 200